@@ -0,0 +1,124 @@
+"""
+Authentication overhead per request: simplejwt's JWTAuthentication, which
+selects the user on every request, against CachedJWTAuthentication
+served by its local LRU, by the shared cache, and from trusted token
+claims, with the signature check alone as the floor.
+
+Creates a user in the configured database (point POSTGRES_DB at a
+scratch database and CACHE_URL at a scratch Redis to include their round
+trips) and authenticates REQUESTS GET requests in every mode, reporting
+the mean, p50 and p99 in microseconds and the queries per request.
+
+    python -m benchmarks.authentication --requests 20000
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import django
+
+BENCHMARK_EMAIL = "auth-benchmark@example.com"
+
+
+def seed() -> str:
+    from django.contrib.auth import get_user_model
+
+    from users.serializers import TokenObtainPairSerializer
+
+    user, _ = get_user_model().objects.get_or_create(email=BENCHMARK_EMAIL)
+    return str(TokenObtainPairSerializer.get_token(user).access_token)
+
+
+def cleanup() -> None:
+    from django.contrib.auth import get_user_model
+
+    get_user_model().objects.filter(email=BENCHMARK_EMAIL).delete()
+
+
+def get_modes() -> dict:
+    """
+    Callables authenticating a request and whether token claims are
+    trusted, by mode.
+    """
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from users.authentication import (
+        CachedJWTAuthentication,
+        local_principals,
+    )
+
+    jwt = JWTAuthentication()
+    cached = CachedJWTAuthentication()
+
+    def shared_cache(request):
+        local_principals.clear()
+        return cached.authenticate(request)
+
+    return {
+        "signature only": (cached.get_request_token, False),
+        "jwt": (jwt.authenticate, False),
+        "cached (local)": (cached.authenticate, False),
+        "cached (shared)": (shared_cache, False),
+        "trusted claims": (cached.authenticate, True),
+    }
+
+
+def measure(authenticate, request, requests: int) -> tuple[list, int]:
+    """
+    Latencies (us) of authenticating the request REQUESTS times and the
+    number of queries made.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    authenticate(request)
+    latencies = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(requests):
+            started = time.perf_counter()
+            authenticate(request)
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+    return latencies, len(queries)
+
+
+def main() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+    django.setup()
+
+    from django.core.cache import cache
+    from django.test import RequestFactory, override_settings
+
+    print(
+        f"{'mode':>16} {'mean us':>9} {'p50 us':>9} "
+        f"{'p99 us':>9} {'queries':>8}"
+    )
+    try:
+        token = seed()
+        request = RequestFactory().get(
+            "/api/borrowings/", headers={"Authorize": f"Bearer {token}"}
+        )
+        for mode, (authenticate, trusted) in get_modes().items():
+            cache.clear()
+            with override_settings(AUTH_TRUST_TOKEN_CLAIMS=trusted):
+                latencies, queries = measure(
+                    authenticate, request, args.requests
+                )
+            p50, p99 = (
+                statistics.quantiles(latencies, n=100)[i] for i in (49, 98)
+            )
+            print(
+                f"{mode:>16} {statistics.mean(latencies):>9.1f} "
+                f"{p50:>9.1f} {p99:>9.1f} "
+                f"{queries / args.requests:>8.2f}"
+            )
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
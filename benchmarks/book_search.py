@@ -0,0 +1,160 @@
+"""
+Latency of catalogue searches (books.search.search_books) over a large
+generated catalogue.
+
+Seeds N books into the configured database (point POSTGRES_DB at a
+scratch database: the ranked, index-backed search only exists on
+PostgreSQL) and times every query term REPEAT times, as the list view
+runs it, reporting p50/p95/p99 in milliseconds. The seeded books are
+deleted afterwards unless --keep is given, and --reuse skips seeding.
+
+    python -m benchmarks.book_search --books 1000000
+    python -m benchmarks.book_search --reuse --repeat 500 --explain
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+import django
+
+SEED_BATCH_SIZE = 10_000
+WORDS = (
+    "shadow river empire silent garden winter storm crown glass night "
+    "iron forest secret machine ocean fire memory stone kingdom dream "
+    "city ghost summer island mountain letter bridge star wolf clock "
+    "harbor desert mirror queen house journey thunder lantern song map"
+).split()
+FIRST_NAMES = (
+    "Ada Boris Clara Dmitri Elena Frank Grace Hiro Ines Jonas Kira Liam "
+    "Maya Nikolai Olga Pavel Quinn Rosa Samuel Tara Ursula Victor Wen"
+).split()
+LAST_NAMES = (
+    "Adler Brandt Castillo Dumas Eriksen Fischer Gallo Hayes Ivanova "
+    "Jensen Kowalski Laurent Moreau Novak Okafor Petrov Quintero Rossi "
+    "Sato Tanaka Ueda Varga Weber Yilmaz Zielinski"
+).split()
+QUERIES = (
+    "winter kingdom",
+    "glass",
+    "sh4dow river",
+    "Moreau",
+    "storm of the silent ocean",
+    "lanturn",
+)
+
+
+def seed(books: int) -> int:
+    """
+    Inserts the books and returns the last id before them.
+    """
+    from django.db import connection
+
+    from books.models import Book
+
+    start_id = Book.objects.order_by("-id").values_list("id", flat=True)
+    start_id = start_id.first() or 0
+    rng = random.Random(books)
+    for start in range(0, books, SEED_BATCH_SIZE):
+        Book.objects.bulk_create(
+            Book(
+                title=" ".join(
+                    rng.choice(WORDS).capitalize()
+                    for _ in range(rng.randint(2, 5))
+                ),
+                author=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                cover=rng.choice(Book.CoverType.values),
+                inventory=rng.randint(0, 5),
+                daily_fee=1,
+            )
+            for _ in range(start, min(start + SEED_BATCH_SIZE, books))
+        )
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE books_book")
+    return start_id
+
+
+def run_search(term: str) -> list:
+    from books.models import Book
+    from books.search import search_books
+
+    return list(search_books(Book.objects.defer("search_vector"), term))
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[
+        round(fraction * 100) - 1
+    ]
+
+
+def main() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="Search the books already in the database.",
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the seeded books."
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print EXPLAIN ANALYZE of every query term.",
+    )
+    args = parser.parse_args()
+    django.setup()
+
+    from django.db import connection
+
+    from books.models import Book
+    from books.search import search_books
+
+    start_id = None if args.reuse else seed(args.books)
+    try:
+        print(
+            f"{Book.objects.count()} books on {connection.vendor}, "
+            f"{args.repeat} runs per query"
+        )
+        print(
+            f"{'query':>28} {'hits':>5} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8}"
+        )
+        everything = []
+        for term in QUERIES:
+            hits = len(run_search(term))
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                run_search(term)
+                samples.append((time.perf_counter() - started) * 1000)
+            everything += samples
+            print(
+                f"{term:>28} {hits:>5} {percentile(samples, 0.5):>8.2f} "
+                f"{percentile(samples, 0.95):>8.2f} "
+                f"{percentile(samples, 0.99):>8.2f}"
+            )
+            if args.explain:
+                options = {}
+                if connection.vendor == "postgresql":
+                    options["analyze"] = True
+                queryset = search_books(Book.objects.all(), term)
+                print(queryset.explain(**options))
+        print(
+            f"{'all':>28} {'':>5} {percentile(everything, 0.5):>8.2f} "
+            f"{percentile(everything, 0.95):>8.2f} "
+            f"{percentile(everything, 0.99):>8.2f}"
+        )
+    finally:
+        if start_id is not None and not args.keep:
+            Book.objects.filter(id__gt=start_id).delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Time to build a borrowing list page per 1,000 rows: the old
+BorrowingListSerializer (model instances, prefetched payments) against
+the .values() read path of BorrowingValuesSerializer.
+
+Seeds N borrowings with a payment each into the configured database
+(point POSTGRES_DB at a scratch database) and reports, for every
+pipeline, the best of REPEAT runs of query + serialization and of
+serialization alone (which for expand=payments includes its one
+payments query), both scaled to 1,000 rows.
+
+    python -m benchmarks.borrowing_serialization --rows 10000
+"""
+
+import argparse
+import os
+import time
+from datetime import date, timedelta
+
+import django
+
+BENCHMARK_EMAIL = "serialization-benchmark@example.com"
+SEED_BATCH_SIZE = 5_000
+
+
+def seed(rows: int) -> None:
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+    from payments.models import Payment
+
+    user, _ = get_user_model().objects.get_or_create(email=BENCHMARK_EMAIL)
+    Borrowing.objects.filter(user=user).delete()
+    book, _ = Book.objects.get_or_create(
+        title="Serialization benchmark",
+        defaults={"author": "Benchmark", "inventory": 0, "daily_fee": 1},
+    )
+    today = date.today()
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                user=user,
+                book=book,
+                borrow_date=today - timedelta(days=i % 30),
+                expected_return_date=today + timedelta(days=1),
+            )
+            for i in range(start, min(start + SEED_BATCH_SIZE, rows))
+        )
+        Payment.objects.bulk_create(
+            Payment(
+                borrowing=borrowing,
+                status=Payment.PaymentStatus.PENDING,
+                type=Payment.PaymentType.PAYMENT,
+                money_to_pay=1,
+                session_url="https://checkout.stripe.com/c/pay/"
+                + "x" * 300,
+                session_id=f"cs_benchmark_{borrowing.id}",
+            )
+            for borrowing in borrowings
+        )
+
+
+def cleanup() -> None:
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+
+    get_user_model().objects.filter(email=BENCHMARK_EMAIL).delete()
+    Book.objects.filter(title="Serialization benchmark").delete()
+
+
+def get_pipelines() -> dict:
+    """
+    name: (fetch, serialize) for every compared list pipeline.
+    """
+    from borrowings.models import Borrowing
+    from borrowings.serializers import (
+        BorrowingListSerializer,
+        BorrowingValuesSerializer,
+    )
+
+    borrowings = Borrowing.objects.filter(
+        user__email=BENCHMARK_EMAIL
+    ).order_by("-borrow_date", "-id")
+    lean = BorrowingValuesSerializer()
+    expanded = BorrowingValuesSerializer(expand=["payments"])
+    sparse = BorrowingValuesSerializer(
+        fields=["id", "book", "expected_return_date"]
+    )
+    return {
+        "ModelSerializer": (
+            lambda: list(
+                borrowings.select_related("book").prefetch_related(
+                    "payments"
+                )
+            ),
+            lambda rows: BorrowingListSerializer(rows, many=True).data,
+        ),
+        "values, expand=payments": (
+            lambda: list(borrowings.values(*expanded.get_columns())),
+            expanded.serialize,
+        ),
+        "values": (
+            lambda: list(borrowings.values(*lean.get_columns())),
+            lean.serialize,
+        ),
+        "values, 3 fields": (
+            lambda: list(borrowings.values(*sparse.get_columns())),
+            sparse.serialize,
+        ),
+    }
+
+
+def best_of(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    django.setup()
+
+    per_thousand = 1000 / args.rows * 1000
+    print(f"{'pipeline':>24} {'total ms/1k':>12} {'serialize ms/1k':>16}")
+    try:
+        seed(args.rows)
+        for name, (fetch, serialize) in get_pipelines().items():
+            rows = fetch()
+            total = best_of(args.repeat, lambda: serialize(fetch()))
+            serialize_only = best_of(args.repeat, lambda: serialize(rows))
+            print(
+                f"{name:>24} {total * per_thousand:>12.1f} "
+                f"{serialize_only * per_thousand:>16.1f}"
+            )
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Requests per second and latency of the read endpoints under load, served
+by gunicorn: the WSGI application on gthread workers against the ASGI
+application on uvicorn workers with ASYNC_READ_VIEWS.
+
+Seeds books and a user with borrowings and payments into the configured
+database (point POSTGRES_DB at a scratch database), then starts each
+server in turn with the same number of worker processes and keeps
+CONCURRENCY connections busy on every endpoint for DURATION seconds,
+reporting RPS and p50/p99 in milliseconds.
+
+    python -m benchmarks.load_test --workers 2 --threads 8 --concurrency 64
+    python -m benchmarks.load_test --servers asgi --duration 30
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+import aiohttp
+import django
+
+BENCHMARK_EMAIL = "load-test@example.com"
+BENCHMARK_AUTHOR = "Load test"
+ENDPOINTS = {
+    "book list": "/api/books/",
+    "book detail": "/api/books/{book}/",
+    "borrowing list": "/api/borrowings/?expand=payments",
+    "borrowing detail": "/api/borrowings/{borrowing}/",
+    "payment success": "/api/payments/success/?session_id={session}",
+}
+SERVERS = {
+    "wsgi": ("library_service.wsgi:application", "gthread", "False"),
+    "asgi": (
+        "library_service.asgi:application",
+        "uvicorn_worker.UvicornWorker",
+        "True",
+    ),
+}
+
+
+def seed(books: int, borrowings: int) -> dict:
+    """
+    Inserts the data and returns the values ENDPOINTS are formatted with.
+    """
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+    from payments.models import Payment
+
+    user, _ = get_user_model().objects.get_or_create(email=BENCHMARK_EMAIL)
+    created = Book.objects.bulk_create(
+        Book(
+            title=f"Load test book #{i}",
+            author=BENCHMARK_AUTHOR,
+            inventory=5,
+            daily_fee="1.25",
+        )
+        for i in range(books)
+    )
+    today = date.today()
+    created_borrowings = Borrowing.objects.bulk_create(
+        Borrowing(
+            user=user,
+            book=created[i % books],
+            borrow_date=today,
+            expected_return_date=today + timedelta(days=7),
+        )
+        for i in range(borrowings)
+    )
+    payments = Payment.objects.bulk_create(
+        Payment(
+            borrowing=borrowing,
+            status=Payment.PaymentStatus.PENDING,
+            type=Payment.PaymentType.PAYMENT,
+            money_to_pay="8.75",
+            session_url="https://checkout.stripe.com/c/pay/load-test",
+            session_id=f"cs_load_test_{borrowing.id}",
+        )
+        for borrowing in created_borrowings
+    )
+    return {
+        "token": str(AccessToken.for_user(user)),
+        "book": created[0].id,
+        "borrowing": created_borrowings[0].id,
+        "session": payments[0].session_id,
+    }
+
+
+def cleanup() -> None:
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+
+    get_user_model().objects.filter(email=BENCHMARK_EMAIL).delete()
+    Book.objects.filter(author=BENCHMARK_AUTHOR).delete()
+
+
+def start_server(name: str, port: int, workers: int, threads: int):
+    application, worker_class, async_views = SERVERS[name]
+    env = dict(os.environ, DJANGO_DEBUG="False", ASYNC_READ_VIEWS=async_views)
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            application,
+            "--config",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--threads",
+            str(threads),
+            "--worker-class",
+            worker_class,
+            "--access-logfile",
+            os.devnull,
+        ],
+        env=env,
+    )
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{base_url}/api/books/") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{base_url} did not start")
+            await asyncio.sleep(0.2)
+
+
+async def run_load(
+    url: str, token: str, concurrency: int, duration: float
+) -> tuple[list[float], int]:
+    """
+    Latencies (ms) of the successful requests and the number of failed
+    ones, made by CONCURRENCY clients in a loop for DURATION seconds.
+    """
+    latencies, errors = [], 0
+    headers = {"Authorize": f"Bearer {token}"}
+    deadline = time.perf_counter() + duration
+
+    async def client(session: aiohttp.ClientSession) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with session.get(url, headers=headers) as response:
+                    await response.read()
+                    ok = response.status == 200
+            except aiohttp.ClientError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[
+        round(fraction * 100) - 1
+    ]
+
+
+def main() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--servers", default="wsgi,asgi")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=8,
+        help="Threads per gthread (WSGI) worker.",
+    )
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--books", type=int, default=100)
+    parser.add_argument("--borrowings", type=int, default=20)
+    args = parser.parse_args()
+    django.setup()
+
+    print(
+        f"{args.workers} workers ({args.threads} threads each for wsgi), "
+        f"{args.concurrency} connections, {args.duration:g}s per endpoint"
+    )
+    print(
+        f"{'server':>6} {'endpoint':>18} {'rps':>8} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    try:
+        values = seed(args.books, args.borrowings)
+        for name in args.servers.split(","):
+            base_url = f"http://127.0.0.1:{args.port}"
+            server = start_server(name, args.port, args.workers, args.threads)
+            try:
+                asyncio.run(wait_until_ready(base_url))
+                for endpoint, path in ENDPOINTS.items():
+                    latencies, errors = asyncio.run(
+                        run_load(
+                            base_url + path.format(**values),
+                            values["token"],
+                            args.concurrency,
+                            args.duration,
+                        )
+                    )
+                    print(
+                        f"{name:>6} {endpoint:>18} "
+                        f"{len(latencies) / args.duration:>8.0f} "
+                        f"{percentile(latencies, 0.5):>8.1f} "
+                        f"{percentile(latencies, 0.99):>8.1f} "
+                        f"{errors:>7}"
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Peak RSS of the overdue report pipeline for growing overdue sets.
+
+Seeds N overdue borrowings into the configured database (point
+POSTGRES_DB at a scratch database) and measures every run in a fresh
+process, so ru_maxrss is not inflated by seeding or by earlier runs.
+Peak RSS is reported as growth over the process baseline, alongside the
+tracemalloc peak of the Python heap (which also slows the timed run).
+Messages are packed but not sent.
+
+    python -m benchmarks.overdue_memory --rows 10000 100000 1000000
+    python -m benchmarks.overdue_memory --rows 10000 100000 --legacy
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import django
+
+BENCHMARK_EMAIL = "overdue-benchmark@example.com"
+SEED_BATCH_SIZE = 10_000
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def delete_borrowings(user) -> None:
+    """
+    Deletes the user's borrowings in batches: a single cascade over
+    a million rows exceeds SQLite's limit of query parameters.
+    """
+    from borrowings.models import Borrowing
+
+    borrowings = Borrowing.objects.filter(user=user)
+    while ids := list(
+        borrowings.values_list("id", flat=True)[:SEED_BATCH_SIZE]
+    ):
+        Borrowing.objects.filter(id__in=ids).delete()
+
+
+def seed(rows: int) -> None:
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    user, _ = get_user_model().objects.get_or_create(email=BENCHMARK_EMAIL)
+    delete_borrowings(user)
+    book, _ = Book.objects.get_or_create(
+        title="Overdue benchmark",
+        defaults={"author": "Benchmark", "inventory": 0, "daily_fee": 1},
+    )
+    today = date.today()
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                user=user,
+                book=book,
+                borrow_date=today - timedelta(days=30),
+                expected_return_date=today - timedelta(days=1 + i % 20),
+            )
+            for i in range(start, min(start + SEED_BATCH_SIZE, rows))
+        )
+
+
+def cleanup() -> None:
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+
+    for user in get_user_model().objects.filter(email=BENCHMARK_EMAIL):
+        delete_borrowings(user)
+        user.delete()
+    Book.objects.filter(title="Overdue benchmark").delete()
+
+
+def iter_legacy_lines():
+    """The pre-streaming pipeline: full model instances in one list."""
+    from borrowings.models import Borrowing
+
+    borrowings = list(
+        Borrowing.objects.filter(
+            actual_return_date=None, expected_return_date__lte=date.today()
+        ).select_related("book", "user")
+    )
+    for borrowing in borrowings:
+        yield borrowing.id, (
+            f"The borrowing #{borrowing.id} of a book "
+            f"'{borrowing.book.title}' is overdue. "
+            f"Expected return date was "
+            f"{borrowing.expected_return_date} by user "
+            f"#{borrowing.user.id} {borrowing.user.email}."
+        )
+
+
+def measure(legacy: bool) -> dict:
+    from django.db import connection
+
+    from notifications.tasks import iter_overdue_lines
+    from notifications.telegram import pack_messages
+
+    connection.ensure_connection()
+    baseline = peak_rss_mb()
+    tracemalloc.start()
+    started = time.perf_counter()
+    lines = iter_legacy_lines() if legacy else iter_overdue_lines()
+    messages = sum(1 for _ in pack_messages(lines))
+    seconds = time.perf_counter() - started
+    _, heap_peak = tracemalloc.get_traced_memory()
+    return {
+        "seconds": round(seconds, 2),
+        "messages": messages,
+        "peak_rss_mb": round(peak_rss_mb() - baseline, 1),
+        "peak_heap_mb": round(heap_peak / 2**20, 1),
+    }
+
+
+def main() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="Also measure the old list(select_related(...)) pipeline.",
+    )
+    parser.add_argument("--measure", choices=["streaming", "legacy"])
+    args = parser.parse_args()
+    django.setup()
+
+    if args.measure:
+        print(json.dumps(measure(legacy=args.measure == "legacy")))
+        return
+
+    pipelines = ["streaming", "legacy"] if args.legacy else ["streaming"]
+    print(
+        f"{'rows':>10} {'pipeline':>10} {'peak RSS MB':>12} "
+        f"{'peak heap MB':>13} {'seconds':>8} {'messages':>9}"
+    )
+    try:
+        for rows in args.rows:
+            seed(rows)
+            for pipeline in pipelines:
+                output = subprocess.run(
+                    [
+                        sys.executable,
+                        "-m",
+                        __spec__.name,
+                        "--measure",
+                        pipeline,
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{rows:>10} {pipeline:>10} "
+                    f"{result['peak_rss_mb']:>12} "
+                    f"{result['peak_heap_mb']:>13} "
+                    f"{result['seconds']:>8} {result['messages']:>9}"
+                )
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Render time and size of /api/books/ and /api/borrowings/ list payloads
+with DRF's JSONRenderer, ORJSONRenderer and ORJSONRenderer's stdlib
+fallback.
+
+Seeds N books and N borrowings (with a payment each) into the
+configured database (point POSTGRES_DB at a scratch database), builds
+the payloads the list views return (the borrowing page with
+?expand=payments) and reports the best of REPEAT renders of each.
+
+    python -m benchmarks.render_json --rows 1000
+"""
+
+import argparse
+import os
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+import django
+
+BENCHMARK_EMAIL = "render-benchmark@example.com"
+BENCHMARK_AUTHOR = "Render benchmark"
+
+
+def seed(rows: int) -> None:
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+    from payments.models import Payment
+
+    user, _ = get_user_model().objects.get_or_create(email=BENCHMARK_EMAIL)
+    books = Book.objects.bulk_create(
+        Book(
+            title=f"Render benchmark book #{i}",
+            author=BENCHMARK_AUTHOR,
+            inventory=i % 7,
+            daily_fee="1.25",
+        )
+        for i in range(rows)
+    )
+    today = date.today()
+    borrowings = Borrowing.objects.bulk_create(
+        Borrowing(
+            user=user,
+            book=book,
+            borrow_date=today,
+            expected_return_date=today + timedelta(days=7),
+        )
+        for book in books
+    )
+    Payment.objects.bulk_create(
+        Payment(
+            borrowing=borrowing,
+            status=Payment.PaymentStatus.PENDING,
+            type=Payment.PaymentType.PAYMENT,
+            money_to_pay="8.75",
+            session_url="https://checkout.stripe.com/c/pay/" + "x" * 300,
+            session_id=f"cs_render_benchmark_{borrowing.id}",
+        )
+        for borrowing in borrowings
+    )
+
+
+def cleanup() -> None:
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+
+    get_user_model().objects.filter(email=BENCHMARK_EMAIL).delete()
+    Book.objects.filter(author=BENCHMARK_AUTHOR).delete()
+
+
+def get_payloads() -> dict:
+    from books.models import Book
+    from books.serializers import BookSerializer
+    from borrowings.models import Borrowing
+    from borrowings.serializers import BorrowingValuesSerializer
+
+    books = Book.objects.filter(author=BENCHMARK_AUTHOR)
+    serializer = BorrowingValuesSerializer(expand=["payments"])
+    rows = (
+        Borrowing.objects.filter(user__email=BENCHMARK_EMAIL)
+        .order_by("-borrow_date", "-id")
+        .values(*serializer.get_columns())
+    )
+    return {
+        "/api/books/": BookSerializer(books, many=True).data,
+        "/api/borrowings/": {
+            "next": None,
+            "previous": None,
+            "results": serializer.serialize(list(rows)),
+        },
+    }
+
+
+def best_of(repeat: int, function) -> tuple[float, bytes]:
+    best, output = float("inf"), b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = function()
+        best = min(best, time.perf_counter() - started)
+    return best, output
+
+
+def main() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    django.setup()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from library_service.renderers import ORJSONRenderer
+
+    def render_fallback(data):
+        with mock.patch("library_service.renderers.orjson", None):
+            return ORJSONRenderer().render(data)
+
+    renderers = {
+        "DRF JSONRenderer": JSONRenderer().render,
+        "ORJSONRenderer": ORJSONRenderer().render,
+        "stdlib fallback": render_fallback,
+    }
+    print(f"{'payload':>18} {'renderer':>18} {'ms':>8} {'bytes':>10}")
+    try:
+        seed(args.rows)
+        for path, data in get_payloads().items():
+            for name, render in renderers.items():
+                seconds, output = best_of(args.repeat, lambda: render(data))
+                print(
+                    f"{path:>18} {name:>18} {seconds * 1000:>8.2f} "
+                    f"{len(output):>10}"
+                )
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
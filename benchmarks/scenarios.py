@@ -0,0 +1,511 @@
+"""
+Scripted scenarios of the borrowing and payment flows, each measured in
+a fresh process: RPS, p50/p95/p99 latency in milliseconds, database
+queries per operation and peak RSS.
+
+    browse   anonymous catalogue reads: lists, filters, search, details
+    borrow   borrowings created by a user
+    return   overdue borrowings returned, each charged a fine
+    webhook  a burst of Stripe checkout.session.completed deliveries,
+             every tenth one a redelivery
+    overdue  the daily overdue report
+
+Requests go through the whole Django stack in process (django.test.Client)
+and Celery tasks run eagerly, so a borrow or return includes the outbox
+dispatch, the checkout session and the Telegram notification. Stripe and
+Telegram are answered by local stub servers (benchmarks.stubs) after
+--stub-latency ms. Data is seeded into the configured database (point
+POSTGRES_DB at a scratch database) and deleted afterwards. For a served
+application under concurrent load, see benchmarks.load_test.
+
+Results can be saved as a baseline and later runs compared with it: an
+RPS drop, latency or RSS growth beyond --tolerance, or any additional
+query or error, is reported as a regression and fails the run.
+
+    python -m benchmarks.scenarios --save-baseline benchmarks/baseline.json
+    python -m benchmarks.scenarios --baseline benchmarks/baseline.json
+    python -m benchmarks.scenarios --scenarios borrow,return --ops 1000
+
+benchmarks/baseline.json was run with the default settings (500 ops
+per scenario, 100 books, 10k overdue borrowings, stubs answering
+at once) on SQLite, on the single-CPU machine described in its
+"environment". Timings there vary by up to half between runs, so
+compare with it using the same settings and --tolerance 0.5, and re-run
+before trusting a timing regression. The number of queries per
+operation and the errors do not depend on the machine; any increase in
+them is a real regression.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+import django
+
+from benchmarks.load_test import percentile
+from benchmarks.stubs import StubServer
+
+BENCHMARK_EMAIL = "scenarios@example.com"
+BENCHMARK_OVERDUE_EMAIL = "scenarios-overdue@example.com"
+BENCHMARK_AUTHOR = "Scenario benchmark"
+WEBHOOK_SECRET = "whsec_benchmark"
+SESSION_PREFIX = "cs_benchmark_"
+HOST = "127.0.0.1"
+SEED_BATCH_SIZE = 10_000
+SCENARIOS = ("browse", "borrow", "return", "webhook", "overdue")
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+
+
+def seed(books: int, ops: int, overdue: int) -> None:
+    """
+    Books for browse and borrow, overdue borrowings for return (the
+    oldest half) and webhook (pending payments of the newest half), and
+    overdue borrowings of another user for the overdue report.
+    """
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+    from payments.models import Payment
+
+    user = get_user_model().objects.create_user(email=BENCHMARK_EMAIL)
+    other = get_user_model().objects.create_user(email=BENCHMARK_OVERDUE_EMAIL)
+    # Created one by one: saving a book shards its inventory.
+    created = [
+        Book.objects.create(
+            title=f"Benchmark book #{i}",
+            author=BENCHMARK_AUTHOR,
+            cover="HARD" if i % 2 else "SOFT",
+            inventory=2 * ops // books + 10,
+            daily_fee="1.25",
+        )
+        for i in range(books)
+    ]
+    today = date.today()
+
+    def borrowings(owner, count: int) -> None:
+        for start in range(0, count, SEED_BATCH_SIZE):
+            Borrowing.objects.bulk_create(
+                Borrowing(
+                    user=owner,
+                    book=created[i % books],
+                    borrow_date=today - timedelta(days=10),
+                    expected_return_date=today - timedelta(days=1 + i % 7),
+                )
+                for i in range(start, min(start + SEED_BATCH_SIZE, count))
+            )
+
+    borrowings(user, 2 * ops)
+    borrowings(other, overdue)
+    Payment.objects.bulk_create(
+        Payment(
+            borrowing=borrowing,
+            status=Payment.PaymentStatus.PENDING,
+            type=Payment.PaymentType.PAYMENT,
+            money_to_pay="11.25",
+            session_url="https://checkout.stripe.com/c/pay/benchmark",
+            session_id=f"{SESSION_PREFIX}{borrowing.id}",
+        )
+        for borrowing in Borrowing.objects.filter(user=user).order_by("-id")[
+            :ops
+        ]
+    )
+
+
+def cleanup() -> None:
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from payments.models import Payment
+
+    Payment.objects.filter(
+        borrowing__user__email__in=(BENCHMARK_EMAIL, BENCHMARK_OVERDUE_EMAIL)
+    ).delete()
+    get_user_model().objects.filter(
+        email__in=(BENCHMARK_EMAIL, BENCHMARK_OVERDUE_EMAIL)
+    ).delete()
+    Book.objects.filter(author=BENCHMARK_AUTHOR).delete()
+
+
+def get_environment(stub_url: str) -> dict:
+    return dict(
+        os.environ,
+        DJANGO_DEBUG="False",
+        ASYNC_READ_VIEWS="False",
+        PAYMENT_GATEWAY="payments.gateway.StripeGateway",
+        STRIPE_SECRET_KEY="sk_test_benchmark",
+        STRIPE_API_BASE=stub_url,
+        STRIPE_MAX_NETWORK_RETRIES="0",
+        STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+        TELEGRAM_API_URL=stub_url,
+        TELEGRAM_BOT_TOKEN="benchmark",
+        TELEGRAM_CHAT_ID="1",
+        TELEGRAM_MIN_INTERVAL="0",
+    )
+
+
+def get_machine() -> dict:
+    """
+    Where a baseline was run: results only compare on the same database
+    and a similar machine.
+    """
+    from django.db import connection
+
+    return {
+        "database": connection.vendor,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def get_user_client():
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user = get_user_model().objects.get(email=BENCHMARK_EMAIL)
+    return Client(
+        SERVER_NAME=HOST,
+        headers={"Authorize": f"Bearer {AccessToken.for_user(user)}"},
+    )
+
+
+def browse(ops: int) -> list:
+    from django.test import Client
+
+    from books.models import Book
+
+    client = Client(SERVER_NAME=HOST)
+    book_ids = list(
+        Book.objects.filter(author=BENCHMARK_AUTHOR).values_list(
+            "id", flat=True
+        )
+    )
+    paths = [
+        "/api/books/",
+        "/api/books/?cover=HARD",
+        "/api/books/?search=benchmark",
+        f"/api/books/?author={BENCHMARK_AUTHOR}",
+    ]
+    paths += [f"/api/books/{book_id}/" for book_id in book_ids]
+    return [
+        lambda path=paths[i % len(paths)]: client.get(path).status_code == 200
+        for i in range(ops)
+    ]
+
+
+def borrow(ops: int) -> list:
+    from django.urls import reverse
+
+    from books.models import Book
+
+    client = get_user_client()
+    url = reverse("borrowings:borrowing-list")
+    titles = list(
+        Book.objects.filter(author=BENCHMARK_AUTHOR).values_list(
+            "title", flat=True
+        )
+    )
+    today = date.today()
+    payloads = [
+        {
+            "book": titles[i % len(titles)],
+            "borrow_date": str(today),
+            "expected_return_date": str(today + timedelta(days=7)),
+        }
+        for i in range(ops)
+    ]
+    return [
+        lambda payload=payload: client.post(
+            url, payload, content_type="application/json"
+        ).status_code
+        == 201
+        for payload in payloads
+    ]
+
+
+def return_with_fine(ops: int) -> list:
+    from django.urls import reverse
+
+    from borrowings.models import Borrowing
+
+    client = get_user_client()
+    ids = (
+        Borrowing.objects.filter(
+            user__email=BENCHMARK_EMAIL,
+            actual_return_date=None,
+            expected_return_date__lt=date.today(),
+        )
+        .order_by("id")
+        .values_list("id", flat=True)[:ops]
+    )
+    return [
+        lambda url=reverse(
+            "borrowings:borrowing-return", kwargs={"pk": borrowing_id}
+        ): client.post(url).status_code
+        == 200
+        for borrowing_id in ids
+    ]
+
+
+def sign(payload: str) -> str:
+    timestamp = int(time.time())
+    signature = hmac.new(
+        WEBHOOK_SECRET.encode(),
+        f"{timestamp}.{payload}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def webhook(ops: int) -> list:
+    from django.test import Client
+    from django.urls import reverse
+
+    from payments.models import Payment
+
+    client = Client(SERVER_NAME=HOST)
+    url = reverse("payments:stripe_webhook")
+    sessions = iter(
+        Payment.objects.filter(
+            session_id__startswith=SESSION_PREFIX,
+            status=Payment.PaymentStatus.PENDING,
+        ).values_list("session_id", flat=True)
+    )
+    payloads = []
+    for i in range(ops):
+        if i % 10 == 9:
+            payloads.append(payloads[-1])
+            continue
+        event = {
+            "id": f"evt_benchmark_{i}",
+            "object": "event",
+            "type": "checkout.session.completed",
+            "data": {"object": {"id": next(sessions, "cs_missing")}},
+        }
+        payloads.append(json.dumps(event))
+    return [
+        lambda payload=payload: client.post(
+            url,
+            payload,
+            content_type="application/json",
+            headers={"Stripe-Signature": sign(payload)},
+        ).status_code
+        == 200
+        for payload in payloads
+    ]
+
+
+def overdue(runs: int) -> list:
+    from notifications.tasks import send_overdue_borrowings
+
+    return [
+        lambda: send_overdue_borrowings.apply().successful()
+        for _ in range(runs)
+    ]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(scenario: str, ops: int, overdue_runs: int) -> dict:
+    from django.db import connection
+
+    from library_service.celery import app
+
+    app.conf.task_always_eager = True
+    if scenario == "overdue":
+        operations = overdue(overdue_runs)
+    else:
+        operations = {
+            "browse": browse,
+            "borrow": borrow,
+            "return": return_with_fine,
+            "webhook": webhook,
+        }[scenario](ops)
+
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    latencies, errors = [], 0
+    with connection.execute_wrapper(count_query):
+        started = time.perf_counter()
+        for operation in operations:
+            operation_started = time.perf_counter()
+            if not operation():
+                errors += 1
+            latencies.append((time.perf_counter() - operation_started) * 1000)
+        seconds = time.perf_counter() - started
+
+    return {
+        "ops": len(operations),
+        "rps": round(len(operations) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "queries_per_op": round(queries / max(len(operations), 1), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "errors": errors,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario}: rps {base['rps']} -> {result['rps']}"
+            )
+        for metric in LOWER_IS_BETTER:
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{scenario}: {metric} {base[metric]} -> {result[metric]}"
+                )
+        for metric in ("queries_per_op", "errors"):
+            if result[metric] > base[metric]:
+                regressions.append(
+                    f"{scenario}: {metric} {base[metric]} -> {result[metric]}"
+                )
+    return regressions
+
+
+def change(result: dict, base: dict | None, metric: str) -> str:
+    if not base or not base[metric]:
+        return ""
+    return f"{(result[metric] / base[metric] - 1) * 100:+.0f}%"
+
+
+def main() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--ops", type=int, default=500)
+    parser.add_argument("--books", type=int, default=100)
+    parser.add_argument(
+        "--overdue",
+        type=int,
+        default=10_000,
+        help="Overdue borrowings in the report.",
+    )
+    parser.add_argument("--overdue-runs", type=int, default=5)
+    parser.add_argument(
+        "--stub-latency",
+        type=float,
+        default=0,
+        help="Milliseconds the Stripe and Telegram stubs take to answer.",
+    )
+    parser.add_argument("--baseline")
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--measure", choices=SCENARIOS)
+    args = parser.parse_args()
+    django.setup()
+
+    if args.measure:
+        result = measure(args.measure, args.ops, args.overdue_runs)
+        print(json.dumps(result))
+        return
+
+    scenarios = args.scenarios.split(",")
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    settings = {
+        "ops": args.ops,
+        "books": args.books,
+        "overdue": args.overdue,
+        "overdue_runs": args.overdue_runs,
+        "stub_latency": args.stub_latency,
+    }
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            stored = json.load(file)
+        if stored["settings"] != settings:
+            print(f"Baseline was run with {stored['settings']}")
+        if stored.get("environment") != get_machine():
+            print(f"Baseline was run on {stored.get('environment')}")
+        baseline = stored["results"]
+
+    print(
+        f"{'scenario':>8} {'ops':>6} {'rps':>8} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'rss MB':>7} "
+        f"{'errors':>6} {'rps':>6} {'p95':>6}"
+    )
+    results = {}
+    try:
+        seed(args.books, args.ops, args.overdue)
+        with StubServer(latency=args.stub_latency / 1000) as stub:
+            for scenario in scenarios:
+                output = subprocess.run(
+                    [
+                        sys.executable,
+                        "-m",
+                        __spec__.name,
+                        "--measure",
+                        scenario,
+                        "--ops",
+                        str(args.ops),
+                        "--overdue-runs",
+                        str(args.overdue_runs),
+                    ],
+                    env=get_environment(stub.url),
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                results[scenario] = result
+                base = baseline.get(scenario)
+                print(
+                    f"{scenario:>8} {result['ops']:>6} {result['rps']:>8} "
+                    f"{result['p50_ms']:>8} {result['p95_ms']:>8} "
+                    f"{result['p99_ms']:>8} {result['queries_per_op']:>8} "
+                    f"{result['peak_rss_mb']:>7} {result['errors']:>6} "
+                    f"{change(result, base, 'rps'):>6} "
+                    f"{change(result, base, 'p95_ms'):>6}"
+                )
+    finally:
+        cleanup()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(
+                {
+                    "settings": settings,
+                    "environment": get_machine(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+    if args.baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
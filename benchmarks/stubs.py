@@ -0,0 +1,87 @@
+"""
+Local stand-ins for the Stripe and Telegram APIs, so that benchmarks
+exercise our HTTP clients without leaving the machine or hitting rate
+limits. Point STRIPE_API_BASE and TELEGRAM_API_URL at StubServer.url.
+
+    with StubServer(latency=0.05) as stub:
+        ...
+"""
+
+import json
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        # Headers and body are written separately: without this, Nagle's
+        # algorithm holds the body back until the client acks (~40ms).
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.count(self.path)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self.path.startswith("/v1/checkout/sessions"):
+            session_id = f"cs_stub_{uuid.uuid4().hex}"
+            body = {
+                "id": session_id,
+                "object": "checkout.session",
+                "url": f"https://checkout.stripe.com/c/pay/{session_id}",
+            }
+        elif self.path.endswith("/sendMessage"):
+            body = {"ok": True, "result": {"message_id": 1}}
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Answers Stripe checkout session creation and Telegram sendMessage
+    after LATENCY seconds, counting the requests by path.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, port: int = 0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.latency = latency
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, path: str) -> None:
+        key = "stripe" if path.startswith("/v1/") else "telegram"
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def __enter__(self) -> "StubServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
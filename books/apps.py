@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class BooksConfig(AppConfig):
     name = "books"
+
+    def ready(self):
+        import books.signals
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from library_service.async_views import render_json
+from library_service.renderers import ORJSONRenderer
+from monitoring.metrics import CacheMetrics
+
+CATALOGUE_VERSION_KEY = "books:catalogue-version"
+
+catalogue_cache = CacheMetrics("catalogue")
+
+
+def get_catalogue_version() -> int:
+    """
+    Version of the book catalogue: the time (in ns) of its last change.
+    Every cached response is keyed by it, so bumping the version
+    invalidates all of them at once.
+    """
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(CATALOGUE_VERSION_KEY, version, timeout=None):
+            version = cache.get(CATALOGUE_VERSION_KEY, version)
+    return version
+
+
+async def aget_catalogue_version() -> int:
+    version = await cache.aget(CATALOGUE_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not await cache.aadd(CATALOGUE_VERSION_KEY, version, timeout=None):
+            version = await cache.aget(CATALOGUE_VERSION_KEY, version)
+    return version
+
+
+def bump_catalogue_version() -> None:
+    cache.set(CATALOGUE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def make_etag(data, media_type: str) -> str:
+    """
+    Strong ETag of the data rendered as media_type: the JSON and the
+    browsable API representations of a resource get different ones.
+    """
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    digest = hashlib.sha1(f"{media_type}\n{payload}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def get_response_key(
+    request: HttpRequest, version: int, media_type: str
+) -> str:
+    path_hash = hashlib.sha1(
+        f"{media_type}\n{request.get_full_path()}".encode()
+    ).hexdigest()
+    return f"books:response:{version}:{path_hash}"
+
+
+def make_entry(data, media_type: str) -> dict:
+    return {"data": data, "etag": make_etag(data, media_type)}
+
+
+def conditional_response(
+    request: HttpRequest, entry: dict, version: int, response
+) -> HttpResponseBase:
+    """
+    Adds the validators of the cached entry to the response, or
+    replaces it with 304 Not Modified if the client's copy is current.
+    """
+    last_modified = version // 10**9
+    response.headers["ETag"] = entry["etag"]
+    response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, public=True, no_cache=True)
+    patch_vary_headers(response, ["Accept"])
+    return get_conditional_response(
+        request,
+        etag=entry["etag"],
+        last_modified=last_modified,
+        response=response,
+    )
+
+
+async def acached_response(request: HttpRequest, build_data):
+    """
+    CatalogueCacheMixin.cached_response for async views: build_data is
+    a coroutine function returning the data to cache, and the response
+    is rendered JSON.
+    """
+    media_type = ORJSONRenderer.media_type
+    version = await aget_catalogue_version()
+    key = get_response_key(request, version, media_type)
+
+    entry = await cache.aget(key)
+    catalogue_cache.record(entry is not None)
+    if entry is None:
+        entry = make_entry(await build_data(), media_type)
+        await cache.aset(key, entry, settings.BOOK_CACHE_TIMEOUT)
+
+    return conditional_response(
+        request, entry, version, render_json(entry["data"])
+    )
+
+
+class CatalogueCacheMixin:
+    """
+    Serves safe requests from a response cache keyed by the catalogue
+    version, the full request path and the accepted media type, and
+    answers conditional requests (If-None-Match / If-Modified-Since)
+    with 304 Not Modified.
+    """
+
+    def cached_response(
+        self, request: HttpRequest, build_response
+    ) -> HttpResponseBase:
+        media_type = request.accepted_media_type
+        version = get_catalogue_version()
+        key = get_response_key(request, version, media_type)
+
+        entry = cache.get(key)
+        catalogue_cache.record(entry is not None)
+        if entry is None:
+            response = build_response()
+            if response.status_code != 200:
+                return response
+            entry = make_entry(response.data, media_type)
+            cache.set(key, entry, settings.BOOK_CACHE_TIMEOUT)
+
+        return conditional_response(
+            request, entry, version, Response(entry["data"])
+        )
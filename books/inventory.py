@@ -0,0 +1,205 @@
+import random
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+
+from books.cache import bump_catalogue_version
+from books.models import Book, BookInventorySlot
+from monitoring.metrics import inventory_lock_wait
+
+
+def distribute(book_id: int, available: int) -> None:
+    """
+    Spreads ``available`` copies of the book over INVENTORY_SLOTS slots,
+    as evenly as possible.
+
+    The existing slot rows are updated in place, and only missing or
+    extra slots are inserted or deleted: a borrow waiting on a locked
+    slot re-reads that row once this commits (on READ COMMITTED), and
+    would find nothing if the rows were replaced.
+    """
+    slots = settings.INVENTORY_SLOTS
+    base, extra = divmod(available, slots)
+    wanted = {slot: base + (slot < extra) for slot in range(slots)}
+    with transaction.atomic():
+        existing = set(
+            BookInventorySlot.objects.select_for_update()
+            .filter(book_id=book_id)
+            .order_by("id")
+            .values_list("slot", flat=True)
+        )
+        kept = {
+            slot: count for slot, count in wanted.items() if slot in existing
+        }
+        if kept:
+            BookInventorySlot.objects.filter(
+                book_id=book_id, slot__in=kept
+            ).update(
+                available=Case(
+                    *(
+                        When(slot=slot, then=Value(count))
+                        for slot, count in kept.items()
+                    ),
+                    output_field=IntegerField(),
+                )
+            )
+        BookInventorySlot.objects.filter(book_id=book_id).exclude(
+            slot__in=wanted
+        ).delete()
+        BookInventorySlot.objects.bulk_create(
+            BookInventorySlot(book_id=book_id, slot=slot, available=count)
+            for slot, count in wanted.items()
+            if slot not in existing
+        )
+
+
+def available_copies(book_id: int) -> int:
+    return (
+        BookInventorySlot.objects.filter(book_id=book_id).aggregate(
+            total=Sum("available")
+        )["total"]
+        or 0
+    )
+
+
+def reserve_copy(book_id: int) -> bool:
+    """
+    Takes one copy of the book. Returns False if none is left.
+    Must be called inside a transaction, which holds the slot lock.
+
+    A random non-empty slot not locked by another borrow is taken
+    first; only when every non-empty slot is locked does this wait
+    for one, re-checking it once the other borrow commits.
+    """
+    slots = BookInventorySlot.objects.filter(
+        book_id=book_id, available__gt=0
+    ).order_by("?")
+    started = time.perf_counter()
+    slot_id = (
+        slots.select_for_update(skip_locked=True)
+        .values_list("id", flat=True)
+        .first()
+    )
+    mode = "skip_locked"
+    if slot_id is None:
+        slot_id = (
+            slots.select_for_update().values_list("id", flat=True).first()
+        )
+        mode = "wait"
+    inventory_lock_wait.labels(mode).observe(time.perf_counter() - started)
+    if slot_id is None:
+        return False
+    BookInventorySlot.objects.filter(id=slot_id).update(
+        available=F("available") - 1
+    )
+    return True
+
+
+def reserve_copies(wanted: Counter) -> Counter:
+    """
+    Bulk version of reserve_copy for {book id: copies wanted}.
+    Locks every non-empty slot of the books in id order, takes as many
+    copies as are left and returns {book id: copies reserved}.
+    """
+    reserved, taken = Counter(), Counter()
+    started = time.perf_counter()
+    slots = list(
+        BookInventorySlot.objects.select_for_update()
+        .filter(book_id__in=wanted, available__gt=0)
+        .order_by("id")
+        .values_list("id", "book_id", "available")
+    )
+    inventory_lock_wait.labels("bulk").observe(time.perf_counter() - started)
+    for slot_id, book_id, available in slots:
+        count = min(available, wanted[book_id] - reserved[book_id])
+        if count > 0:
+            taken[slot_id] = -count
+            reserved[book_id] += count
+    update_slots(taken)
+    return reserved
+
+
+def release_copy(book_id: int) -> None:
+    release_copies(Counter({book_id: 1}))
+
+
+def release_copies(returned: Counter) -> None:
+    """
+    Puts copies back into a random slot of each book, with a single
+    ``UPDATE ... SET available = available + CASE book_id ... END``.
+    """
+    returned = {book_id: count for book_id, count in returned.items() if count}
+    if not returned:
+        return
+    slot = random.randrange(settings.INVENTORY_SLOTS)
+    updated = BookInventorySlot.objects.filter(
+        book_id__in=returned, slot=slot
+    ).update(available=F("available") + delta_case("book_id", returned))
+    if updated < len(returned):
+        # Books sharded with a different INVENTORY_SLOTS may miss the
+        # slot; every book always has slot 0.
+        missing = returned.keys() - set(
+            BookInventorySlot.objects.filter(
+                book_id__in=returned, slot=slot
+            ).values_list("book_id", flat=True)
+        )
+        BookInventorySlot.objects.filter(book_id__in=missing, slot=0).update(
+            available=F("available")
+            + delta_case("book_id", {b: returned[b] for b in missing})
+        )
+
+
+def update_slots(deltas: Counter) -> None:
+    """
+    Applies {slot id: change in available copies} in one UPDATE.
+    """
+    if deltas:
+        BookInventorySlot.objects.filter(id__in=deltas).update(
+            available=F("available") + delta_case("id", deltas)
+        )
+
+
+def delta_case(field: str, deltas: dict) -> Case:
+    return Case(
+        *(
+            When(**{field: key}, then=Value(delta))
+            for key, delta in deltas.items()
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def refresh_inventory() -> int:
+    """
+    Sets Book.inventory to the sum of its slots for every book where
+    they differ. Returns the number of updated books.
+    """
+    available = Coalesce(
+        Subquery(
+            BookInventorySlot.objects.filter(book=OuterRef("pk"))
+            .values("book")
+            .annotate(total=Sum("available"))
+            .values("total")
+        ),
+        0,
+    )
+    updated = Book.objects.exclude(inventory=available).update(
+        inventory=available
+    )
+    if updated:
+        transaction.on_commit(bump_catalogue_version)
+    return updated
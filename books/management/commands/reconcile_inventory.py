@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from books.inventory import distribute, refresh_inventory
+from books.models import Book, BookInventorySlot
+
+
+def get_inventory_report():
+    """
+    Books annotated with the copies in their slots, the number of
+    slots and their active borrowings, read in a single statement so
+    concurrent borrows cannot skew the comparison.
+    """
+    slots = BookInventorySlot.objects.filter(book=OuterRef("pk")).values(
+        "book"
+    )
+    return (
+        Book.objects.annotate(
+            available=Coalesce(
+                Subquery(
+                    slots.annotate(total=Sum("available")).values("total")
+                ),
+                0,
+            ),
+            slots=Coalesce(
+                Subquery(
+                    slots.annotate(total=Count("id")).values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            ),
+            active=Count(
+                "borrowings", filter=Q(borrowings__actual_return_date=None)
+            ),
+        )
+        .order_by("id")
+        .values_list("id", "title", "stock", "available", "slots", "active")
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify that every book's inventory slots plus its active "
+        "borrowings add up to its stock."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Re-shard mismatched books to stock minus active "
+            "borrowings and refresh Book.inventory.",
+        )
+        parser.add_argument(
+            "--recount-stock",
+            action="store_true",
+            help="Trust the slots instead and set stock to available "
+            "plus active borrowings, e.g. after loaddata.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched = 0
+        for book_id, title, stock, available, slots, active in (
+            get_inventory_report()
+        ):
+            if (
+                available + active == stock
+                and slots == settings.INVENTORY_SLOTS
+            ):
+                continue
+            mismatched += 1
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Book #{book_id} '{title}': {available} in "
+                    f"{slots} slots + {active} borrowed != {stock} in stock"
+                )
+            )
+            if options["recount_stock"]:
+                Book.objects.filter(id=book_id).update(
+                    stock=available + active
+                )
+            elif options["fix"]:
+                distribute(book_id, max(stock - active, 0))
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS("All inventories match."))
+            return
+        if not (options["fix"] or options["recount_stock"]):
+            raise CommandError(f"{mismatched} books have mismatched slots.")
+
+        with transaction.atomic():
+            refresh_inventory()
+        self.stdout.write(self.style.SUCCESS(f"{mismatched} books fixed."))
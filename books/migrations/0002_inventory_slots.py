@@ -0,0 +1,76 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# INVENTORY_SLOTS when this migration was written, so that replaying it
+# does not depend on the environment. Books sharded with another count
+# are handled at runtime and re-sharded by reconcile_inventory --fix.
+SLOTS = 8
+
+
+def shard_inventory(apps, schema_editor):
+    Book = apps.get_model("books", "Book")
+    BookInventorySlot = apps.get_model("books", "BookInventorySlot")
+    books = Book.objects.annotate(
+        active=Count("borrowings", filter=Q(borrowings__actual_return_date=None))
+    )
+    for book in books.iterator():
+        base, extra = divmod(book.inventory, SLOTS)
+        BookInventorySlot.objects.bulk_create(
+            BookInventorySlot(
+                book_id=book.id, slot=slot, available=base + (slot < extra)
+            )
+            for slot in range(SLOTS)
+        )
+        book.stock = book.inventory + book.active
+        book.save(update_fields=["stock"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0001_initial"),
+        ("borrowings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="stock",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="BookInventorySlot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slot", models.PositiveSmallIntegerField()),
+                ("available", models.PositiveIntegerField(default=0)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inventory_slots",
+                        to="books.book",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("book", "slot"), name="inventory_slot_book_slot_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(shard_inventory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:22
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_SEARCH_OBJECTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE FUNCTION books_book_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(NEW.author, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER books_book_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, author, search_vector ON books_book
+    FOR EACH ROW EXECUTE FUNCTION books_book_search_vector_update()
+    """,
+    # Fires the trigger for existing rows.
+    "UPDATE books_book SET search_vector = NULL",
+    "CREATE INDEX book_search_vector_idx ON books_book USING gin (search_vector)",
+    "CREATE INDEX book_title_trgm_idx ON books_book USING gin (title gin_trgm_ops)",
+    "CREATE INDEX book_author_trgm_idx ON books_book "
+    "USING gin (author gin_trgm_ops)",
+]
+
+DROP_SEARCH_OBJECTS = [
+    "DROP INDEX IF EXISTS book_author_trgm_idx",
+    "DROP INDEX IF EXISTS book_title_trgm_idx",
+    "DROP INDEX IF EXISTS book_search_vector_idx",
+    "DROP TRIGGER IF EXISTS books_book_search_vector_trigger ON books_book",
+    "DROP FUNCTION IF EXISTS books_book_search_vector_update()",
+]
+
+
+def run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_inventory_slots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            run_on_postgres(CREATE_SEARCH_OBJECTS),
+            run_on_postgres(DROP_SEARCH_OBJECTS),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# The author filter (author__icontains) compiles to
+# UPPER(author::text) LIKE UPPER(%s), which only an index on that
+# expression can serve; the plain trigram index on author was unused.
+CREATE_INDEX = [
+    "DROP INDEX IF EXISTS book_author_trgm_idx",
+    "CREATE INDEX book_author_upper_trgm_idx ON books_book "
+    "USING gin (UPPER(author::text) gin_trgm_ops)",
+]
+
+DROP_INDEX = [
+    "DROP INDEX IF EXISTS book_author_upper_trgm_idx",
+    "CREATE INDEX book_author_trgm_idx ON books_book "
+    "USING gin (author gin_trgm_ops)",
+]
+
+
+def run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgres(CREATE_INDEX), run_on_postgres(DROP_INDEX)
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -11,11 +12,59 @@ class Book(models.Model):
     cover = models.CharField(
         max_length=32, choices=CoverType.choices, default=CoverType.SOFT
     )
+    # Copies available for borrowing. Borrows and returns change the
+    # book's BookInventorySlot rows, and this aggregate is refreshed
+    # from them periodically (books.tasks.refresh_inventory).
     inventory = models.PositiveIntegerField()
+    # Copies the library owns: available copies plus active borrowings.
+    stock = models.PositiveIntegerField(default=0)
     daily_fee = models.DecimalField(decimal_places=2, max_digits=8)
+    # Maintained by a PostgreSQL trigger from title and author. It and
+    # the search indexes are created by 0003_book_search on PostgreSQL
+    # only, so they are not declared in Meta.indexes.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["title"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_inventory = instance.__dict__.get("inventory")
+        return instance
+
+    def inventory_changed(self) -> bool:
+        """
+        Whether inventory was set explicitly since the book was loaded,
+        e.g. by an admin, as opposed to being unchanged on save.
+        """
+        if hasattr(self.inventory, "resolve_expression"):
+            return False
+        return int(self.inventory) != getattr(self, "_loaded_inventory", None)
+
     def __str__(self):
         return self.title
+
+
+class BookInventorySlot(models.Model):
+    """
+    One shard of a book's available copies. Borrows take a copy from
+    a random non-empty slot, skipping slots locked by other borrows,
+    so concurrent borrows of one title do not queue on a single row.
+    """
+
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="inventory_slots"
+    )
+    slot = models.PositiveSmallIntegerField()
+    available = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["book", "slot"], name="inventory_slot_book_slot_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.book_id}/{self.slot}: {self.available}"
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+
+# Text search configuration used by the search_vector trigger
+# (books/migrations/0003_book_search.py); keep them in sync.
+SEARCH_CONFIG = "english"
+
+
+def search_books(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    The BOOK_SEARCH_LIMIT best matches for ``query``.
+
+    On PostgreSQL, books match on the title+author ``search_vector``
+    (GIN index) or on trigram similarity of the title (trigram GIN
+    index), so typos still find the book. Full-text matches rank first,
+    then fuzzy ones by similarity. Other databases fall back to a
+    case-insensitive substring match ordered by title.
+    """
+    if connection.vendor != "postgresql":
+        return queryset.filter(
+            Q(title__icontains=query) | Q(author__icontains=query)
+        ).order_by("title", "id")[: settings.BOOK_SEARCH_LIMIT]
+
+    search_query = SearchQuery(
+        query, search_type="websearch", config=SEARCH_CONFIG
+    )
+    return (
+        queryset.filter(
+            Q(search_vector=search_query) | Q(title__trigram_similar=query)
+        )
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            similarity=TrigramSimilarity("title", query),
+        )
+        .order_by("-rank", "-similarity", "id")[: settings.BOOK_SEARCH_LIMIT]
+    )
@@ -6,4 +6,13 @@ from books.models import Book
 class BookSerializer(ModelSerializer):
     class Meta:
         model = Book
-        fields = ("id", "title", "author", "cover", "inventory", "daily_fee")
+        fields = (
+            "id",
+            "title",
+            "author",
+            "cover",
+            "inventory",
+            "stock",
+            "daily_fee",
+        )
+        read_only_fields = ("stock",)
@@ -0,0 +1,44 @@
+from typing import Type
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from books.cache import bump_catalogue_version
+from books.inventory import distribute
+from books.models import Book
+from borrowings.models import Borrowing
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def book_changed(sender: Type[Book], instance: Book, **kwargs) -> None:
+    # Borrows and returns change inventory slots instead of the book;
+    # their effect reaches the catalogue through refresh_inventory.
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(post_save, sender=Book)
+def book_inventory_set(
+    sender: Type[Book],
+    instance: Book,
+    created: bool,
+    update_fields: frozenset | None,
+    **kwargs,
+) -> None:
+    """
+    Re-shards the available copies when a book is created or its
+    inventory is set explicitly (e.g. by an admin), and recounts stock.
+    """
+    if update_fields is not None and "inventory" not in update_fields:
+        return
+    if not (created or instance.inventory_changed()):
+        return
+    instance.inventory = int(instance.inventory)
+    distribute(instance.id, instance.inventory)
+    active = Borrowing.objects.filter(
+        book=instance, actual_return_date=None
+    ).count()
+    instance.stock = instance.inventory + active
+    Book.objects.filter(id=instance.id).update(stock=instance.stock)
+    instance._loaded_inventory = instance.inventory
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from books.inventory import refresh_inventory
+
+
+@shared_task
+def refresh_book_inventory() -> str:
+    return f"{refresh_inventory()} book inventories refreshed."
@@ -0,0 +1,172 @@
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from books.inventory import (
+    available_copies,
+    distribute,
+    refresh_inventory,
+    release_copy,
+    reserve_copies,
+    reserve_copy,
+)
+from books.models import Book, BookInventorySlot
+from borrowings.models import Borrowing
+
+
+@override_settings(INVENTORY_SLOTS=4)
+class TestInventory(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=6,
+            daily_fee=Decimal("1.00"),
+        )
+
+    def test_new_book_is_sharded(self):
+        self.assertEqual(
+            list(
+                self.book.inventory_slots.order_by("slot").values_list(
+                    "available", flat=True
+                )
+            ),
+            [2, 2, 1, 1],
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.stock, 6)
+
+    def test_reserve_until_empty_and_release(self):
+        for _ in range(6):
+            self.assertTrue(reserve_copy(self.book.id))
+        self.assertFalse(reserve_copy(self.book.id))
+        self.assertEqual(available_copies(self.book.id), 0)
+
+        release_copy(self.book.id)
+        self.assertEqual(available_copies(self.book.id), 1)
+
+    def test_reserve_copies_takes_what_is_left(self):
+        reserved = reserve_copies(Counter({self.book.id: 10}))
+        self.assertEqual(reserved, Counter({self.book.id: 6}))
+        self.assertEqual(available_copies(self.book.id), 0)
+
+    def get_slots(self) -> dict:
+        return dict(
+            self.book.inventory_slots.values_list("slot", "id").order_by(
+                "slot"
+            )
+        )
+
+    def test_reshard_updates_slots_in_place(self):
+        slots = self.get_slots()
+
+        distribute(self.book.id, 9)
+        self.assertEqual(self.get_slots(), slots)
+        self.assertEqual(available_copies(self.book.id), 9)
+
+        with override_settings(INVENTORY_SLOTS=2):
+            distribute(self.book.id, 9)
+        self.assertEqual(self.get_slots(), {0: slots[0], 1: slots[1]})
+
+        distribute(self.book.id, 9)
+        self.assertEqual(
+            {slot: pk for slot, pk in self.get_slots().items() if slot < 2},
+            {0: slots[0], 1: slots[1]},
+        )
+        self.assertEqual(available_copies(self.book.id), 9)
+
+    def test_reserve_alongside_reshard(self):
+        # The rows a reserve_copy waiting on the re-shard's locks has
+        # selected: once the re-shard commits, PostgreSQL re-reads them
+        # and re-checks available > 0.
+        waiting_for = list(
+            self.book.inventory_slots.filter(available__gt=0).values_list(
+                "id", flat=True
+            )
+        )
+
+        distribute(self.book.id, 3)
+
+        self.assertTrue(
+            BookInventorySlot.objects.filter(
+                id__in=waiting_for, available__gt=0
+            ).exists()
+        )
+        for _ in range(3):
+            self.assertTrue(reserve_copy(self.book.id))
+        self.assertFalse(reserve_copy(self.book.id))
+
+    def test_refresh_inventory_updates_aggregate(self):
+        reserve_copy(self.book.id)
+        self.assertEqual(refresh_inventory(), 1)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 5)
+        self.assertEqual(refresh_inventory(), 0)
+
+    def test_setting_inventory_reshards_and_recounts_stock(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass12345"
+        )
+        reserve_copy(self.book.id)
+        Borrowing.objects.create(
+            user=user,
+            book=self.book,
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=1),
+        )
+        book = Book.objects.get(id=self.book.id)
+        book.title = "Renamed"
+        book.save()
+        self.assertEqual(available_copies(book.id), 5)
+
+        book.inventory = 9
+        book.save()
+        self.assertEqual(available_copies(book.id), 9)
+        book.refresh_from_db()
+        self.assertEqual(book.stock, 10)
+
+
+@override_settings(INVENTORY_SLOTS=4)
+class TestReconcileInventory(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=6,
+            daily_fee=Decimal("1.00"),
+        )
+
+    def test_matching_inventory_passes(self):
+        out = StringIO()
+        call_command("reconcile_inventory", stdout=out)
+        self.assertIn("All inventories match.", out.getvalue())
+
+    def test_mismatch_is_reported_and_fixed(self):
+        BookInventorySlot.objects.filter(book=self.book, slot=0).update(
+            available=0
+        )
+        with self.assertRaises(CommandError):
+            call_command("reconcile_inventory", stdout=StringIO())
+
+        call_command("reconcile_inventory", "--fix", stdout=StringIO())
+
+        self.assertEqual(available_copies(self.book.id), 6)
+        call_command("reconcile_inventory", stdout=StringIO())
+
+    def test_recount_stock_trusts_slots(self):
+        Book.objects.filter(id=self.book.id).update(stock=0)
+
+        call_command(
+            "reconcile_inventory", "--recount-stock", stdout=StringIO()
+        )
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.stock, 6)
+        self.assertEqual(available_copies(self.book.id), 6)
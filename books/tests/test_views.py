@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient, APITestCase
@@ -13,6 +14,7 @@ class TestViews(APITestCase):
         cls.client = APIClient()
 
     def setUp(self):
+        cache.clear()
         self.user = get_user_model().objects.create_superuser(
             email="user@admin.com", password="testuser123"
         )
@@ -101,3 +103,101 @@ class TestViews(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(Book.objects.count(), 1)
+
+    def test_list_books_answers_conditional_requests(self):
+        Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=10,
+            daily_fee="1.00",
+        )
+        url = reverse("books:book-list")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response.headers)
+        self.assertIn("Last-Modified", response.headers)
+
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response.headers["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_representations_get_different_etags(self):
+        url = reverse("books:book-list")
+        json_response = self.client.get(url, HTTP_ACCEPT="application/json")
+        html_response = self.client.get(url, HTTP_ACCEPT="text/html")
+
+        self.assertEqual(
+            html_response["Content-Type"], "text/html; charset=utf-8"
+        )
+        self.assertNotEqual(json_response["ETag"], html_response["ETag"])
+
+        response = self.client.get(
+            url,
+            HTTP_ACCEPT="application/json",
+            HTTP_IF_NONE_MATCH=html_response["ETag"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_book_change_invalidates_cached_list(self):
+        book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=10,
+            daily_fee="1.00",
+        )
+        url = reverse("books:book-list")
+        etag = self.client.get(url).headers["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("books:book-detail", kwargs={"pk": book.pk}),
+                data={"title": "New Title"},
+            )
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertContains(response, "New Title")
+
+    def test_list_books_filters(self):
+        for title, author, cover, inventory in [
+            ("Dune", "Frank Herbert", "HARD", 3),
+            ("Children of Dune", "Frank Herbert", "SOFT", 0),
+            ("Hyperion", "Dan Simmons", "SOFT", 2),
+        ]:
+            Book.objects.create(
+                title=title,
+                author=author,
+                cover=cover,
+                inventory=inventory,
+                daily_fee="1.00",
+            )
+        url = reverse("books:book-list")
+        testcases = [
+            ({"search": "dune"}, ["Children of Dune", "Dune"]),
+            ({"search": "simmons"}, ["Hyperion"]),
+            ({"author": "herbert"}, ["Children of Dune", "Dune"]),
+            ({"cover": "SOFT"}, ["Children of Dune", "Hyperion"]),
+            ({"available": "1"}, ["Dune", "Hyperion"]),
+            ({"available": "0"}, ["Children of Dune"]),
+            ({"search": "dune", "available": "1"}, ["Dune"]),
+        ]
+        for params, titles in testcases:
+            with self.subTest(params=params):
+                response = self.client.get(url, query_params=params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(
+                    [book["title"] for book in response.data], titles
+                )
+
+        for params in ({"cover": "PAPER"}, {"available": "yes"}):
+            with self.subTest(params=params):
+                response = self.client.get(url, query_params=params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
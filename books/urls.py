@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from books.views import BookViewSet
+from books.views import (
+    BookViewSet,
+    async_book_detail,
+    async_book_list,
+)
 
 
 app_name = "books"
@@ -12,3 +17,9 @@ router.register("", BookViewSet, basename="book")
 urlpatterns = [
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        path("", async_book_list, name="book-list"),
+        path("<int:pk>/", async_book_detail, name="book-detail"),
+    ] + urlpatterns
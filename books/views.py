@@ -1,11 +1,142 @@
+from functools import partial
+
+from django.conf import settings
+from django.shortcuts import aget_object_or_404
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
 
+from books.cache import CatalogueCacheMixin, acached_response
 from books.models import Book
 from books.permissions import IsAdminOrReadOnly
+from books.search import search_books
 from books.serializers import BookSerializer
+from library_service.async_views import async_read_view
+from library_service.db_router import ReplicaReadMixin
 
 
-class BookViewSet(viewsets.ModelViewSet):
-    queryset = Book.objects.all()
+class BookViewSet(
+    ReplicaReadMixin, CatalogueCacheMixin, viewsets.ModelViewSet
+):
+    queryset = Book.objects.defer("search_vector")
     serializer_class = BookSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    query_budgets = {
+        "list": 2,
+        "retrieve": 2,
+        "create": 8,
+        "update": 9,
+        "partial_update": 9,
+        "destroy": 7,
+    }
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+
+        if self.action == "list":
+            author = self.request.query_params.get("author")
+            if author:
+                # Served by the trigram index on UPPER(author).
+                qs = qs.filter(author__icontains=author)
+
+            cover = self.request.query_params.get("cover")
+            if cover:
+                if cover not in Book.CoverType.values:
+                    raise ValidationError("Invalid value for cover")
+                qs = qs.filter(cover=cover)
+
+            available = self.request.query_params.get("available")
+            if available is not None:
+                if available == "1":
+                    qs = qs.filter(inventory__gt=0)
+                elif available == "0":
+                    qs = qs.filter(inventory=0)
+                else:
+                    raise ValidationError("Invalid value for available")
+
+            search = self.request.query_params.get("search")
+            if search:
+                qs = search_books(qs, search)
+
+        return qs
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                description="Full-text search over title and author, "
+                            "tolerant to typos in the title. Returns the "
+                            "best matches first, at most "
+                            f"{settings.BOOK_SEARCH_LIMIT} books.",
+            ),
+            OpenApiParameter(
+                name="author",
+                type=OpenApiTypes.STR,
+                description="Filter by part of the author's name.",
+            ),
+            OpenApiParameter(
+                name="cover",
+                type=OpenApiTypes.STR,
+                enum=Book.CoverType.values,
+                description="Filter by cover type.",
+            ),
+            OpenApiParameter(
+                name="available",
+                type=OpenApiTypes.INT,
+                description="Accepts 1 for books with copies available "
+                            "and 0 for books with none.",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs)
+        )
+
+
+@async_read_view(
+    BookViewSet.as_view(
+        {"get": "list", "post": "create"}, basename="book", detail=False
+    ),
+    permission_classes=BookViewSet.permission_classes,
+    replica=True,
+)
+async def async_book_list(request):
+    view = BookViewSet(request=request, action="list", format_kwarg=None)
+
+    async def build_data():
+        books = [book async for book in view.get_queryset()]
+        return BookSerializer(books, many=True).data
+
+    return await acached_response(request, build_data)
+
+
+@async_read_view(
+    BookViewSet.as_view(
+        {
+            "get": "retrieve",
+            "put": "update",
+            "patch": "partial_update",
+            "delete": "destroy",
+        },
+        basename="book",
+        detail=True,
+    ),
+    permission_classes=BookViewSet.permission_classes,
+    replica=True,
+)
+async def async_book_detail(request, pk):
+    view = BookViewSet(request=request, action="retrieve", format_kwarg=None)
+
+    async def build_data():
+        book = await aget_object_or_404(view.get_queryset(), pk=pk)
+        return BookSerializer(book).data
+
+    return await acached_response(request, build_data)
@@ -0,0 +1,139 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from books.models import BookInventorySlot
+from borrowings.models import Borrowing
+from payments.models import Payment
+
+INDEX_SCAN_MARKERS = (
+    "Index Scan",
+    "Index Only Scan",
+    "Bitmap Index Scan",
+    "USING INDEX",
+    "USING COVERING INDEX",
+    "USING PRIMARY KEY",
+)
+
+
+def get_hot_queries() -> list[tuple[str, object, str]]:
+    """
+    (description, queryset, expected index) for the queries that run
+    on every request or job, with parameters taken from existing rows.
+    """
+    user_id = (
+        Borrowing.objects.values_list("user_id", flat=True).first() or 0
+    )
+    book_id = Borrowing.objects.values_list("book_id", flat=True).first() or 0
+    session_id = (
+        Payment.objects.values_list("session_id", flat=True).first() or ""
+    )
+    page_size = settings.API_PAGE_SIZE + 1
+    return [
+        (
+            "BorrowingViewSet.list (staff page)",
+            Borrowing.objects.order_by("-borrow_date", "-id")[:page_size],
+            "borrowing_borrow_date_id_idx",
+        ),
+        (
+            "BorrowingViewSet.list (user page)",
+            Borrowing.objects.filter(user=user_id).order_by(
+                "-borrow_date", "-id"
+            )[:page_size],
+            "borrowing_user_date_id_idx",
+        ),
+        (
+            "BorrowingViewSet.list (user, is_active=1)",
+            Borrowing.objects.filter(user=user_id, actual_return_date=None),
+            "borrowing_active_user_idx",
+        ),
+        (
+            "reserve_copy",
+            BookInventorySlot.objects.filter(book=book_id, available__gt=0),
+            "inventory_slot_book_slot_uniq",
+        ),
+        (
+            "send_overdue_borrowings",
+            Borrowing.objects.filter(
+                actual_return_date=None,
+                expected_return_date__lte=date.today(),
+            ),
+            "borrowing_active_due_idx",
+        ),
+        (
+            "mark_paid / payment_success",
+            Payment.objects.filter(
+                session_id=session_id, status=Payment.PaymentStatus.PENDING
+            ),
+            "payment_session_id_uniq",
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot borrowing and payment queries and report "
+        "whether each one is served by its index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE (PostgreSQL only).",
+        )
+        parser.add_argument(
+            "--no-seqscan",
+            action="store_true",
+            help="Disable sequential scans for the session, so small "
+            "development tables still show whether an index is usable "
+            "(PostgreSQL only).",
+        )
+        parser.add_argument(
+            "--verbose-plan",
+            action="store_true",
+            help="Print the full query plan for every query.",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Exit with an error if any query misses its index.",
+        )
+
+    def handle(self, *args, **options):
+        is_postgres = connection.vendor == "postgresql"
+        explain_options = {}
+        if options["analyze"] and is_postgres:
+            explain_options["analyze"] = True
+
+        missed = 0
+        with transaction.atomic():
+            if options["no_seqscan"] and is_postgres:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for description, queryset, index in get_hot_queries():
+                plan = queryset.explain(**explain_options)
+                if index in plan:
+                    style, verdict = self.style.SUCCESS, f"uses {index}"
+                elif any(marker in plan for marker in INDEX_SCAN_MARKERS):
+                    style, verdict = (
+                        self.style.WARNING,
+                        f"uses another index instead of {index}",
+                    )
+                    missed += 1
+                else:
+                    style, verdict = (
+                        self.style.ERROR,
+                        f"does not use an index (expected {index})",
+                    )
+                    missed += 1
+
+                self.stdout.write(style(f"{description}: {verdict}"))
+                if options["verbose_plan"]:
+                    self.stdout.write(plan + "\n")
+
+        if missed and options["strict"]:
+            raise CommandError(f"{missed} hot queries missed their index.")
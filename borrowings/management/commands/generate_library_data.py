@@ -0,0 +1,484 @@
+import multiprocessing
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate, batched
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from books.cache import bump_catalogue_version
+from books.models import Book, BookInventorySlot
+from borrowings.models import Borrowing
+from payments.models import Payment
+
+WORDS = (
+    "shadow river empire silent garden winter storm crown glass night "
+    "iron forest secret machine ocean fire memory stone kingdom dream "
+    "city ghost summer island mountain letter bridge star wolf clock "
+    "harbor desert mirror queen house journey thunder lantern song map"
+).split()
+FIRST_NAMES = (
+    "Ada Boris Clara Dmitri Elena Frank Grace Hiro Ines Jonas Kira Liam "
+    "Maya Nikolai Olga Pavel Quinn Rosa Samuel Tara Ursula Victor Wen"
+).split()
+LAST_NAMES = (
+    "Adler Brandt Castillo Dumas Eriksen Fischer Gallo Hayes Ivanova "
+    "Jensen Kowalski Laurent Moreau Novak Okafor Petrov Quintero Rossi "
+    "Sato Tanaka Ueda Varga Weber Yilmaz Zielinski"
+).split()
+BOOK_FIELDS = (
+    "id",
+    "title",
+    "author",
+    "cover",
+    "inventory",
+    "stock",
+    "daily_fee",
+)
+USER_FIELDS = (
+    "id",
+    "email",
+    "password",
+    "first_name",
+    "last_name",
+    "is_staff",
+    "is_superuser",
+    "is_active",
+    "date_joined",
+)
+SLOT_FIELDS = ("book_id", "slot", "available")
+BORROWING_FIELDS = (
+    "id",
+    "user_id",
+    "book_id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+)
+PAYMENT_FIELDS = (
+    "id",
+    "status",
+    "type",
+    "borrowing_id",
+    "session_url",
+    "session_id",
+    "money_to_pay",
+    "paid_at",
+)
+MIN_LOAN_DAYS = 7
+MAX_LOAN_DAYS = 30
+MEAN_LATENESS_DAYS = 5
+
+
+@dataclass
+class Plan:
+    """
+    Everything borrowing workers need, inherited by forked processes.
+    """
+
+    seed: int
+    today: date
+    days: int
+    overdue_rate: float
+    late_rate: float
+    pending_rate: float
+    fine_multiplier: Decimal
+    book_ids: list[int]
+    book_fees: list[Decimal]
+    book_weights: list[float]
+    user_ids: list[int]
+    user_weights: list[float]
+    borrowing_start: int
+    payment_start: int
+
+
+_plan = None
+
+
+def zipf_weights(count: int, exponent: float, rng: random.Random) -> list:
+    """
+    Cumulative Zipf weights in random order: a few items (popular
+    titles, avid readers) get most of the borrowings.
+    """
+    weights = [1 / rank**exponent for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return list(accumulate(weights))
+
+
+def get_next_id(model) -> int:
+    return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+
+def write_rows(model, fields: tuple, rows: Iterable[tuple]) -> int:
+    """
+    Inserts rows of field values with COPY on PostgreSQL and with
+    bulk_create elsewhere. Neither calls save() nor sends signals.
+    """
+    count = 0
+    if connection.vendor == "postgresql":
+        columns = ", ".join(
+            connection.ops.quote_name(model._meta.get_field(name).column)
+            for name in fields
+        )
+        table = connection.ops.quote_name(model._meta.db_table)
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(
+                f"COPY {table} ({columns}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    count += 1
+        return count
+
+    for batch in batched(rows, 5000):
+        model.objects.bulk_create(
+            model(**dict(zip(fields, row))) for row in batch
+        )
+        count += len(batch)
+    return count
+
+
+def paid_at(day: date, rng: random.Random) -> datetime:
+    return datetime.combine(day, datetime.min.time(), timezone.utc) + (
+        timedelta(seconds=rng.randrange(8 * 3600, 20 * 3600))
+    )
+
+
+def generate_borrowings(task: tuple[int, int, int]) -> tuple[int, int]:
+    """
+    Writes borrowings start to start + count of the plan with their
+    payments, in one transaction. Borrowing and payment ids follow
+    from the borrowing's number, so workers never collide.
+    """
+    index, start, count = task
+    plan = _plan
+    rng = random.Random(plan.seed * 1_000_003 + index)
+    books = rng.choices(
+        range(len(plan.book_ids)), cum_weights=plan.book_weights, k=count
+    )
+    users = rng.choices(plan.user_ids, cum_weights=plan.user_weights, k=count)
+    borrowings, payments = [], []
+
+    def add_payment(number, payment_type, borrowing_id, amount, paid_on):
+        payment_id = (
+            plan.payment_start
+            + 2 * number
+            + (payment_type == Payment.PaymentType.FINE)
+        )
+        session_id = f"cs_generated_{payment_id}"
+        pending = rng.random() < plan.pending_rate
+        payments.append(
+            (
+                payment_id,
+                (
+                    Payment.PaymentStatus.PENDING
+                    if pending
+                    else Payment.PaymentStatus.PAID
+                ),
+                payment_type,
+                borrowing_id,
+                f"https://checkout.stripe.com/c/pay/{session_id}",
+                session_id,
+                amount,
+                None if pending else paid_at(paid_on, rng),
+            )
+        )
+
+    for offset in range(count):
+        number = start + offset
+        borrowing_id = plan.borrowing_start + number
+        fee = plan.book_fees[books[offset]]
+        borrowed = plan.today - timedelta(days=rng.randint(0, plan.days))
+        loan_days = rng.randint(MIN_LOAN_DAYS, MAX_LOAN_DAYS)
+        expected = borrowed + timedelta(days=loan_days)
+        returned = late_days = None
+
+        if expected >= plan.today:
+            # Not due yet: some readers bring books back early.
+            elapsed = (plan.today - borrowed).days
+            if elapsed and rng.random() < 0.3:
+                returned = borrowed + timedelta(days=rng.randint(1, elapsed))
+        else:
+            outcome = rng.random()
+            if outcome >= plan.overdue_rate + plan.late_rate:
+                returned = borrowed + timedelta(days=rng.randint(1, loan_days))
+            elif outcome >= plan.overdue_rate:
+                late_days = min(
+                    1 + int(rng.expovariate(1 / MEAN_LATENESS_DAYS)),
+                    (plan.today - expected).days,
+                )
+                returned = expected + timedelta(days=late_days)
+
+        borrowings.append(
+            (
+                borrowing_id,
+                users[offset],
+                plan.book_ids[books[offset]],
+                borrowed,
+                expected,
+                returned,
+            )
+        )
+        add_payment(
+            number,
+            Payment.PaymentType.PAYMENT,
+            borrowing_id,
+            fee * loan_days,
+            borrowed,
+        )
+        if late_days:
+            add_payment(
+                number,
+                Payment.PaymentType.FINE,
+                borrowing_id,
+                fee * late_days * plan.fine_multiplier,
+                returned,
+            )
+
+    with transaction.atomic():
+        write_rows(Borrowing, BORROWING_FIELDS, borrowings)
+        write_rows(Payment, PAYMENT_FIELDS, payments)
+    return len(borrowings), len(payments)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate books, users, borrowings and payments at production "
+        "scale, for benchmarks and index tuning: a few titles and "
+        "readers account for most borrowings, some borrowings are "
+        "overdue or were returned late with a fine, and some payments "
+        "are still pending. Rows are written with COPY on PostgreSQL "
+        "(bulk_create elsewhere), borrowings by several processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--borrowings", type=int, default=10_000)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Days of history the borrowings are spread over.",
+        )
+        parser.add_argument(
+            "--overdue-rate",
+            type=float,
+            default=0.05,
+            help="Share of due borrowings not returned yet.",
+        )
+        parser.add_argument(
+            "--late-rate",
+            type=float,
+            default=0.15,
+            help="Share of due borrowings returned late, with a fine.",
+        )
+        parser.add_argument(
+            "--pending-rate",
+            type=float,
+            default=0.05,
+            help="Share of payments not paid yet.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Processes writing borrowings (PostgreSQL only).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50_000,
+            help="Borrowings written per transaction.",
+        )
+        parser.add_argument("--seed", type=int)
+        parser.add_argument(
+            "--password",
+            default="reader12345",
+            help="Password of every generated user.",
+        )
+
+    def handle(self, *args, **options):
+        global _plan
+
+        if options["borrowings"] and not (
+            options["books"] and options["users"]
+        ):
+            raise CommandError("Borrowings need books and users.")
+        if options["overdue_rate"] + options["late_rate"] > 1:
+            raise CommandError(
+                "--overdue-rate and --late-rate add up to more than 1."
+            )
+        seed = options["seed"]
+        if seed is None:
+            seed = random.randrange(2**32)
+        rng = random.Random(seed)
+        started = time.monotonic()
+
+        book_ids, book_fees = self.generate_books(options["books"], rng)
+        user_ids = self.generate_users(
+            options["users"], options["password"], rng
+        )
+        self.log(f"{len(book_ids)} books and {len(user_ids)} users", started)
+
+        _plan = Plan(
+            seed=seed,
+            today=date.today(),
+            days=options["days"],
+            overdue_rate=options["overdue_rate"],
+            late_rate=options["late_rate"],
+            pending_rate=options["pending_rate"],
+            fine_multiplier=Decimal(settings.STRIPE_FINE_MULTIPLIER),
+            book_ids=book_ids,
+            book_fees=book_fees,
+            book_weights=zipf_weights(len(book_ids), 1.1, rng),
+            user_ids=user_ids,
+            user_weights=zipf_weights(len(user_ids), 0.7, rng),
+            borrowing_start=get_next_id(Borrowing),
+            payment_start=get_next_id(Payment),
+        )
+        borrowings, payments = self.generate_borrowings(
+            options["borrowings"], options["batch_size"], options["workers"]
+        )
+        self.log(f"{borrowings} borrowings, {payments} payments", started)
+
+        self.finish(book_ids)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Library data generated in {time.monotonic() - started:.1f}"
+                f"s (seed {seed}). Run refresh_reports to rebuild the "
+                "report summaries."
+            )
+        )
+
+    def log(self, message: str, started: float) -> None:
+        self.stdout.write(f"{message} [{time.monotonic() - started:.1f}s]")
+
+    def generate_books(
+        self, count: int, rng: random.Random
+    ) -> tuple[list[int], list[Decimal]]:
+        """
+        Inserts the books with their available copies sharded into
+        slots. Stock is set once borrowings are known.
+        """
+        start = get_next_id(Book)
+        books, slots = [], []
+        for book_id in range(start, start + count):
+            available = 1 + int(rng.expovariate(1 / 4))
+            title = " ".join(rng.sample(WORDS, rng.randint(1, 4)))
+            books.append(
+                (
+                    book_id,
+                    f"{title.capitalize()} #{book_id}",
+                    f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    rng.choice(Book.CoverType.values),
+                    available,
+                    available,
+                    Decimal(rng.randrange(25, 500, 25)) / 100,
+                )
+            )
+            base, extra = divmod(available, settings.INVENTORY_SLOTS)
+            slots.extend(
+                (book_id, slot, base + (slot < extra))
+                for slot in range(settings.INVENTORY_SLOTS)
+            )
+        with transaction.atomic():
+            write_rows(Book, BOOK_FIELDS, books)
+            write_rows(BookInventorySlot, SLOT_FIELDS, slots)
+        return [book[0] for book in books], [book[6] for book in books]
+
+    def generate_users(
+        self, count: int, password: str, rng: random.Random
+    ) -> list[int]:
+        # Hashing is deliberately slow, so every user shares one hash.
+        password = make_password(password)
+        start = get_next_id(get_user_model())
+        joined = datetime.now(timezone.utc) - timedelta(days=3 * 365)
+        users = [
+            (
+                user_id,
+                f"reader{user_id}@library.example",
+                password,
+                rng.choice(FIRST_NAMES),
+                rng.choice(LAST_NAMES),
+                False,
+                False,
+                True,
+                joined + timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)),
+            )
+            for user_id in range(start, start + count)
+        ]
+        with transaction.atomic():
+            write_rows(get_user_model(), USER_FIELDS, users)
+        return [user[0] for user in users]
+
+    def generate_borrowings(
+        self, count: int, batch_size: int, workers: int
+    ) -> tuple[int, int]:
+        tasks = [
+            (index, start, min(batch_size, count - start))
+            for index, start in enumerate(range(0, count, batch_size))
+        ]
+        if connection.vendor != "postgresql" or workers <= 1:
+            # SQLite allows a single writer at a time.
+            results = map(generate_borrowings, tasks)
+            return tuple(map(sum, zip((0, 0), *results)))
+
+        # Forked workers inherit the plan but must open connections of
+        # their own.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        written = [0, 0]
+        with context.Pool(min(workers, len(tasks))) as pool:
+            for borrowings, payments in pool.imap_unordered(
+                generate_borrowings, tasks
+            ):
+                written[0] += borrowings
+                written[1] += payments
+                if self.verbosity > 1:
+                    self.stdout.write(f"{written[0]}/{count} borrowings")
+        return tuple(written)
+
+    def finish(self, book_ids: list[int]) -> None:
+        """
+        Counts active borrowings into stock, moves id sequences past the
+        explicit ids and refreshes planner statistics.
+        """
+        if book_ids:
+            active = (
+                Borrowing.objects.filter(
+                    book=OuterRef("pk"), actual_return_date=None
+                )
+                .values("book")
+                .annotate(count=Count("id"))
+                .values("count")
+            )
+            Book.objects.filter(
+                id__gte=book_ids[0], id__lte=book_ids[-1]
+            ).update(
+                stock=F("inventory")
+                + Coalesce(Subquery(active, output_field=IntegerField()), 0)
+            )
+
+        models = [Book, get_user_model(), Borrowing, Payment]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+            if connection.vendor == "postgresql":
+                for model in models + [BookInventorySlot]:
+                    cursor.execute(
+                        "ANALYZE "
+                        + connection.ops.quote_name(model._meta.db_table)
+                    )
+        bump_catalogue_version()
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["-borrow_date", "-id"],
+                name="borrowing_borrow_date_id_idx",
+            ),
+        ),
+    ]
@@ -43,6 +43,33 @@ class Borrowing(models.Model):
         validators=[MinValueValidator(date.today)], null=True, blank=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-borrow_date", "-id"],
+                name="borrowing_borrow_date_id_idx",
+            ),
+            models.Index(
+                fields=["user", "-borrow_date", "-id"],
+                name="borrowing_user_date_id_idx",
+            ),
+            models.Index(
+                fields=["user"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_user_idx",
+            ),
+            models.Index(
+                fields=["expected_return_date"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_due_idx",
+            ),
+            models.Index(
+                fields=["actual_return_date"],
+                condition=models.Q(actual_return_date__isnull=False),
+                name="borrowing_returned_idx",
+            ),
+        ]
+
     def clean(self) -> None:
         validate_borrowing_dates(
             self.borrow_date,
@@ -57,5 +84,5 @@ class Borrowing(models.Model):
 
     def __str__(self):
         return (
-            f"User {self.user.id} borrowed {self.book} at {self.borrow_date}"
+            f"User {self.user_id} borrowed {self.book} at {self.borrow_date}"
         )
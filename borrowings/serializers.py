@@ -1,11 +1,15 @@
 from datetime import date
 
+from django.conf import settings
 from django.core.validators import MinValueValidator
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
 
 from books.models import Book
 from books.serializers import BookSerializer
 from borrowings.models import Borrowing, validate_borrowing_dates
+from payments.models import Payment
 from payments.serializers import PaymentSerializer
 
 
@@ -29,6 +33,152 @@ class BorrowingListSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "user", "actual_return_date", "payments")
 
 
+class BorrowingValuesSerializer:
+    """
+    Read-only, lean counterpart of BorrowingListSerializer for list
+    pages fetched with ``.values()``: rows are mapped to the same
+    representation without per-object field machinery, and payments
+    are fetched in one query only when expanded.
+
+    Fields are picked with ``?fields=id,book,...`` and payments are
+    included with ``?expand=payments``.
+    """
+
+    sources = {
+        "id": "id",
+        "user": "user_id",
+        "book": "book__title",
+        "borrow_date": "borrow_date",
+        "expected_return_date": "expected_return_date",
+        "actual_return_date": "actual_return_date",
+    }
+    date_fields = ("borrow_date", "expected_return_date", "actual_return_date")
+    expandable = ("payments",)
+    payment_sources = {
+        field: "borrowing_id" if field == "borrowing" else field
+        for field in PaymentSerializer.Meta.fields
+    }
+
+    def __init__(self, fields: list[str] | None = None, expand=()):
+        self.fields = fields or list(self.sources)
+        self.expand = set(expand)
+
+    @classmethod
+    def from_request(cls, request: Request) -> "BorrowingValuesSerializer":
+        fields = [
+            field
+            for field in request.query_params.get("fields", "").split(",")
+            if field
+        ]
+        unknown = set(fields) - set(cls.sources)
+        if unknown:
+            raise ValidationError(
+                {"fields": f"Unknown fields: {', '.join(sorted(unknown))}."}
+            )
+        expand = [
+            field
+            for field in request.query_params.get("expand", "").split(",")
+            if field
+        ]
+        if set(expand) - set(cls.expandable):
+            expandable = ", ".join(cls.expandable)
+            raise ValidationError(
+                {"expand": f"Only {expandable} can be expanded."}
+            )
+        return cls(fields, expand)
+
+    def get_columns(self, ordering=()) -> list[str]:
+        """
+        values() columns for the selected fields, plus the ordering
+        fields the paginator needs for its cursor.
+        """
+        columns = {self.sources[field] for field in self.fields}
+        columns.update(field.lstrip("-") for field in ordering)
+        columns.add("id")
+        return sorted(columns)
+
+    def to_representation(self, row: dict) -> dict:
+        data = {}
+        for field in self.fields:
+            value = row[self.sources[field]]
+            if field in self.date_fields and value is not None:
+                value = value.isoformat()
+            data[field] = value
+        return data
+
+    def get_payments_queryset(self, borrowing_ids: list[int]):
+        return (
+            Payment.objects.filter(borrowing_id__in=borrowing_ids)
+            .order_by("id")
+            .values(*self.payment_sources.values())
+        )
+
+    def group_payments(
+        self, borrowing_ids: list[int], rows
+    ) -> dict[int, list]:
+        payments = {borrowing_id: [] for borrowing_id in borrowing_ids}
+        for row in rows:
+            payment = {
+                field: row[source]
+                for field, source in self.payment_sources.items()
+            }
+            payment["money_to_pay"] = str(payment["money_to_pay"])
+            payments[row["borrowing_id"]].append(payment)
+        return payments
+
+    def get_payments(self, borrowing_ids: list[int]) -> dict[int, list]:
+        return self.group_payments(
+            borrowing_ids, self.get_payments_queryset(borrowing_ids)
+        )
+
+    async def aget_payments(self, borrowing_ids: list[int]) -> dict[int, list]:
+        rows = self.get_payments_queryset(borrowing_ids)
+        return self.group_payments(borrowing_ids, [row async for row in rows])
+
+    @staticmethod
+    def add_payments(data: list[dict], rows: list[dict], payments) -> None:
+        for item, row in zip(data, rows):
+            item["payments"] = payments[row["id"]]
+
+    def serialize(self, rows: list[dict]) -> list[dict]:
+        data = [self.to_representation(row) for row in rows]
+        if "payments" in self.expand:
+            payments = self.get_payments([row["id"] for row in rows])
+            self.add_payments(data, rows, payments)
+        return data
+
+    async def aserialize(self, rows: list[dict]) -> list[dict]:
+        """
+        serialize() for async views: the payments are fetched with
+        async iteration.
+        """
+        data = [self.to_representation(row) for row in rows]
+        if "payments" in self.expand:
+            payments = await self.aget_payments([row["id"] for row in rows])
+            self.add_payments(data, rows, payments)
+        return data
+
+
+class BorrowingListItemSerializer(serializers.Serializer):
+    """
+    A borrowing of a list page (see BorrowingValuesSerializer), for
+    the API schema: any field may be left out with ``?fields=`` and
+    payments are only included with ``?expand=payments``.
+    """
+
+    id = serializers.IntegerField(required=False)
+    user = serializers.IntegerField(required=False)
+    book = serializers.CharField(
+        required=False, help_text="Title of the book."
+    )
+    borrow_date = serializers.DateField(required=False)
+    expected_return_date = serializers.DateField(required=False)
+    actual_return_date = serializers.DateField(
+        required=False, allow_null=True
+    )
+    payments = PaymentSerializer(many=True, required=False)
+
+
 class BorrowingDetailSerializer(BorrowingListSerializer):
     book = BookSerializer(read_only=True)
 
@@ -50,3 +200,53 @@ class BorrowingCreateSerializer(BorrowingListSerializer):
             serializers.ValidationError,
         )
         return data
+
+
+class BorrowingBulkItemSerializer(serializers.Serializer):
+    """
+    One item of a bulk borrow. The book is resolved by title later,
+    together with the other items, so validation makes no queries.
+    """
+
+    book = serializers.CharField(max_length=255)
+    borrow_date = serializers.DateField(
+        validators=[MinValueValidator(date.today)]
+    )
+    expected_return_date = serializers.DateField(
+        validators=[MinValueValidator(date.today)]
+    )
+
+    def validate(self, data):
+        validate_borrowing_dates(
+            data["borrow_date"],
+            data["expected_return_date"],
+            None,
+            serializers.ValidationError,
+        )
+        return data
+
+
+class BorrowingBulkCreateSerializer(serializers.Serializer):
+    items = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False
+    )
+
+    def validate_items(self, items):
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"At most {settings.BULK_MAX_ITEMS} items are allowed."
+            )
+        return items
+
+
+class BorrowingBulkReturnSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+    def validate_ids(self, ids):
+        if len(ids) > settings.BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"At most {settings.BULK_MAX_ITEMS} ids are allowed."
+            )
+        return ids
@@ -0,0 +1,209 @@
+from collections import Counter
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import QuerySet
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+
+from books.inventory import release_copies, reserve_copies
+from books.models import Book
+from borrowings.models import Borrowing, validate_borrowing_dates
+from borrowings.serializers import BorrowingBulkItemSerializer
+from notifications.tasks import send_new_borrowing
+from outbox.services import enqueue_many
+from payments.models import Payment
+from payments.services import build_checkout_urls, build_pending_payment
+from payments.tasks import create_payment_session
+
+
+def request_payments(
+    request: Request,
+    borrowings: list[Borrowing],
+    payment_type: Payment.PaymentType,
+) -> list[Payment]:
+    """
+    Bulk version of BorrowingViewSet.request_payment: one INSERT for
+    the payments and one for their outbox messages. Every checkout
+    session is created by its own task, so workers create them
+    concurrently once the transaction is committed.
+    """
+    payments = Payment.objects.bulk_create(
+        build_pending_payment(borrowing, payment_type)
+        for borrowing in borrowings
+    )
+    success_url, cancel_url = build_checkout_urls(request)
+    enqueue_many(
+        create_payment_session,
+        [
+            {
+                "payment_id": payment.id,
+                "success_url": success_url,
+                "cancel_url": cancel_url,
+            }
+            for payment in payments
+        ],
+    )
+    return payments
+
+
+def payment_link(request: Request, payment: Payment) -> str:
+    return reverse(
+        "payments:payment-detail", kwargs={"pk": payment.pk}, request=request
+    )
+
+
+def bulk_create_borrowings(request: Request, items: list[dict]) -> list[dict]:
+    """
+    Borrows every valid item in one transaction and returns a result
+    per item, in the order given. Items that fail validation or find
+    no copy left are reported and do not affect the others.
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = BorrowingBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {"status": "error", "errors": serializer.errors}
+
+    books_by_title = {}
+    for book in Book.objects.filter(
+        title__in={data["book"] for _, data in valid}
+    ).only("id", "title", "daily_fee"):
+        books_by_title.setdefault(book.title, []).append(book)
+
+    planned = []
+    for index, data in valid:
+        books = books_by_title.get(data["book"], [])
+        if len(books) != 1:
+            results[index] = {
+                "status": "error",
+                "errors": {
+                    "book": [
+                        f"Object with title={data['book']} "
+                        "does not exist or is ambiguous."
+                    ]
+                },
+            }
+        else:
+            planned.append((index, books[0], data))
+
+    with transaction.atomic():
+        available = reserve_copies(Counter(book.id for _, book, _ in planned))
+        created = []
+        for index, book, data in planned:
+            if available[book.id] < 1:
+                results[index] = {
+                    "status": "error",
+                    "errors": {
+                        "book": [f"No more books '{book.title}' left!"]
+                    },
+                }
+                continue
+            available[book.id] -= 1
+            created.append(
+                (
+                    index,
+                    Borrowing(
+                        user=request.user,
+                        book=book,
+                        borrow_date=data["borrow_date"],
+                        expected_return_date=data["expected_return_date"],
+                    ),
+                )
+            )
+
+        borrowings = Borrowing.objects.bulk_create(
+            borrowing for _, borrowing in created
+        )
+        # bulk_create skips post_save, which enqueues this for create().
+        enqueue_many(
+            send_new_borrowing,
+            [{"borrowing_id": borrowing.id} for borrowing in borrowings],
+        )
+        payments = request_payments(
+            request, borrowings, Payment.PaymentType.PAYMENT
+        )
+
+    for (index, borrowing), payment in zip(created, payments):
+        results[index] = {
+            "status": "created",
+            "id": borrowing.id,
+            "payment": payment_link(request, payment),
+        }
+    return [{"index": index, **result} for index, result in enumerate(results)]
+
+
+def bulk_return_borrowings(
+    request: Request, queryset: QuerySet, ids: list[int]
+) -> list[dict]:
+    """
+    Returns the borrowings with the given ids in one transaction and
+    returns a result per id, in the order given. Overdue returns get
+    a fine payment, as in BorrowingViewSet.return_book.
+    """
+    today = date.today()
+    results = []
+    with transaction.atomic():
+        borrowings = queryset.select_related("book").select_for_update(
+            of=("self",)
+        )
+        borrowings = {
+            borrowing.id: borrowing
+            for borrowing in borrowings.filter(id__in=ids).order_by("id")
+        }
+
+        returned, overdue = [], []
+        for borrowing_id in ids:
+            borrowing = borrowings.get(borrowing_id)
+            if borrowing is None:
+                results.append(
+                    {"status": "error", "errors": {"id": ["Not found."]}}
+                )
+                continue
+            if borrowing.actual_return_date is not None:
+                results.append(
+                    {
+                        "status": "error",
+                        "errors": {
+                            "actual_return_date": [
+                                "The book is already returned."
+                            ]
+                        },
+                    }
+                )
+                continue
+            try:
+                validate_borrowing_dates(
+                    borrowing.borrow_date,
+                    borrowing.expected_return_date,
+                    today,
+                    ValidationError,
+                )
+            except ValidationError as e:
+                results.append({"status": "error", "errors": e.message_dict})
+                continue
+            borrowing.actual_return_date = today
+            returned.append(borrowing)
+            if today > borrowing.expected_return_date:
+                overdue.append(borrowing)
+            results.append({"status": "returned", "id": borrowing_id})
+
+        Borrowing.objects.bulk_update(returned, ["actual_return_date"])
+        release_copies(Counter(b.book_id for b in returned))
+        payments = request_payments(
+            request, overdue, Payment.PaymentType.FINE
+        )
+
+    fines = {
+        payment.borrowing_id: payment_link(request, payment)
+        for payment in payments
+    }
+    for index, result in enumerate(results):
+        if result.get("id") in fines:
+            result["status"] = "overdue, pay the fine with multiplier"
+            result["payment"] = fines[result["id"]]
+    return [{"index": index, **result} for index, result in enumerate(results)]
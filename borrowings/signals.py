@@ -5,6 +5,7 @@ from django.dispatch import receiver
 
 from borrowings.models import Borrowing
 from notifications.tasks import send_new_borrowing
+from outbox.services import enqueue
 
 
 @receiver(post_save, sender=Borrowing)
@@ -12,4 +13,4 @@ def borrowing_created(
     sender: Type[Borrowing], instance: Borrowing, created: bool, **kwargs
 ) -> None:
     if created:
-        send_new_borrowing.delay_on_commit(instance.id)
+        enqueue(send_new_borrowing, borrowing_id=instance.id)
@@ -0,0 +1,109 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import F, Max, Sum
+from django.test import TestCase
+
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.models import Payment
+
+
+class TestExplainHotQueries(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        out = StringIO()
+        call_command("explain_hot_queries", stdout=out)
+        output = out.getvalue()
+        for index in (
+            "borrowing_borrow_date_id_idx",
+            "borrowing_user_date_id_idx",
+            "borrowing_active_user_idx",
+            "borrowing_active_due_idx",
+        ):
+            self.assertIn(f"uses {index}", output)
+
+
+class TestGenerateLibraryData(TestCase):
+    def generate(self, **options):
+        options = {
+            "books": 20,
+            "users": 10,
+            "borrowings": 300,
+            "batch_size": 70,
+            "seed": 1,
+            "stdout": StringIO(),
+            **options,
+        }
+        call_command("generate_library_data", **options)
+
+    def test_generates_consistent_library(self):
+        self.generate(overdue_rate=0.2, late_rate=0.3, pending_rate=0.1)
+
+        self.assertEqual(Book.objects.count(), 20)
+        self.assertEqual(get_user_model().objects.count(), 10)
+        self.assertEqual(Borrowing.objects.count(), 300)
+        for book in Book.objects.annotate(
+            slots=Sum("inventory_slots__available")
+        ):
+            active = book.borrowings.filter(actual_return_date=None).count()
+            self.assertEqual(book.slots, book.inventory)
+            self.assertEqual(book.stock, book.inventory + active)
+
+        today = date.today()
+        self.assertTrue(
+            Borrowing.objects.filter(
+                actual_return_date=None, expected_return_date__lt=today
+            ).exists()
+        )
+        self.assertFalse(
+            Borrowing.objects.filter(
+                actual_return_date__lte=F("borrow_date")
+            ).exists()
+        )
+        self.assertEqual(
+            Payment.objects.filter(type=Payment.PaymentType.PAYMENT).count(),
+            300,
+        )
+        fined = Borrowing.objects.filter(
+            actual_return_date__gt=F("expected_return_date")
+        )
+        self.assertEqual(
+            Payment.objects.filter(type=Payment.PaymentType.FINE).count(),
+            fined.count(),
+        )
+        self.assertGreater(fined.count(), 0)
+        self.assertTrue(
+            Payment.objects.filter(
+                status=Payment.PaymentStatus.PENDING, paid_at=None
+            ).exists()
+        )
+        self.assertFalse(
+            Payment.objects.filter(
+                status=Payment.PaymentStatus.PAID, paid_at=None
+            ).exists()
+        )
+
+    def test_appends_to_existing_data(self):
+        self.generate()
+        self.generate(seed=2)
+
+        self.assertEqual(Book.objects.count(), 40)
+        self.assertEqual(Borrowing.objects.count(), 600)
+        self.assertEqual(
+            Payment.objects.filter(type=Payment.PaymentType.PAYMENT).count(),
+            600,
+        )
+        # Sequences continue after the generated ids.
+        book = Book.objects.create(
+            title="New", author="Author", inventory=1, daily_fee=1
+        )
+        self.assertGreater(
+            book.id,
+            Book.objects.exclude(id=book.id).aggregate(last=Max("id"))["last"],
+        )
+
+    def test_rejects_rates_above_one(self):
+        with self.assertRaises(CommandError):
+            self.generate(overdue_rate=0.6, late_rate=0.6)
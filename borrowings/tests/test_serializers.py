@@ -6,7 +6,11 @@ from django.test import TestCase
 
 from books.models import Book
 from borrowings.models import Borrowing
-from borrowings.serializers import BorrowingListSerializer
+from borrowings.serializers import (
+    BorrowingListSerializer,
+    BorrowingValuesSerializer,
+)
+from payments.models import Payment
 
 
 class TestSerializers(TestCase):
@@ -64,3 +68,27 @@ class TestSerializers(TestCase):
         }
         serializer = BorrowingListSerializer(data=data)
         self.assertFalse(serializer.is_valid())
+
+    def test_values_serializer_matches_list_serializer(self):
+        borrowing = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=1),
+        )
+        Payment.objects.create(
+            borrowing=borrowing,
+            status=Payment.PaymentStatus.PENDING,
+            type=Payment.PaymentType.PAYMENT,
+            money_to_pay=Decimal("1.00"),
+            session_url="https://checkout.stripe.com/test",
+            session_id="test_id",
+        )
+        serializer = BorrowingValuesSerializer(expand=["payments"])
+        rows = Borrowing.objects.values(*serializer.get_columns())
+
+        data = serializer.serialize(list(rows))
+
+        self.assertEqual(
+            data, [dict(BorrowingListSerializer(instance=borrowing).data)]
+        )
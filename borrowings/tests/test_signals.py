@@ -1,13 +1,13 @@
 from datetime import date, timedelta
 from decimal import Decimal
-from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase, override_settings
-from requests import Response
 
 from books.models import Book
 from borrowings.models import Borrowing
+from notifications.tasks import send_new_borrowing
+from outbox.models import OutboxMessage
 
 
 @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
@@ -24,13 +24,24 @@ class TestSignals(TestCase):
             daily_fee=Decimal("1.00"),
         )
 
-    @mock.patch("notifications.tasks.send_new_borrowing.delay_on_commit")
-    def test_borrowing_created(self, mock_sending):
-        mock_sending.return_value = "send"
-        Borrowing.objects.create(
+    def test_borrowing_created_writes_outbox_message(self):
+        borrowing = Borrowing.objects.create(
             user=self.user,
             book=self.book,
             borrow_date=date.today(),
             expected_return_date=date.today() + timedelta(days=1),
         )
-        self.assertEqual(mock_sending.call_count, 1)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.task, send_new_borrowing.name)
+        self.assertEqual(message.kwargs, {"borrowing_id": borrowing.id})
+
+    def test_borrowing_update_writes_no_outbox_message(self):
+        borrowing = Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=1),
+        )
+        borrowing.actual_return_date = date.today() + timedelta(days=1)
+        borrowing.save(update_fields=["actual_return_date"])
+        self.assertEqual(OutboxMessage.objects.count(), 1)
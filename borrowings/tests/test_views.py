@@ -2,18 +2,22 @@ from datetime import date, timedelta
 from decimal import Decimal
 from unittest import mock
 
-import stripe
 from django.contrib.auth import get_user_model
+from django.test import override_settings
+from drf_spectacular.generators import SchemaGenerator
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient, APITestCase
 
+from books.inventory import available_copies
 from books.models import Book
 from borrowings.models import Borrowing
+from outbox.models import OutboxMessage
 from payments.models import Payment
+from payments.tasks import create_payment_session
 
 
-@mock.patch("stripe.checkout.Session.create")
+@mock.patch("payments.services.get_gateway")
 class TestViews(APITestCase):
     @classmethod
     def setUpClass(cls):
@@ -32,12 +36,8 @@ class TestViews(APITestCase):
             email="user@user.com", password="testuser123"
         )
         self.client.force_authenticate(self.user)
-        self.test_stripe_session = stripe.checkout.Session()
-        self.test_stripe_session.id = "test_id"
-        self.test_stripe_session.url = "test_url"
 
-    def test_create_borrowing(self, mock_stripe_create):
-        mock_stripe_create.return_value = self.test_stripe_session
+    def test_create_borrowing(self, mock_get_gateway):
         url = reverse("borrowings:borrowing-list")
         response = self.client.post(
             url,
@@ -50,6 +50,20 @@ class TestViews(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Borrowing.objects.count(), 1)
 
+        payment = Payment.objects.get()
+        self.assertEqual(payment.status, Payment.PaymentStatus.INITIATED)
+        self.assertEqual(
+            response.data["payments"][0]["status"],
+            Payment.PaymentStatus.INITIATED,
+        )
+        self.assertTrue(
+            OutboxMessage.objects.filter(
+                task=create_payment_session.name,
+                kwargs__payment_id=payment.id,
+            ).exists()
+        )
+        mock_get_gateway.assert_not_called()
+
     def test_search_active_borrowings(self, *args):
         Borrowing.objects.create(
             user=self.user,
@@ -119,8 +133,7 @@ class TestViews(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(borrowing.actual_return_date, date.today())
 
-    def test_return_overdue_borrowing_creates_fine(self, mock_stripe_create):
-        mock_stripe_create.return_value = self.test_stripe_session
+    def test_return_overdue_borrowing_creates_fine(self, *args):
         borrowing = Borrowing.objects.create(
             user=self.user,
             book=self.book,
@@ -132,7 +145,210 @@ class TestViews(APITestCase):
         )
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn(
-            Payment.objects.filter(type=Payment.PaymentType.FINE).first(),
-            borrowing.payments.all(),
+        fine = Payment.objects.get(type=Payment.PaymentType.FINE)
+        self.assertIn(fine, borrowing.payments.all())
+        self.assertTrue(response.data["payment"].endswith(f"/{fine.pk}/"))
+
+    @override_settings(API_PAGE_SIZE=2)
+    def test_list_borrowings_is_cursor_paginated(self, *args):
+        borrowings = [
+            Borrowing.objects.create(
+                user=self.user,
+                book=self.book,
+                borrow_date=date.today() - timedelta(days=days % 2),
+                expected_return_date=date.today() + timedelta(days=1),
+            )
+            for days in range(5)
+        ]
+        url = reverse("borrowings:borrowing-list")
+
+        seen = []
+        response = self.client.get(url)
+        self.assertIsNone(response.data["previous"])
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(item["id"] for item in response.data["results"])
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+
+        expected = sorted(
+            borrowings, key=lambda b: (b.borrow_date, b.id), reverse=True
+        )
+        self.assertEqual(seen, [borrowing.id for borrowing in expected])
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], seen[2:4]
+        )
+
+    def test_list_borrowings_sparse_fields_and_expand(self, *args):
+        borrowing = Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            borrow_date=date.today() - timedelta(days=1),
+            expected_return_date=date.today() + timedelta(days=1),
+        )
+        Payment.objects.create(
+            borrowing=borrowing,
+            status=Payment.PaymentStatus.PENDING,
+            type=Payment.PaymentType.PAYMENT,
+            money_to_pay=Decimal("2.00"),
+        )
+        url = reverse("borrowings:borrowing-list")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, query_params={"fields": "id,book"})
+        self.assertEqual(
+            response.data["results"],
+            [{"id": borrowing.id, "book": "TestBook"}],
+        )
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                url, query_params={"expand": "payments"}
+            )
+        item = response.data["results"][0]
+        self.assertEqual(item["book"], "TestBook")
+        self.assertEqual(item["payments"][0]["money_to_pay"], "2.00")
+
+        for params in ({"fields": "id,secret"}, {"expand": "book"}):
+            with self.subTest(params=params):
+                response = self.client.get(url, query_params=params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_list_borrowings_rejects_invalid_cursor(self, *args):
+        url = reverse("borrowings:borrowing-list")
+        response = self.client.get(url, query_params={"cursor": "garbage"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_schema_has_optional_fields(self, *args):
+        schema = SchemaGenerator().get_schema(public=True)
+        item = schema["components"]["schemas"]["BorrowingListItem"]
+        self.assertIn("payments", item["properties"])
+        self.assertNotIn("required", item)
+
+
+@mock.patch("payments.services.get_gateway")
+class TestBulkViews(APITestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="TestBook",
+            author="TestAuthor",
+            cover="SOFT",
+            inventory=2,
+            daily_fee=Decimal("1.00"),
+        )
+        self.other_book = Book.objects.create(
+            title="OtherBook",
+            author="TestAuthor",
+            cover="SOFT",
+            inventory=5,
+            daily_fee=Decimal("1.00"),
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="testuser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def item(self, title):
+        return {
+            "book": title,
+            "borrow_date": str(date.today()),
+            "expected_return_date": str(date.today() + timedelta(days=2)),
+        }
+
+    def test_bulk_create_reports_each_item(self, mock_get_gateway):
+        url = reverse("borrowings:borrowing-bulk-create")
+        items = [
+            self.item("TestBook"),
+            self.item("OtherBook"),
+            self.item("TestBook"),
+            self.item("TestBook"),
+            self.item("Missing"),
+            {"book": "TestBook"},
+        ]
+
+        response = self.client.post(url, {"items": items}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(
+            statuses,
+            ["created", "created", "created", "error", "error", "error"],
+        )
+        self.assertEqual(available_copies(self.book.id), 0)
+        self.assertEqual(available_copies(self.other_book.id), 4)
+        self.assertEqual(Borrowing.objects.count(), 3)
+        self.assertEqual(Payment.objects.count(), 3)
+        self.assertEqual(
+            OutboxMessage.objects.filter(
+                task=create_payment_session.name
+            ).count(),
+            3,
+        )
+        self.assertEqual(
+            OutboxMessage.objects.filter(
+                task="notifications.tasks.send_new_borrowing"
+            ).count(),
+            3,
+        )
+        mock_get_gateway.assert_not_called()
+
+    @override_settings(BULK_MAX_ITEMS=1)
+    def test_bulk_create_limits_batch_size(self, *args):
+        url = reverse("borrowings:borrowing-bulk-create")
+        items = [self.item("TestBook"), self.item("TestBook")]
+
+        response = self.client.post(url, {"items": items}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Borrowing.objects.count(), 0)
+
+    def test_bulk_return(self, *args):
+        on_time, overdue, returned = [
+            Borrowing.objects.create(
+                user=self.user,
+                book=self.book,
+                borrow_date=date.today() - timedelta(days=3),
+                expected_return_date=date.today() + timedelta(days=days),
+                actual_return_date=actual,
+            )
+            for days, actual in [(1, None), (-1, None), (1, date.today())]
+        ]
+        other_user = get_user_model().objects.create_user(
+            email="other@user.com", password="testuser123"
+        )
+        foreign = Borrowing.objects.create(
+            user=other_user,
+            book=self.other_book,
+            borrow_date=date.today() - timedelta(days=3),
+            expected_return_date=date.today() + timedelta(days=1),
+        )
+        url = reverse("borrowings:borrowing-bulk-return")
+
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                url,
+                {"ids": [on_time.id, overdue.id, returned.id, foreign.id]},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data["results"]
+        self.assertEqual(results[0]["status"], "returned")
+        self.assertEqual(
+            results[1]["status"], "overdue, pay the fine with multiplier"
+        )
+        fine = Payment.objects.get(type=Payment.PaymentType.FINE)
+        self.assertEqual(fine.borrowing, overdue)
+        self.assertTrue(results[1]["payment"].endswith(f"/{fine.pk}/"))
+        self.assertEqual(results[2]["status"], "error")
+        self.assertEqual(results[3]["status"], "error")
+
+        self.assertEqual(available_copies(self.book.id), 4)
+        self.assertEqual(
+            Borrowing.objects.filter(actual_return_date=None).count(), 1
         )
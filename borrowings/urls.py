@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from borrowings.views import BorrowingViewSet
+from borrowings.views import (
+    BorrowingViewSet,
+    async_borrowing_detail,
+    async_borrowing_list,
+)
 
 router = DefaultRouter()
 router.register("", BorrowingViewSet, basename="borrowing")
@@ -11,3 +16,11 @@ app_name = "borrowings"
 urlpatterns = [
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        path("", async_borrowing_list, name="borrowing-list"),
+        path(
+            "<int:pk>/", async_borrowing_detail, name="borrowing-detail"
+        ),
+    ] + urlpatterns
@@ -2,7 +2,7 @@ from datetime import date
 
 import django.core.exceptions
 from django.db import transaction
-from django.db.models import F
+from django.shortcuts import aget_object_or_404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
@@ -10,19 +10,49 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
-from books.models import Book
+from books.inventory import release_copy, reserve_copy
 from borrowings.models import Borrowing
+from borrowings.pagination import BorrowingPagination
 from borrowings.serializers import (
     BorrowingListSerializer,
+    BorrowingListItemSerializer,
     BorrowingDetailSerializer,
     BorrowingCreateSerializer,
+    BorrowingBulkCreateSerializer,
+    BorrowingBulkReturnSerializer,
+    BorrowingValuesSerializer,
 )
+from borrowings.services import (
+    bulk_create_borrowings,
+    bulk_return_borrowings,
+)
+from library_service.async_views import async_read_view, render_json
+from library_service.db_router import ReplicaReadMixin
+from outbox.services import enqueue
 from payments.models import Payment
-from payments.services import create_stripe_payment
+from payments.services import build_checkout_urls, create_pending_payment
+from payments.tasks import create_payment_session
+
+
+def bulk_response(results: list[dict], success_status: int) -> Response:
+    """
+    success_status if every item succeeded, 207 if only some did
+    and 400 if none did.
+    """
+    failed = sum(result["status"] == "error" for result in results)
+    if not failed:
+        response_status = success_status
+    elif failed < len(results):
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response({"results": results}, status=response_status)
 
 
 class BorrowingViewSet(
+    ReplicaReadMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -32,12 +62,28 @@ class BorrowingViewSet(
         "payments"
     )
     permission_classes = (IsAuthenticated,)
+    pagination_class = BorrowingPagination
+    # Most queries a request may make, authentication included (see
+    # monitoring.queries). Bulk actions take a constant number of
+    # queries however many items they get.
+    query_budgets = {
+        "list": 3,
+        "retrieve": 3,
+        "create": 10,
+        "return_book": 8,
+        "bulk_create": 9,
+        "bulk_return": 7,
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
             return BorrowingListSerializer
         elif self.action == "retrieve":
             return BorrowingDetailSerializer
+        elif self.action == "bulk_create":
+            return BorrowingBulkCreateSerializer
+        elif self.action == "bulk_return":
+            return BorrowingBulkReturnSerializer
         else:
             return BorrowingCreateSerializer
 
@@ -71,24 +117,65 @@ class BorrowingViewSet(
                             "active (absent actual_return_date = book "
                             "is not returned) or not. Accepts 1 for "
                             "active and 0 for inactive.",
-            )
-        ]
+            ),
+            OpenApiParameter(
+                name="fields",
+                type=OpenApiTypes.STR,
+                description="Comma-separated fields to return, e.g. "
+                            "id,book,expected_return_date. "
+                            "All fields by default.",
+            ),
+            OpenApiParameter(
+                name="expand",
+                type=OpenApiTypes.STR,
+                enum=BorrowingValuesSerializer.expandable,
+                description="Include nested payments.",
+            ),
+        ],
+        responses=BorrowingListItemSerializer(many=True),
+        description="Borrowings with the fields picked by ``fields`` "
+        "(all by default); payments are only included with "
+        "``expand=payments``.",
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        serializer = BorrowingValuesSerializer.from_request(request)
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .values(*serializer.get_columns(self.paginator.ordering))
+        )
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serializer.serialize(page))
+
+    def request_payment(
+        self,
+        borrowing: Borrowing,
+        payment_type: Payment.PaymentType = Payment.PaymentType.PAYMENT,
+    ) -> Payment:
+        """
+        Records a pending payment and leaves the Stripe round trip
+        to a Celery task published through the outbox once the
+        transaction is committed, so no row lock is held while waiting
+        for Stripe.
+        """
+        payment = create_pending_payment(borrowing, payment_type)
+        success_url, cancel_url = build_checkout_urls(self.request)
+        enqueue(
+            create_payment_session,
+            payment_id=payment.id,
+            success_url=success_url,
+            cancel_url=cancel_url,
+        )
+        return payment
 
     def perform_create(self, serializer):
+        book = serializer.validated_data["book"]
         with transaction.atomic():
-            book = Book.objects.select_for_update().get(
-                pk=serializer.validated_data["book"].id
-            )
-            if book.inventory < 1:
+            if not reserve_copy(book.id):
                 raise ValidationError(f"No more books '{book.title}' left!")
-            book.inventory = F("inventory") - 1
-            book.save(update_fields=["inventory"])
 
             borrowing = serializer.save(user=self.request.user)
-            create_stripe_payment(self.request, borrowing)
+            self.request_payment(borrowing)
 
     @action(
         detail=True,
@@ -114,19 +201,98 @@ class BorrowingViewSet(
             except django.core.exceptions.ValidationError as e:
                 raise ValidationError(str(e))
 
-            borrowing.book.inventory = F("inventory") + 1
-            borrowing.book.save(update_fields=["inventory"])
+            release_copy(borrowing.book_id)
             response_text = {"status": "ok"}
 
             if borrowing.actual_return_date > borrowing.expected_return_date:
-                payment = create_stripe_payment(
-                    self.request,
-                    borrowing,
-                    payment_type=Payment.PaymentType.FINE,
+                payment = self.request_payment(
+                    borrowing, payment_type=Payment.PaymentType.FINE
                 )
                 response_text["status"] = (
                     "overdue, pay the fine with multiplier"
                 )
-                response_text["session_url"] = payment.session_url
+                response_text["payment"] = reverse(
+                    "payments:payment-detail",
+                    kwargs={"pk": payment.pk},
+                    request=request,
+                )
 
             return Response(response_text, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=(IsAuthenticated,),
+        url_path="bulk-create",
+        url_name="bulk-create",
+    )
+    def bulk_create(self, request, *args, **kwargs):
+        """
+        Endpoint to borrow several books in one transaction.
+        Takes {"items": [<borrowing>, ...]} and returns a result per
+        item; valid items are borrowed even if others fail (207).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_create_borrowings(
+            request, serializer.validated_data["items"]
+        )
+        return bulk_response(results, status.HTTP_201_CREATED)
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=(IsAuthenticated,),
+        url_path="bulk-return",
+        url_name="bulk-return",
+    )
+    def bulk_return(self, request, *args, **kwargs):
+        """
+        Endpoint to return several borrowed books in one transaction.
+        Takes {"ids": [<borrowing id>, ...]} and returns a result per id.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_return_borrowings(
+            request,
+            self.get_queryset().prefetch_related(None),
+            serializer.validated_data["ids"],
+        )
+        return bulk_response(results, status.HTTP_200_OK)
+
+
+@async_read_view(
+    BorrowingViewSet.as_view(
+        {"get": "list", "post": "create"}, basename="borrowing", detail=False
+    ),
+    permission_classes=BorrowingViewSet.permission_classes,
+    replica=True,
+)
+async def async_borrowing_list(request):
+    view = BorrowingViewSet(request=request, action="list", format_kwarg=None)
+    serializer = BorrowingValuesSerializer.from_request(request)
+    paginator = view.paginator
+    queryset = (
+        view.get_queryset()
+        .prefetch_related(None)
+        .values(*serializer.get_columns(paginator.ordering))
+    )
+    page = await paginator.apaginate_queryset(queryset, request)
+    return render_json(
+        paginator.get_paginated_data(await serializer.aserialize(page))
+    )
+
+
+@async_read_view(
+    BorrowingViewSet.as_view(
+        {"get": "retrieve"}, basename="borrowing", detail=True
+    ),
+    permission_classes=BorrowingViewSet.permission_classes,
+    replica=True,
+)
+async def async_borrowing_detail(request, pk):
+    view = BorrowingViewSet(
+        request=request, action="retrieve", format_kwarg=None
+    )
+    borrowing = await aget_object_or_404(view.get_queryset(), pk=pk)
+    return render_json(BorrowingDetailSerializer(borrowing).data)
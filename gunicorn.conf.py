@@ -0,0 +1,62 @@
+"""
+Gunicorn settings for serving the project in production:
+
+    gunicorn library_service.asgi:application -c gunicorn.conf.py
+
+Every worker process runs one uvicorn event loop, so the number of
+requests a process keeps in flight is not capped by a thread count.
+The WSGI application can be served for comparison with
+GUNICORN_WORKER_CLASS=gthread and GUNICORN_THREADS.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# One event loop per core keeps every core busy.
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count())
+)
+
+worker_class = os.environ.get(
+    "GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker"
+)
+
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+
+graceful_timeout = timeout
+
+keepalive = 5
+
+# Recycle workers now and then, at staggered times, so that slow leaks
+# cannot build up.
+max_requests = 10_000
+
+max_requests_jitter = 1_000
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+
+# Workers write their Prometheus metrics to this directory, and /metrics
+# sums them. It must be set before any worker imports prometheus_client.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "prometheus-gunicorn"),
+)
+
+
+def on_starting(server):
+    # Counters of a previous run would otherwise be added to this one's.
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
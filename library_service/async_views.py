@@ -0,0 +1,121 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from library_service.db_router import ahas_recent_write, replica_reads
+from library_service.renderers import ORJSONRenderer
+from users.authentication import CachedJWTAuthentication
+
+_authentication = CachedJWTAuthentication()
+_renderer = ORJSONRenderer()
+
+
+def render_json(data, status: int = 200) -> HttpResponse:
+    return HttpResponse(
+        _renderer.render(data),
+        status=status,
+        content_type=_renderer.media_type,
+    )
+
+
+def accepts_json(request: HttpRequest) -> bool:
+    """
+    False for requests asking for the browsable API (or any other
+    format), which are left to the sync DRF view.
+    """
+    return (
+        api_settings.URL_FORMAT_OVERRIDE not in request.GET
+        and "text/html" not in request.headers.get("Accept", "")
+    )
+
+
+async def aauthenticate(request: HttpRequest):
+    """
+    CachedJWTAuthentication.authenticate with the user fetched through
+    the async cache and ORM. Returns AnonymousUser when no token is
+    given.
+    """
+    result = await _authentication.aauthenticate(request)
+    if result is None:
+        return AnonymousUser()
+    return result[0]
+
+
+def check_permissions(request: Request, permission_classes) -> None:
+    for permission_class in permission_classes:
+        permission = permission_class()
+        if not permission.has_permission(request, None):
+            if not request.user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied(
+                getattr(permission, "message", None),
+                getattr(permission, "code", None),
+            )
+
+
+def exception_response(request: Request, exc: Exception) -> HttpResponse:
+    """
+    The JSON response APIView.handle_exception would have returned.
+    """
+    if isinstance(
+        exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+    ):
+        exc.auth_header = _authentication.authenticate_header(request)
+    response = api_settings.EXCEPTION_HANDLER(exc, {"request": request})
+    if response is None:
+        raise exc
+    rendered = render_json(response.data, response.status_code)
+    for header in ("WWW-Authenticate", "Retry-After"):
+        if header in response:
+            rendered[header] = response[header]
+    return rendered
+
+
+def async_read_view(sync_view, permission_classes=(), replica=False):
+    """
+    Routes JSON GET requests to the decorated coroutine and everything
+    else (writes, the browsable API) to sync_view, the DRF view serving
+    the same URL.
+
+    The coroutine takes a DRF Request with the JWT-authenticated user
+    already set and the permissions checked, and returns an
+    HttpResponse. DRF exceptions it raises are rendered the way DRF
+    renders them. With replica, its reads go to a read replica unless
+    the user wrote recently.
+    """
+
+    def decorator(view):
+        sync_dispatch = sync_to_async(sync_view)
+
+        @csrf_exempt
+        @wraps(view)
+        async def dispatch(request: HttpRequest, *args, **kwargs):
+            if request.method != "GET" or not accepts_json(request):
+                return await sync_dispatch(request, *args, **kwargs)
+
+            drf_request = Request(request, authenticators=())
+            token = replica_reads.set(False)
+            try:
+                drf_request.user = await aauthenticate(request)
+                check_permissions(drf_request, permission_classes)
+                if replica and not await ahas_recent_write(drf_request.user):
+                    replica_reads.set(True)
+                return await view(drf_request, *args, **kwargs)
+            except Exception as exc:
+                return exception_response(drf_request, exc)
+            finally:
+                replica_reads.reset(token)
+
+        # The view and actions of sync_view, for query budgets.
+        for attribute in ("cls", "actions"):
+            if hasattr(sync_view, attribute):
+                setattr(dispatch, attribute, getattr(sync_view, attribute))
+        return dispatch
+
+    return decorator
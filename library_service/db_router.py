@@ -0,0 +1,153 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+
+# Whether reads of the current request (or task) may go to a replica.
+replica_reads = ContextVar("replica_reads", default=False)
+
+
+def get_read_database() -> str:
+    """
+    A replica, picked at random, or the primary if there is none.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def use_replica():
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a replica inside use_replica() (or a viewset action
+    listed in ReplicaReadMixin.replica_actions), except in a
+    transaction, so that select_for_update() and reads that must see
+    the transaction's own writes stay on the primary. Everything else
+    goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or not replica_reads.get():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return get_read_database()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def get_recent_write_key(user_id: int) -> str:
+    return f"db:recent-write:{user_id}"
+
+
+def has_recent_write(user) -> bool:
+    """
+    Whether the user wrote less than REPLICA_STICKY_SECONDS ago, so
+    that replicas may not have caught up with it yet.
+    """
+    if not settings.DATABASE_REPLICAS or not user.is_authenticated:
+        return False
+    return cache.get(get_recent_write_key(user.pk)) is not None
+
+
+async def ahas_recent_write(user) -> bool:
+    if not settings.DATABASE_REPLICAS or not user.is_authenticated:
+        return False
+    return await cache.aget(get_recent_write_key(user.pk)) is not None
+
+
+def is_write(request, response) -> bool:
+    user = getattr(request, "user", None)
+    return (
+        request.method not in SAFE_METHODS
+        and response.status_code < 400
+        and user is not None
+        and user.is_authenticated
+    )
+
+
+@sync_and_async_middleware
+def recent_write_middleware(get_response):
+    """
+    Remembers for REPLICA_STICKY_SECONDS that the user made a
+    successful write, so that their following reads keep going to the
+    primary (read-your-writes). Unused without replicas.
+    """
+    if not settings.DATABASE_REPLICAS:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            response = await get_response(request)
+            if is_write(request, response):
+                await cache.aset(
+                    get_recent_write_key(request.user.pk),
+                    1,
+                    settings.REPLICA_STICKY_SECONDS,
+                )
+            return response
+
+        return middleware
+
+    def middleware(request):
+        response = get_response(request)
+        if is_write(request, response):
+            cache.set(
+                get_recent_write_key(request.user.pk),
+                1,
+                settings.REPLICA_STICKY_SECONDS,
+            )
+        return response
+
+    return middleware
+
+
+class ReplicaReadMixin:
+    """
+    Runs the replica_actions of a viewset with replica_reads on, unless
+    the user wrote recently.
+    """
+
+    replica_actions = ("list", "retrieve")
+
+    def dispatch(self, request, *args, **kwargs):
+        token = replica_reads.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            replica_reads.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and not has_recent_write(
+            request.user
+        ):
+            replica_reads.set(True)
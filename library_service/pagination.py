@@ -0,0 +1,203 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite, indexed ordering.
+
+    Unlike DRF's CursorPagination, the cursor stores the values of every
+    ordering field, so a page is fetched with a plain
+    ``(a, b) < (x, y)`` style keyset filter and never needs an OFFSET,
+    even when many rows share the first ordering value.
+    The last ordering field must be unique (usually ``id``).
+    """
+
+    ordering = ("-id",)
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor."
+
+    def __init__(self):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request: Request) -> tuple[bool, list] | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()))
+            reverse, position = bool(cursor["r"]), list(cursor["p"])
+        except (BinasciiError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def encode_cursor(self, reverse: bool, position: list) -> str:
+        cursor = json.dumps({"r": int(reverse), "p": position})
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            urlsafe_b64encode(cursor.encode()).decode(),
+        )
+
+    def get_position(self, item) -> list:
+        position = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if isinstance(item, dict):
+                value = item[name]
+            else:
+                value = getattr(item, name)
+            position.append(value if isinstance(value, int) else str(value))
+        return position
+
+    def get_ordering(self, reverse: bool) -> list[str]:
+        if not reverse:
+            return list(self.ordering)
+        return [
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        ]
+
+    @staticmethod
+    def build_keyset_filter(ordering: list[str], position: list) -> Q:
+        """
+        Expand ``(f1, f2, ...) > (v1, v2, ...)`` into
+        ``f1 > v1 OR (f1 = v1 AND f2 > v2) OR ...``, honoring the
+        direction of each ordering field. The leading ``f1 >= v1`` term
+        lets the planner turn the whole filter into an index range scan.
+        """
+        fields = [field.lstrip("-") for field in ordering]
+        lookups = [
+            "lt" if field.startswith("-") else "gt" for field in ordering
+        ]
+        keyset = Q()
+        for index, (field, lookup) in enumerate(zip(fields, lookups)):
+            term = Q(**{f"{field}__{lookup}": position[index]})
+            for previous in range(index):
+                term &= Q(**{fields[previous]: position[previous]})
+            keyset |= term
+        return Q(**{f"{fields[0]}__{lookups[0]}e": position[0]}) & keyset
+
+    def get_page_queryset(self, queryset: QuerySet, request: Request):
+        """
+        The page (plus one row telling whether there is more) of the
+        queryset, ordered and filtered by the request's cursor.
+        """
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        self.reverse = self.cursor is not None and self.cursor[0]
+
+        ordering = self.get_ordering(self.reverse)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.build_keyset_filter(ordering, self.cursor[1])
+            )
+        return queryset[: self.limit + 1]
+
+    def set_page(self, results: list) -> list:
+        has_more = len(results) > self.limit
+        results = results[: self.limit]
+        if self.reverse:
+            results.reverse()
+
+        if self.reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> list:
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> list:
+        page = self.get_page_queryset(queryset, request)
+        return self.set_page([item async for item in page])
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(False, self.get_position(self.page[-1]))
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self.get_position(self.page[0]))
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page "
+                f"(at most {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
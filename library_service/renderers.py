@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class LibraryJSONEncoder(JSONEncoder):
+    """
+    DRF's encoder, except that decimals are rendered as strings, the
+    same way serializers coerce them, so that money keeps its scale.
+    """
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+_encoder = LibraryJSONEncoder()
+
+
+def encode_default(obj):
+    """
+    Fallback for the types orjson does not serialize natively
+    (Decimal, lazy translation strings, timedelta, querysets, ...).
+    """
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer built on orjson. Dates, datetimes and UUIDs are
+    serialized natively; everything else goes through
+    LibraryJSONEncoder. Falls back to the stdlib json module with the
+    same encoder when orjson is not installed.
+
+    Views can pick another flavor through ``renderer_classes``,
+    e.g. a subclass with extra orjson ``options``.
+    """
+
+    encoder_class = LibraryJSONEncoder
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encode_default, option=options)
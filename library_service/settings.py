@@ -15,6 +15,7 @@ from datetime import timedelta
 from pathlib import Path
 
 from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -48,8 +49,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     #libs
-    "debug_toolbar",
     "rest_framework",
     "drf_spectacular",
     #apps
@@ -58,19 +59,35 @@ INSTALLED_APPS = [
     "borrowings",
     "notifications",
     "payments",
+    "outbox",
+    "monitoring",
+    "reports",
 ]
 
 MIDDLEWARE = [
+    "monitoring.metrics.metrics_middleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "monitoring.profiling.profiling_middleware",
+    "monitoring.queries.query_budget_middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "library_service.db_router.recent_write_middleware",
 ]
 
+# The toolbar costs every request, so it is only installed for
+# development; production requests are profiled on demand instead
+# (see PROFILING below).
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("monitoring.queries.query_budget_middleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 ROOT_URLCONF = "library_service.urls"
 
 TEMPLATES = [
@@ -90,6 +107,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "library_service.wsgi.application"
 
+ASGI_APPLICATION = "library_service.asgi.application"
+
+# Route JSON reads of books, borrowings and payment lookups to async
+# views. Only worth it under an ASGI server (see gunicorn.conf.py):
+# under WSGI every async view runs in its own event loop.
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "False") == "True"
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -105,6 +129,54 @@ DATABASES = {
     }
 }
 
+# How connections are reused:
+# "persistent" - each thread keeps its connection for DB_CONN_MAX_AGE
+#   seconds, checked before reuse (WSGI servers),
+# "pool" - a psycopg connection pool per process (ASGI servers, where
+#   requests do not keep their thread),
+# "pgbouncer" - persistent connections to an external pooler in
+#   transaction mode: no server-side cursors nor prepared statements,
+#   which would not survive switching server connections,
+# "none" - a new connection for every request.
+DB_POOL_MODE = os.environ.get("DB_POOL_MODE", "persistent")
+
+if DB_POOL_MODE in ("persistent", "pgbouncer"):
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("DB_CONN_MAX_AGE", 60)
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+if DB_POOL_MODE == "pgbouncer":
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+    DATABASES["default"]["OPTIONS"] = {"prepare_threshold": None}
+elif DB_POOL_MODE == "pool":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        }
+    }
+elif DB_POOL_MODE not in ("persistent", "none"):
+    raise ImproperlyConfigured(f"Unknown DB_POOL_MODE: {DB_POOL_MODE}")
+
+# Read replicas of the primary, used for list and retrieve requests
+# and reports (see library_service.db_router).
+DATABASE_REPLICAS = []
+for host in filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")):
+    alias = f"replica{len(DATABASE_REPLICAS) + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["library_service.db_router.ReplicaRouter"]
+
+# Reads of a user stay on the primary for this long after they write,
+# so that they see their writes despite replication lag.
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 10))
+
 if "test" in sys.argv:
     DATABASES = {
         "default": {
@@ -112,6 +184,28 @@ if "test" in sys.argv:
             "NAME": ":memory:",
         }
     }
+    DATABASE_REPLICAS = []
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_URL", "redis://redis:6379/1"),
+    }
+}
+
+if "test" in sys.argv:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+BOOK_CACHE_TIMEOUT = int(os.environ.get("BOOK_CACHE_TIMEOUT", 300))
+
+BOOK_SEARCH_LIMIT = int(os.environ.get("BOOK_SEARCH_LIMIT", 50))
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -153,33 +247,175 @@ STATIC_URL = "static/"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
+    ),
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "library_service.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "library_service.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema"
 }
 
+API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", 20))
+
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", 100))
+
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 100))
+
 SIMPLE_JWT = {
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.TokenRefreshSerializer",
 }
 
+# AUTHENTICATION
+
+# Seconds the user a token belongs to is cached for, in the shared
+# cache and in each process; saving or deleting the user invalidates
+# the shared copy and the local copy of the saving process only.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 60))
+
+AUTH_LOCAL_CACHE_TIMEOUT = int(os.environ.get("AUTH_LOCAL_CACHE_TIMEOUT", 5))
+
+AUTH_LOCAL_CACHE_SIZE = int(os.environ.get("AUTH_LOCAL_CACHE_SIZE", 10000))
+
+# Authenticate safe (read-only) requests from the email and staff
+# claims of the access token alone: a deactivated or demoted user keeps
+# read access until their access token expires (ACCESS_TOKEN_LIFETIME).
+# Refresh tokens do not carry the claims; they are read from the user
+# again for every access token minted on refresh.
+AUTH_TRUST_TOKEN_CLAIMS = (
+    os.environ.get("AUTH_TRUST_TOKEN_CLAIMS", "False") == "True"
+)
+
+# QUERY BUDGETS
+
+# What to do with requests making more queries than the query_budgets
+# of their view allow, or repeating a query QUERY_REPEAT_THRESHOLD
+# times (N+1 queries): "warn" logs them, "raise" fails them (tests) and
+# "off" does not count queries at all.
+QUERY_BUDGET_MODE = os.environ.get(
+    "QUERY_BUDGET_MODE", "warn" if DEBUG else "off"
+)
+if "test" in sys.argv:
+    QUERY_BUDGET_MODE = "raise"
+
+QUERY_REPEAT_THRESHOLD = int(os.environ.get("QUERY_REPEAT_THRESHOLD", 5))
+
+# METRICS
+
+# Prometheus metrics, exposed at /metrics by the web server and on
+# METRICS_CELERY_PORT (0 to disable) by Celery workers. Multi-process
+# servers also need PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py).
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True") == "True"
+
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>", and is
+# only served without it with DEBUG.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+METRICS_CELERY_PORT = int(os.environ.get("METRICS_CELERY_PORT", 9540))
+
+# PROFILING
+
+# Requests of staff sending "X-Profile: 1" are profiled, as well as a
+# PROFILING_SAMPLE_RATE share (0 to 1) of the requests to the
+# PROFILING_SAMPLE_PATHS prefixes, and a PROFILING_TASK_SAMPLE_RATE
+# share of Celery tasks. Profiles are at /api/monitoring/profiles/.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "True") == "True"
+
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+
+PROFILING_SAMPLE_PATHS = tuple(
+    os.environ.get("PROFILING_SAMPLE_PATHS", "/api/").split(",")
+)
+
+PROFILING_TASK_SAMPLE_RATE = float(
+    os.environ.get("PROFILING_TASK_SAMPLE_RATE", 0)
+)
+
+PROFILING_MAX_PROFILES = int(os.environ.get("PROFILING_MAX_PROFILES", 100))
+
+# Queries kept in the SQL timeline and functions in the summary of a
+# profile.
+PROFILING_MAX_QUERIES = int(os.environ.get("PROFILING_MAX_QUERIES", 1000))
+
+PROFILING_SUMMARY_SIZE = int(os.environ.get("PROFILING_SUMMARY_SIZE", 40))
+
 # TELEGRAM
 
+TELEGRAM_API_URL = os.environ.get(
+    "TELEGRAM_API_URL", "https://api.telegram.org"
+)
+
 TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 
 TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 
+TELEGRAM_POOL_SIZE = int(os.environ.get("TELEGRAM_POOL_SIZE", 4))
+
+TELEGRAM_MIN_INTERVAL = float(os.environ.get("TELEGRAM_MIN_INTERVAL", 1.0))
+
+TELEGRAM_TIMEOUT = float(os.environ.get("TELEGRAM_TIMEOUT", 5))
+
+TELEGRAM_MAX_RETRIES = int(os.environ.get("TELEGRAM_MAX_RETRIES", 3))
+
+TELEGRAM_RETRY_BACKOFF = float(os.environ.get("TELEGRAM_RETRY_BACKOFF", 1.0))
+
 # CELERY
 
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
 
+OVERDUE_CHUNK_SIZE = int(os.environ.get("OVERDUE_CHUNK_SIZE", 2000))
+
 CELERY_BEAT_SCHEDULE = {
     "send-overdue-every-morning": {
         "task": "notifications.tasks.send_overdue_borrowings",
         "schedule": crontab(hour=10, minute=0)
-    }
+    },
+    "drain-outbox-every-minute": {
+        "task": "outbox.tasks.dispatch_outbox",
+        "schedule": timedelta(minutes=1),
+    },
+    "refresh-book-inventory-every-minute": {
+        "task": "books.tasks.refresh_book_inventory",
+        "schedule": timedelta(minutes=1),
+    },
+    "purge-stripe-events-every-night": {
+        "task": "payments.tasks.purge_stripe_events",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "refresh-reports-every-5-minutes": {
+        "task": "reports.tasks.refresh_reports",
+        "schedule": timedelta(minutes=5),
+    },
 }
 
+# INVENTORY
+
+# Number of counter rows each book's available copies are sharded
+# into; peak borrow concurrency on one title scales with it.
+INVENTORY_SLOTS = int(os.environ.get("INVENTORY_SLOTS", 8))
+
+# REPORTS
+
+# Days, up to today, recomputed by every refresh of the report
+# summaries; older days only change if borrowings are deleted.
+REPORTS_REFRESH_DAYS = int(os.environ.get("REPORTS_REFRESH_DAYS", 2))
+
+REPORTS_MAX_DAYS = int(os.environ.get("REPORTS_MAX_DAYS", 366))
+
+# OUTBOX
+
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 500))
+
+OUTBOX_MAX_BACKOFF = int(os.environ.get("OUTBOX_MAX_BACKOFF", 300))
+
 # STRIPE
 
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY", "test")
@@ -188,4 +424,44 @@ if STRIPE_SECRET_KEY == "test":
 
 STRIPE_WEBHOOK_SECRET = os.environ.get("STRIPE_WEBHOOK_SECRET")
 
+# payments.gateway.StripeGateway, or payments.gateway.FakeGateway to
+# create checkout sessions locally (the default without a Stripe key).
+PAYMENT_GATEWAY = os.environ.get(
+    "PAYMENT_GATEWAY",
+    (
+        "payments.gateway.FakeGateway"
+        if STRIPE_SECRET_KEY == "test"
+        else "payments.gateway.StripeGateway"
+    ),
+)
+
+# Seconds FakeGateway takes to create a session, to mimic Stripe in
+# load tests.
+PAYMENT_FAKE_LATENCY = float(os.environ.get("PAYMENT_FAKE_LATENCY", 0))
+
+STRIPE_API_BASE = os.environ.get("STRIPE_API_BASE", "https://api.stripe.com")
+
+STRIPE_CONNECT_TIMEOUT = float(os.environ.get("STRIPE_CONNECT_TIMEOUT", 3))
+
+STRIPE_READ_TIMEOUT = float(os.environ.get("STRIPE_READ_TIMEOUT", 10))
+
+STRIPE_MAX_NETWORK_RETRIES = int(
+    os.environ.get("STRIPE_MAX_NETWORK_RETRIES", 2)
+)
+
+STRIPE_POOL_SIZE = int(os.environ.get("STRIPE_POOL_SIZE", 4))
+
+# Consecutive transient failures after which checkout sessions fail
+# fast for PAYMENT_CIRCUIT_RESET_TIMEOUT seconds.
+PAYMENT_CIRCUIT_FAILURES = int(os.environ.get("PAYMENT_CIRCUIT_FAILURES", 5))
+
+PAYMENT_CIRCUIT_RESET_TIMEOUT = float(
+    os.environ.get("PAYMENT_CIRCUIT_RESET_TIMEOUT", 30)
+)
+
 STRIPE_FINE_MULTIPLIER = os.environ.get("STRIPE_FINE_MULTIPLIER", 2)
+
+# Stripe retries webhook deliveries for up to 3 days.
+STRIPE_EVENT_RETENTION_DAYS = int(
+    os.environ.get("STRIPE_EVENT_RETENTION_DAYS", 7)
+)
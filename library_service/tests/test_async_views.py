@@ -0,0 +1,167 @@
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from books.views import async_book_detail, async_book_list
+from borrowings.models import Borrowing
+from borrowings.views import async_borrowing_detail, async_borrowing_list
+from payments.models import Payment
+from payments.views import async_payment_success
+
+
+class TestAsyncViews(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=10,
+            daily_fee=Decimal("1.00"),
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="testuser123"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@user.com", password="testuser123"
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                book=self.book,
+                user=user,
+                borrow_date=date.today(),
+                expected_return_date=date.today() + timedelta(days=1),
+            )
+            for user in (self.user, self.other_user)
+        ]
+        Payment.objects.create(
+            borrowing=self.borrowings[0],
+            status=Payment.PaymentStatus.PENDING,
+            type=Payment.PaymentType.PAYMENT,
+            money_to_pay=Decimal("1.00"),
+            session_url="https://checkout.stripe.com/test",
+            session_id="test_id",
+        )
+        token = AccessToken.for_user(self.user)
+        self.headers = {"Authorize": f"Bearer {token}"}
+
+    async def aget_sync(self, path: str):
+        """
+        The same request served by the sync DRF view.
+        """
+        return await sync_to_async(self.client.get)(
+            path, headers=self.headers
+        )
+
+    async def test_list_books_matches_sync_view(self):
+        request = self.factory.get("/api/books/")
+        response = await async_book_list(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            json.loads(response.content),
+            json.loads((await self.aget_sync("/api/books/")).content),
+        )
+
+        request = self.factory.get(
+            "/api/books/", headers={"If-None-Match": response["ETag"]}
+        )
+        response = await async_book_list(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_book_filters_are_validated(self):
+        request = self.factory.get("/api/books/", {"cover": "PAPER"})
+        response = await async_book_list(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_missing_book_is_not_found(self):
+        request = self.factory.get("/api/books/0/")
+        response = await async_book_detail(request, pk=0)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_writes_fall_back_to_sync_view(self):
+        request = self.factory.delete(
+            f"/api/books/{self.book.pk}/", headers=self.headers
+        )
+        response = await async_book_detail(request, pk=self.book.pk)
+        response.render()
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(await Book.objects.filter(pk=self.book.pk).aexists())
+
+    async def test_list_borrowings_requires_token(self):
+        response = await async_borrowing_list(
+            self.factory.get("/api/borrowings/")
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+        response = await async_borrowing_list(
+            self.factory.get(
+                "/api/borrowings/", headers={"Authorize": "Bearer invalid"}
+            )
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_list_borrowings_matches_sync_view(self):
+        for path in (
+            "/api/borrowings/",
+            "/api/borrowings/?expand=payments",
+            "/api/borrowings/?fields=id,book&page_size=1",
+        ):
+            with self.subTest(path=path):
+                response = await async_borrowing_list(
+                    self.factory.get(path, headers=self.headers)
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(
+                    json.loads(response.content),
+                    json.loads((await self.aget_sync(path)).content),
+                )
+
+    async def test_retrieve_borrowing_of_other_user_is_not_found(self):
+        own, other = self.borrowings
+        path = f"/api/borrowings/{own.pk}/"
+        response = await async_borrowing_detail(
+            self.factory.get(path, headers=self.headers), pk=own.pk
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            json.loads(response.content),
+            json.loads((await self.aget_sync(path)).content),
+        )
+
+        response = await async_borrowing_detail(
+            self.factory.get(
+                f"/api/borrowings/{other.pk}/", headers=self.headers
+            ),
+            pk=other.pk,
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_payment_success(self):
+        response = await async_payment_success(
+            self.factory.get(
+                "/api/payments/success/",
+                {"session_id": "test_id"},
+                headers=self.headers,
+            )
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), {"status": "Pending"})
+
+        response = await async_payment_success(
+            self.factory.get("/api/payments/success/", headers=self.headers)
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
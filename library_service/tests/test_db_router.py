@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from books.views import BookViewSet
+from library_service.db_router import (
+    ReplicaRouter,
+    has_recent_write,
+    recent_write_middleware,
+    replica_reads,
+    use_replica,
+)
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class TestReplicaRouter(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_replica_only_when_allowed(self):
+        self.assertIsNone(self.router.db_for_read(Book))
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Book), "replica1")
+        self.assertFalse(replica_reads.get())
+        self.assertEqual(self.router.db_for_write(Book), "default")
+
+    def test_transactions_stay_on_primary(self):
+        with use_replica(), mock.patch.object(
+            connections["default"], "in_atomic_block", True
+        ):
+            self.assertIsNone(self.router.db_for_read(Book))
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica1", "books"))
+        self.assertIsNone(self.router.allow_migrate("default", "books"))
+
+    def test_reads_stick_to_primary_after_write(self):
+        user = SimpleNamespace(pk=1, is_authenticated=True)
+        middleware = recent_write_middleware(lambda request: HttpResponse())
+        request = RequestFactory().get("/")
+        request.user = user
+        middleware(request)
+        self.assertFalse(has_recent_write(user))
+
+        request = RequestFactory().post("/")
+        request.user = user
+        middleware(request)
+        self.assertTrue(has_recent_write(user))
+
+
+class TestReplicaReadMixin(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="testuser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def get_replica_reads(self, url: str) -> list[bool]:
+        seen = []
+
+        def get_queryset():
+            seen.append(replica_reads.get())
+            return Book.objects.none()
+
+        with mock.patch.object(
+            BookViewSet, "get_queryset", side_effect=get_queryset
+        ):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(replica_reads.get())
+        return seen
+
+    def test_list_reads_from_replica(self):
+        url = reverse("books:book-list")
+        self.assertEqual(self.get_replica_reads(url), [True])
+
+    @override_settings(DATABASE_REPLICAS=["replica1"])
+    def test_list_reads_from_primary_after_write(self):
+        cache.set(f"db:recent-write:{self.user.pk}", 1)
+        url = reverse("books:book-list")
+        self.assertEqual(self.get_replica_reads(url), [False])
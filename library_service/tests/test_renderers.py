@@ -0,0 +1,64 @@
+import io
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+
+from library_service.parsers import ORJSONParser
+from library_service.renderers import ORJSONRenderer
+
+DATA = {
+    "daily_fee": Decimal("1.50"),
+    "borrow_date": date(2026, 1, 2),
+    "created_at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "status": gettext_lazy("Paid"),
+    1: "non-string key",
+}
+EXPECTED = {
+    "daily_fee": "1.50",
+    "borrow_date": "2026-01-02",
+    "created_at": "2026-01-02T03:04:05Z",
+    "status": "Paid",
+    "1": "non-string key",
+}
+
+
+class TestORJSON(SimpleTestCase):
+    def test_render(self):
+        rendered = ORJSONRenderer().render(DATA)
+        self.assertEqual(json.loads(rendered), EXPECTED)
+
+    def test_render_without_orjson(self):
+        with mock.patch("library_service.renderers.orjson", None):
+            rendered = ORJSONRenderer().render(DATA)
+        self.assertEqual(json.loads(rendered), EXPECTED)
+
+    def test_render_indent(self):
+        rendered = ORJSONRenderer().render(
+            {"a": [1]}, "application/json; indent=4"
+        )
+        self.assertIn(b"\n", rendered)
+
+    def test_render_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_parse(self):
+        stream = io.BytesIO('{"title": "Dune", "inventory": 3}'.encode())
+        self.assertEqual(
+            ORJSONParser().parse(stream), {"title": "Dune", "inventory": 3}
+        )
+
+    def test_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b"{broken"))
+
+    def test_parse_other_encoding_falls_back(self):
+        stream = io.BytesIO('{"title": "Café"}'.encode("latin-1"))
+        data = ORJSONParser().parse(
+            stream, parser_context={"encoding": "latin-1"}
+        )
+        self.assertEqual(data, {"title": "Café"})
@@ -15,7 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from debug_toolbar.toolbar import debug_toolbar_urls
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import (
@@ -24,6 +24,8 @@ from drf_spectacular.views import (
     SpectacularRedocView,
 )
 
+from monitoring.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/books/", include("books.urls", namespace="books")),
@@ -32,6 +34,11 @@ urlpatterns = [
         "api/borrowings/", include("borrowings.urls", namespace="borrowings")
     ),
     path("api/payments/", include("payments.urls", namespace="payments")),
+    path("api/reports/", include("reports.urls", namespace="reports")),
+    path(
+        "api/monitoring/",
+        include("monitoring.urls", namespace="monitoring"),
+    ),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/schema/swagger-ui/",
@@ -43,4 +50,12 @@ urlpatterns = [
         SpectacularRedocView.as_view(url_name="schema"),
         name="redoc",
     ),
-] + debug_toolbar_urls()
+]
+
+if settings.DEBUG:
+    from debug_toolbar.toolbar import debug_toolbar_urls
+
+    urlpatterns += debug_toolbar_urls()
+
+if settings.METRICS_ENABLED:
+    urlpatterns.append(path("metrics", metrics, name="metrics"))
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import connections
+
+
+class ConnectionStats:
+    """
+    Database connection churn of this process: how many connections
+    were set up (or, with DB_POOL_MODE=pool, checked out of the pool)
+    per request served.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = {}
+
+    def request_started(self) -> None:
+        self.requests += 1
+
+    def connection_created(self, alias: str) -> None:
+        self.connections[alias] = self.connections.get(alias, 0) + 1
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.connections = {}
+
+    def as_dict(self) -> dict:
+        databases = {}
+        for alias, created in self.connections.items():
+            databases[alias] = {
+                "connections_created": created,
+                "connections_per_request": (
+                    round(created / self.requests, 3)
+                    if self.requests
+                    else None
+                ),
+            }
+            pool = getattr(connections[alias], "pool", None)
+            if pool is not None:
+                databases[alias]["pool"] = pool.get_stats()
+        return {
+            "pool_mode": settings.DB_POOL_MODE,
+            "requests": self.requests,
+            "databases": databases,
+        }
+
+
+stats = ConnectionStats()
@@ -0,0 +1,184 @@
+"""
+Prometheus metrics of the web and Celery processes.
+
+Metrics are pre-aggregated counters and histograms updated in place.
+Under multi-process servers (gunicorn, Celery's prefork pool) every
+process writes its values to PROMETHEUS_MULTIPROC_DIR, which must be
+set before prometheus_client is imported, and the exposition sums them.
+"""
+
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    multiprocess,
+)
+
+# Requests slower than the last bucket land in +Inf.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 1)
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+HTTP_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+)
+STATUS_CLASSES = {code: f"{code}xx" for code in range(1, 6)}
+
+_query_durations = {}
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to respond to a request, by view.",
+    ["view", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+http_responses = Counter(
+    "http_responses",
+    "Responses by view and status class.",
+    ["view", "method", "status"],
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Time of database queries; its count is the number of queries.",
+    ["database"],
+    buckets=FAST_BUCKETS,
+)
+cache_requests = Counter(
+    "cache_requests",
+    "Lookups of application caches by result (hit or miss).",
+    ["cache", "result"],
+)
+payment_gateway_duration = Histogram(
+    "payment_gateway_request_duration_seconds",
+    "Time to create a checkout session with the payment gateway.",
+    buckets=LATENCY_BUCKETS,
+)
+payment_gateway_errors = Counter(
+    "payment_gateway_errors",
+    "Failed checkout session creations: transient, permanent or "
+    "circuit_open (not attempted).",
+    ["kind"],
+)
+inventory_lock_wait = Histogram(
+    "inventory_lock_wait_seconds",
+    "Time spent locking inventory slots to take copies.",
+    ["mode"],
+    buckets=FAST_BUCKETS,
+)
+celery_task_duration = Histogram(
+    "celery_task_duration_seconds",
+    "Run time of Celery tasks.",
+    ["task"],
+    buckets=TASK_BUCKETS,
+)
+celery_tasks = Counter(
+    "celery_tasks",
+    "Celery task runs by final state (SUCCESS, FAILURE, RETRY...).",
+    ["task", "state"],
+)
+celery_task_queue_lag = Histogram(
+    "celery_task_queue_lag_seconds",
+    "Time from publishing a task to a worker starting it.",
+    ["task"],
+    buckets=TASK_BUCKETS,
+)
+telegram_send_duration = Histogram(
+    "telegram_send_duration_seconds",
+    "Time to send a Telegram message, retries included, by result.",
+    ["result"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class CacheMetrics:
+    """
+    Hit and miss counters of one cache, resolved once.
+    """
+
+    def __init__(self, name: str):
+        self.hits = cache_requests.labels(name, "hit")
+        self.misses = cache_requests.labels(name, "miss")
+
+    def record(self, hit: bool) -> None:
+        (self.hits if hit else self.misses).inc()
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    Registry summing the values written by every process when
+    PROMETHEUS_MULTIPROC_DIR is set, the process's own otherwise.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def get_query_duration(alias: str) -> Histogram:
+    """
+    db_query_duration of the database alias, resolved once.
+    """
+    histogram = _query_durations.get(alias)
+    if histogram is None:
+        histogram = _query_durations[alias] = db_query_duration.labels(alias)
+    return histogram
+
+
+def observe_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection (see
+    monitoring.signals) timing its queries.
+    """
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        get_query_duration(context["connection"].alias).observe(
+            time.perf_counter() - started
+        )
+
+
+def observe_request(request, response, duration: float) -> None:
+    match = request.resolver_match
+    view = match.view_name if match is not None else "unmatched"
+    method = request.method if request.method in HTTP_METHODS else "other"
+    http_request_duration.labels(view, method).observe(duration)
+    http_responses.labels(
+        view, method, STATUS_CLASSES.get(response.status_code // 100, "")
+    ).inc()
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Records the latency and status of every request by view. Unused
+    with METRICS_ENABLED off.
+    """
+    if not settings.METRICS_ENABLED:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            started = time.perf_counter()
+            response = await get_response(request)
+            observe_request(request, response, time.perf_counter() - started)
+            return response
+
+        return middleware
+
+    def middleware(request):
+        started = time.perf_counter()
+        response = get_response(request)
+        observe_request(request, response, time.perf_counter() - started)
+        return response
+
+    return middleware
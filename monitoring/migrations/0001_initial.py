@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('REQUEST', 'Request'), ('TASK', 'Task')], max_length=16)),
+                ('name', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('duration', models.FloatField()),
+                ('query_count', models.PositiveIntegerField()),
+                ('query_duration', models.FloatField()),
+                ('queries', models.JSONField(default=list)),
+                ('summary', models.TextField()),
+                ('stats', models.BinaryField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class Profile(models.Model):
+    """
+    Call-stack profile and SQL timeline of one request or Celery task,
+    taken by monitoring.profiling.Profiler.
+    """
+
+    class Kind(models.TextChoices):
+        REQUEST = "REQUEST", "Request"
+        TASK = "TASK", "Task"
+
+    kind = models.CharField(choices=Kind.choices, max_length=16)
+    # "GET /api/borrowings/" or the task name.
+    name = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # In seconds.
+    duration = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    query_duration = models.FloatField()
+    # [{"start": ms, "duration": ms, "sql": ...}, ...]
+    queries = models.JSONField(default=list)
+    # The functions taking the most cumulative time, as pstats prints.
+    summary = models.TextField()
+    # Marshalled pstats data, as written by cProfile's dump_stats.
+    stats = models.BinaryField()
+
+    def __str__(self):
+        return f"{self.name} ({self.duration * 1000:.0f}ms)"
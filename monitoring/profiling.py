@@ -0,0 +1,213 @@
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.exceptions import AuthenticationFailed
+
+from monitoring.models import Profile
+from monitoring.queries import count_queries
+from users.authentication import CachedJWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+
+# Python 3.12's profiler observes every thread of the process, so a
+# single profile runs at a time.
+_profiler_lock = threading.Lock()
+_authentication = CachedJWTAuthentication()
+
+
+class Profiler:
+    """
+    Profiles the calls and queries made between start() and stop(), in
+    every thread of the process: under an event loop, the requests
+    served concurrently show up as well.
+    """
+
+    def __init__(self, kind: Profile.Kind, name: str):
+        self.kind = kind
+        self.name = name[:255]
+        self.profile = cProfile.Profile()
+        self.query_counter = count_queries(timeline=True)
+
+    def start(self) -> bool:
+        """
+        False if another profile is running, in which case this one
+        must not be stopped.
+        """
+        if not _profiler_lock.acquire(blocking=False):
+            return False
+        try:
+            self.profile.enable()
+        except ValueError:
+            # Another profiling tool (e.g. coverage) is active.
+            _profiler_lock.release()
+            return False
+        self.queries = self.query_counter.__enter__()
+        self.started = time.perf_counter()
+        return True
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self.started
+        self.profile.disable()
+        self.query_counter.__exit__(None, None, None)
+        _profiler_lock.release()
+
+    def get_fields(self) -> dict:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+            settings.PROFILING_SUMMARY_SIZE
+        )
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "duration": self.duration,
+            "query_count": self.queries.count,
+            "query_duration": self.queries.duration,
+            "queries": self.queries.queries,
+            "summary": stream.getvalue(),
+            "stats": marshal.dumps(stats.stats),
+        }
+
+    def save(self) -> Profile | None:
+        """
+        Stores the profile, keeping the last PROFILING_MAX_PROFILES.
+        Failures are logged: they must not fail what was profiled.
+        """
+        try:
+            profile = Profile.objects.create(**self.get_fields())
+            prune_profiles()
+        except Exception:
+            logger.exception("Could not save the profile of %s", self.name)
+            return None
+        return profile
+
+    async def asave(self) -> Profile | None:
+        try:
+            profile = await Profile.objects.acreate(**self.get_fields())
+            await aprune_profiles()
+        except Exception:
+            logger.exception("Could not save the profile of %s", self.name)
+            return None
+        return profile
+
+
+def get_oldest_kept_queryset():
+    """
+    Ids of the profiles from the oldest one to keep, newest first.
+    """
+    kept = settings.PROFILING_MAX_PROFILES - 1
+    return Profile.objects.order_by("-id").values_list("id", flat=True)[kept:]
+
+
+def prune_profiles() -> None:
+    oldest_kept = get_oldest_kept_queryset().first()
+    if oldest_kept is not None:
+        Profile.objects.filter(id__lt=oldest_kept).delete()
+
+
+async def aprune_profiles() -> None:
+    oldest_kept = await get_oldest_kept_queryset().afirst()
+    if oldest_kept is not None:
+        await Profile.objects.filter(id__lt=oldest_kept).adelete()
+
+
+def is_sampled(rate: float) -> bool:
+    return rate > 0 and random.random() < rate
+
+
+def is_profile_requested(request) -> bool:
+    return request.headers.get(PROFILE_HEADER) == "1"
+
+
+def is_staff(request) -> bool:
+    try:
+        result = _authentication.authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+async def ais_staff(request) -> bool:
+    try:
+        result = await _authentication.aauthenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+def should_sample(request) -> bool:
+    return request.path.startswith(
+        settings.PROFILING_SAMPLE_PATHS
+    ) and is_sampled(settings.PROFILING_SAMPLE_RATE)
+
+
+def start_profiler(request) -> Profiler | None:
+    profiler = Profiler(
+        Profile.Kind.REQUEST, f"{request.method} {request.path}"
+    )
+    return profiler if profiler.start() else None
+
+
+def set_profile_id(response, profile: Profile | None) -> None:
+    if profile is not None:
+        response["X-Profile-Id"] = str(profile.id)
+
+
+@sync_and_async_middleware
+def profiling_middleware(get_response):
+    """
+    Profiles requests of staff sending "X-Profile: 1" (with their JWT)
+    and a PROFILING_SAMPLE_RATE share of requests to
+    PROFILING_SAMPLE_PATHS, returning the id of the stored profile in
+    the X-Profile-Id header. Other requests only pay for the checks.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if is_profile_requested(request):
+                profiled = await ais_staff(request)
+            else:
+                profiled = should_sample(request)
+            profiler = start_profiler(request) if profiled else None
+            if profiler is None:
+                return await get_response(request)
+            try:
+                response = await get_response(request)
+            finally:
+                profiler.stop()
+            set_profile_id(response, await profiler.asave())
+            return response
+
+        return middleware
+
+    def middleware(request):
+        if is_profile_requested(request):
+            profiled = is_staff(request)
+        else:
+            profiled = should_sample(request)
+        profiler = start_profiler(request) if profiled else None
+        if profiler is None:
+            return get_response(request)
+        try:
+            response = get_response(request)
+        finally:
+            profiler.stop()
+        set_profile_id(response, profiler.save())
+        return response
+
+    return middleware
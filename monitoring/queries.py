@@ -0,0 +1,200 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+_current_stats = ContextVar("query_stats", default=None)
+
+PLACEHOLDER_LIST = re.compile(r"\((?:%s, )+%s\)")
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised with QUERY_BUDGET_MODE=raise by a request that made more
+    queries than its view's budget, or repeated one query.
+    """
+
+
+def fingerprint(sql: str) -> str:
+    """
+    The query with its literals and IN lists collapsed, so that the
+    same query for different rows gets the same fingerprint.
+    """
+    sql = PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = LITERAL.sub("?", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryStats:
+    """
+    Queries made, time spent in the database (in seconds) and
+    fingerprints counted while the stats are current. Queries counted
+    by nested stats are counted by the enclosing stats as well.
+
+    With timeline, the first PROFILING_MAX_QUERIES queries are also kept
+    in queries with their start and duration, in ms.
+    """
+
+    def __init__(
+        self, parent: "QueryStats | None" = None, timeline: bool = False
+    ):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.parent = parent
+        self.queries = [] if timeline else None
+        self.started = time.perf_counter()
+
+    def record(self, sql: str, started: float, duration: float) -> None:
+        stats = self
+        key = fingerprint(sql)
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats.fingerprints[key] += 1
+            if (
+                stats.queries is not None
+                and len(stats.queries) < settings.PROFILING_MAX_QUERIES
+            ):
+                stats.queries.append(
+                    {
+                        "start": round((started - stats.started) * 1000, 3),
+                        "duration": round(duration * 1000, 3),
+                        "sql": sql,
+                    }
+                )
+            stats = stats.parent
+
+    def repeated(self, threshold: int | None = None) -> dict[str, int]:
+        """
+        Fingerprints made at least threshold (QUERY_REPEAT_THRESHOLD)
+        times: queries run once per row of a result, i.e. N+1 queries.
+        """
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return {
+            key: count
+            for key, count in self.fingerprints.most_common()
+            if count >= threshold
+        }
+
+    def describe(self) -> str:
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f}ms"]
+        lines.extend(
+            f"  {count}x {key}"
+            for key, count in self.fingerprints.most_common()
+        )
+        return "\n".join(lines)
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection (see
+    monitoring.signals) recording queries in the current stats, if any.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record(sql, started, time.perf_counter() - started)
+
+
+@contextmanager
+def count_queries(timeline: bool = False) -> Iterator[QueryStats]:
+    """
+    Counts the queries made in the block, on every database, including
+    those run by sync_to_async from an async block.
+    """
+    stats = QueryStats(parent=_current_stats.get(), timeline=timeline)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def get_query_budget(view, method: str) -> int | None:
+    """
+    Budget declared for the view handling the method: query_budgets
+    on the view class maps ViewSet actions (or, for other views, HTTP
+    methods) to the most queries a request may make.
+    """
+    budgets = getattr(getattr(view, "cls", None), "query_budgets", None)
+    if not budgets:
+        return None
+    method = method.lower()
+    return budgets.get(getattr(view, "actions", {}).get(method, method))
+
+
+def check_query_budget(request, stats: QueryStats) -> None:
+    match = request.resolver_match
+    if match is None:
+        return
+    budget = get_query_budget(match.func, request.method)
+    problems = []
+    if budget is not None and stats.count > budget:
+        problems.append(f"over its budget of {budget} queries")
+    if stats.repeated():
+        problems.append("repeated queries")
+    if not problems:
+        return
+
+    message = (
+        f"{request.method} {request.path} ({match.view_name}) made "
+        f"{' and '.join(problems)}: {stats.describe()}"
+    )
+    if settings.QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def add_server_timing(response, stats: QueryStats) -> None:
+    response["Server-Timing"] = (
+        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+    )
+
+
+@sync_and_async_middleware
+def query_budget_middleware(get_response):
+    """
+    Counts the queries and database time of every request, reported in
+    a Server-Timing header, and warns about (QUERY_BUDGET_MODE=warn) or
+    fails (raise) requests exceeding their view's query budget or
+    repeating a query QUERY_REPEAT_THRESHOLD times.
+    """
+    if settings.QUERY_BUDGET_MODE == "off":
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            with count_queries() as stats:
+                response = await get_response(request)
+            check_query_budget(request, stats)
+            add_server_timing(response, stats)
+            return response
+
+        return middleware
+
+    def middleware(request):
+        with count_queries() as stats:
+            response = get_response(request)
+        check_query_budget(request, stats)
+        add_server_timing(response, stats)
+        return response
+
+    return middleware
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from monitoring.models import Profile
+
+
+class ProfileListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Profile
+        fields = (
+            "id",
+            "kind",
+            "name",
+            "created_at",
+            "duration",
+            "query_count",
+            "query_duration",
+        )
+        read_only_fields = fields
+
+
+class ProfileDetailSerializer(ProfileListSerializer):
+    class Meta(ProfileListSerializer.Meta):
+        fields = ProfileListSerializer.Meta.fields + ("summary", "queries")
+        read_only_fields = fields
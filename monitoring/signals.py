@@ -0,0 +1,107 @@
+import os
+import time
+from datetime import datetime
+
+from celery import signals as celery_signals
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import multiprocess, start_http_server
+
+from monitoring import metrics
+from monitoring.connections import stats
+from monitoring.models import Profile
+from monitoring.profiling import Profiler, is_sampled
+from monitoring.queries import count_query
+
+
+@receiver(request_started)
+def count_request(sender, **kwargs):
+    stats.request_started()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    stats.connection_created(connection.alias)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    wrappers = [count_query]
+    if settings.METRICS_ENABLED:
+        wrappers.append(metrics.observe_query)
+    for wrapper in wrappers:
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+@celery_signals.worker_init.connect
+def start_metrics_server(**kwargs):
+    """
+    Serves the metrics of the worker and its pool processes from the
+    main worker process.
+    """
+    if settings.METRICS_ENABLED and settings.METRICS_CELERY_PORT:
+        start_http_server(
+            settings.METRICS_CELERY_PORT, registry=metrics.get_registry()
+        )
+
+
+@celery_signals.worker_process_shutdown.connect
+def mark_process_dead(**kwargs):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+@celery_signals.before_task_publish.connect
+def stamp_published_at(headers, **kwargs):
+    headers["published_at"] = time.time()
+
+
+@celery_signals.task_prerun.connect
+def task_started(task, **kwargs):
+    task.request.metrics_started = time.perf_counter()
+    # Lag is counted from the ETA of delayed tasks (e.g. retries).
+    ready_at = task.request.get("published_at")
+    if task.request.eta:
+        ready_at = datetime.fromisoformat(task.request.eta).timestamp()
+    if ready_at is not None:
+        metrics.celery_task_queue_lag.labels(task.name).observe(
+            max(time.time() - ready_at, 0)
+        )
+
+
+@celery_signals.task_postrun.connect
+def task_finished(task, state, **kwargs):
+    started = task.request.get("metrics_started")
+    if started is not None:
+        metrics.celery_task_duration.labels(task.name).observe(
+            time.perf_counter() - started
+        )
+    metrics.celery_tasks.labels(task.name, state).inc()
+
+
+@celery_signals.task_prerun.connect
+def start_task_profile(task, **kwargs):
+    """
+    Profiles tasks published with a "profile" header, e.g.
+    send_overdue_borrowings.apply_async(headers={"profile": True}),
+    and a PROFILING_TASK_SAMPLE_RATE share of the others.
+    """
+    if not settings.PROFILING_ENABLED:
+        return
+    if task.request.get("profile") or is_sampled(
+        settings.PROFILING_TASK_SAMPLE_RATE
+    ):
+        profiler = Profiler(Profile.Kind.TASK, task.name)
+        if profiler.start():
+            task.request.profiler = profiler
+
+
+@celery_signals.task_postrun.connect
+def save_task_profile(task, **kwargs):
+    profiler = task.request.get("profiler")
+    if profiler is not None:
+        profiler.stop()
+        profiler.save()
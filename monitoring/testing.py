@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from monitoring.queries import QueryStats, count_queries
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin for code outside of requests (tasks, services);
+    requests are checked against the query_budgets of their view by
+    query_budget_middleware, which fails them in tests.
+    """
+
+    @contextmanager
+    def assertQueryBudget(
+        self, budget: int, repeat_threshold: int | None = None
+    ) -> Iterator[QueryStats]:
+        """
+        Fails if the block makes more than budget queries or repeats
+        a query repeat_threshold (QUERY_REPEAT_THRESHOLD) times.
+        """
+        with count_queries() as stats:
+            yield stats
+        if stats.count > budget:
+            self.fail(
+                f"Over the budget of {budget} queries: {stats.describe()}"
+            )
+        if stats.repeated(repeat_threshold):
+            self.fail(f"Repeated queries: {stats.describe()}")
@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from books.tasks import refresh_book_inventory
+from monitoring.views import metrics
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_TOKEN="secret")
+class TestMetricsView(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Book.objects.create(
+            title="Book", author="Author", inventory=1, daily_fee=1
+        )
+        self.url = reverse("metrics")
+        self.headers = {"Authorization": "Bearer secret"}
+
+    def test_requests_are_observed_by_view(self):
+        labels = {"view": "books:book-list", "method": "GET"}
+        before = sample("http_request_duration_seconds_count", **labels)
+        responses = sample("http_responses_total", status="2xx", **labels)
+        queries = sample("db_query_duration_seconds_count", database="default")
+
+        self.client.get(reverse("books:book-list"))
+        response = self.client.get(self.url, headers=self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            b'http_request_duration_seconds_bucket{le="0.005",method="GET",'
+            b'view="books:book-list"}',
+            response.content,
+        )
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", **labels),
+            before + 1,
+        )
+        self.assertEqual(
+            sample("http_responses_total", status="2xx", **labels),
+            responses + 1,
+        )
+        self.assertGreater(
+            sample("db_query_duration_seconds_count", database="default"),
+            queries,
+        )
+
+    def test_catalogue_cache_hits_are_counted(self):
+        hits = sample("cache_requests_total", cache="catalogue", result="hit")
+        misses = sample(
+            "cache_requests_total", cache="catalogue", result="miss"
+        )
+
+        self.client.get(reverse("books:book-list"))
+        self.client.get(reverse("books:book-list"))
+
+        self.assertEqual(
+            sample("cache_requests_total", cache="catalogue", result="hit"),
+            hits + 1,
+        )
+        self.assertEqual(
+            sample("cache_requests_total", cache="catalogue", result="miss"),
+            misses + 1,
+        )
+
+    def test_token_is_required(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(self.url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_token_is_only_optional_with_debug(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        with override_settings(DEBUG=True):
+            response = metrics(RequestFactory().get(self.url))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestTaskMetrics(TestCase):
+    def test_task_runs_are_observed(self):
+        labels = {"task": refresh_book_inventory.name}
+        runs = sample("celery_tasks_total", state="SUCCESS", **labels)
+        durations = sample("celery_task_duration_seconds_count", **labels)
+
+        refresh_book_inventory.apply()
+
+        self.assertEqual(
+            sample("celery_tasks_total", state="SUCCESS", **labels), runs + 1
+        )
+        self.assertEqual(
+            sample("celery_task_duration_seconds_count", **labels),
+            durations + 1,
+        )
@@ -0,0 +1,131 @@
+import marshal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from books.tasks import refresh_book_inventory
+from monitoring.models import Profile
+
+
+class TestProfilingMiddleware(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Book.objects.create(
+            title="Book", author="Author", inventory=1, daily_fee=1
+        )
+        self.staff = get_user_model().objects.create_user(
+            email="staff@staff.com", password="staff12345", is_staff=True
+        )
+        self.url = reverse("books:book-list")
+
+    def get(self, user=None, **headers):
+        if user is not None:
+            headers["Authorize"] = f"Bearer {AccessToken.for_user(user)}"
+        return self.client.get(self.url, headers=headers)
+
+    def test_staff_request_is_profiled(self):
+        response = self.get(self.staff, **{"X-Profile": "1"})
+
+        profile = Profile.objects.get(id=response["X-Profile-Id"])
+        self.assertEqual(profile.kind, Profile.Kind.REQUEST)
+        self.assertEqual(profile.name, f"GET {self.url}")
+        self.assertEqual(profile.query_count, len(profile.queries))
+        self.assertIn("FROM", profile.queries[0]["sql"])
+        self.assertIn("cumulative", profile.summary)
+        self.assertTrue(marshal.loads(profile.stats))
+
+    def test_other_requests_are_not_profiled(self):
+        user = get_user_model().objects.create_user(
+            email="user@user.com", password="user12345"
+        )
+
+        for response in (
+            self.get(user, **{"X-Profile": "1"}),
+            self.get(**{"X-Profile": "1"}),
+            self.get(self.staff),
+        ):
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(Profile.objects.exists())
+
+    @override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_MAX_PROFILES=2)
+    def test_sampled_requests_keep_last_profiles(self):
+        ids = [int(self.get()["X-Profile-Id"]) for _ in range(3)]
+
+        self.assertEqual(
+            list(Profile.objects.order_by("id").values_list("id", flat=True)),
+            ids[1:],
+        )
+
+    @override_settings(
+        PROFILING_SAMPLE_RATE=1, PROFILING_SAMPLE_PATHS=("/api/users/",)
+    )
+    def test_only_sample_paths_are_sampled(self):
+        self.assertNotIn("X-Profile-Id", self.get())
+
+
+class TestProfileViewSet(APITestCase):
+    def setUp(self):
+        self.profile = Profile.objects.create(
+            kind=Profile.Kind.TASK,
+            name="task",
+            duration=0.5,
+            query_count=0,
+            query_duration=0,
+            summary="summary",
+            stats=marshal.dumps({}),
+        )
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@user.com", password="user12345"
+            )
+        )
+        response = self.client.get(reverse("monitoring:profile-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_list_retrieve_and_download(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="staff@staff.com", password="staff12345", is_staff=True
+            )
+        )
+
+        response = self.client.get(reverse("monitoring:profile-list"))
+        self.assertEqual(response.data["results"][0]["name"], "task")
+        self.assertNotIn("summary", response.data["results"][0])
+
+        response = self.client.get(
+            reverse("monitoring:profile-detail", args=[self.profile.id])
+        )
+        self.assertEqual(response.data["summary"], "summary")
+
+        response = self.client.get(
+            reverse("monitoring:profile-download", args=[self.profile.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(marshal.loads(response.content), {})
+        self.assertIn("attachment", response["Content-Disposition"])
+
+
+class TestTaskProfiling(TestCase):
+    @override_settings(PROFILING_TASK_SAMPLE_RATE=1)
+    def test_sampled_task_is_profiled(self):
+        refresh_book_inventory.apply()
+
+        profile = Profile.objects.get()
+        self.assertEqual(profile.kind, Profile.Kind.TASK)
+        self.assertEqual(profile.name, refresh_book_inventory.name)
+        self.assertGreater(profile.query_count, 0)
+
+    def test_tasks_are_not_profiled_by_default(self):
+        refresh_book_inventory.apply()
+
+        self.assertFalse(Profile.objects.exists())
@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from books.serializers import BookSerializer
+from books.views import BookViewSet
+from monitoring.queries import (
+    QueryBudgetExceeded,
+    count_queries,
+    fingerprint,
+)
+from monitoring.testing import QueryBudgetTestMixin
+
+
+def create_books(count: int) -> None:
+    Book.objects.bulk_create(
+        Book(title=f"Book {i}", author="Author", inventory=1, daily_fee=1)
+        for i in range(count)
+    )
+
+
+def serialize_with_query(serializer, book):
+    # A per-row query, as lazy access to a relation would make.
+    return {"stock": Book.objects.get(pk=book.pk).stock}
+
+
+class TestCountQueries(QueryBudgetTestMixin, TestCase):
+    def test_fingerprint_ignores_literals_and_in_lists(self):
+        self.assertEqual(
+            fingerprint(
+                "SELECT * FROM book WHERE id IN (%s, %s, %s)\n LIMIT 21"
+            ),
+            fingerprint("SELECT * FROM book WHERE id IN (%s, %s) LIMIT 1"),
+        )
+        self.assertEqual(fingerprint("SELECT 'a''b', 1.5"), "SELECT ?, ?")
+
+    def test_nested_counts_are_added_to_enclosing(self):
+        create_books(1)
+        with count_queries() as outer:
+            Book.objects.count()
+            with count_queries() as inner:
+                list(Book.objects.all())
+                list(Book.objects.all())
+
+        self.assertEqual(inner.count, 2)
+        self.assertEqual(outer.count, 3)
+        self.assertEqual(len(outer.fingerprints), 2)
+        self.assertGreater(outer.duration, 0)
+
+    def test_repeated_queries_are_flagged(self):
+        create_books(5)
+        with count_queries() as stats:
+            for book in Book.objects.all():
+                Book.objects.get(pk=book.pk)
+
+        self.assertEqual(list(stats.repeated(5).values()), [5])
+        self.assertEqual(stats.repeated(6), {})
+
+    def test_assert_query_budget_fails_over_budget(self):
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget(1):
+                Book.objects.count()
+                Book.objects.count()
+
+
+class TestQueryBudgetMiddleware(APITestCase):
+    def setUp(self):
+        cache.clear()
+        create_books(5)
+        self.url = reverse("books:book-list")
+
+    def test_reports_database_time(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(
+            response["Server-Timing"], r'^db;dur=[\d.]+;desc="1 queries"$'
+        )
+
+    @mock.patch.object(BookViewSet, "query_budgets", {"list": 0})
+    def test_over_budget_raises(self):
+        with self.assertRaisesMessage(
+            QueryBudgetExceeded, "over its budget of 0 queries"
+        ):
+            self.client.get(self.url)
+
+    @mock.patch.object(
+        BookSerializer, "to_representation", serialize_with_query
+    )
+    def test_repeated_queries_raise(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, "5x SELECT"):
+            self.client.get(self.url)
+
+    @override_settings(QUERY_BUDGET_MODE="warn")
+    @mock.patch.object(BookViewSet, "query_budgets", {"list": 0})
+    def test_over_budget_warns(self):
+        with self.assertLogs("monitoring.queries", "WARNING") as logs:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("books:book-list", logs.output[0])
+
+    @override_settings(QUERY_BUDGET_MODE="off")
+    def test_off_counts_nothing(self):
+        response = self.client.get(self.url)
+
+        self.assertNotIn("Server-Timing", response)
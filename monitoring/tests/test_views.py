@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.backends.signals import connection_created
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from monitoring.connections import stats
+
+
+class TestDatabaseConnectionsView(APITestCase):
+    def setUp(self):
+        stats.reset()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="testuser123"
+        )
+        self.url = reverse("monitoring:db-connections")
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reports_connections_per_request(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        self.client.get(self.url)
+        connection_created.send(sender=type(connection), connection=connection)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["requests"], 2)
+        self.assertEqual(
+            response.data["databases"]["default"],
+            {"connections_created": 1, "connections_per_request": 0.5},
+        )
@@ -0,0 +1,18 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from monitoring.views import DatabaseConnectionsView, ProfileViewSet
+
+app_name = "monitoring"
+
+router = DefaultRouter()
+router.register("profiles", ProfileViewSet, basename="profile")
+
+urlpatterns = [
+    path("", include(router.urls)),
+    path(
+        "db-connections/",
+        DatabaseConnectionsView.as_view(),
+        name="db-connections",
+    ),
+]
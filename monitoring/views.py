@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from library_service.pagination import KeysetPagination
+from monitoring.connections import stats
+from monitoring.metrics import get_registry
+from monitoring.models import Profile
+from monitoring.serializers import (
+    ProfileDetailSerializer,
+    ProfileListSerializer,
+)
+
+
+class DatabaseConnectionsView(APIView):
+    """
+    Connection churn of the process serving the request (every worker
+    process of a multi-process server keeps its own counters), and the
+    pool statistics with DB_POOL_MODE=pool.
+    """
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request, *args, **kwargs):
+        return Response(stats.as_dict())
+
+
+class ProfileViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Profiles of requests and Celery tasks (see monitoring.profiling),
+    newest first: the functions taking the most time and the SQL
+    timeline, and the full profile for download.
+    """
+
+    permission_classes = (IsAdminUser,)
+    pagination_class = KeysetPagination
+    query_budgets = {"list": 2, "retrieve": 2, "download": 2}
+
+    def get_queryset(self):
+        if self.action == "list":
+            return Profile.objects.defer("summary", "queries", "stats")
+        elif self.action == "retrieve":
+            return Profile.objects.defer("stats")
+        return Profile.objects.only("id", "stats")
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return ProfileListSerializer
+        return ProfileDetailSerializer
+
+    @extend_schema(
+        responses={
+            (200, "application/octet-stream"): OpenApiResponse(
+                OpenApiTypes.BINARY
+            )
+        }
+    )
+    @action(
+        detail=True,
+        methods=["GET"],
+        url_path="download",
+        url_name="download",
+    )
+    def download(self, request, *args, **kwargs):
+        """
+        The profile in pstats format, to open with
+        ``python -m pstats`` or snakeviz.
+        """
+        profile = self.get_object()
+        response = HttpResponse(
+            bytes(profile.stats), content_type="application/octet-stream"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="profile-{profile.id}.prof"'
+        )
+        return response
+
+
+def metrics(request):
+    """
+    Prometheus exposition of the metrics of every process of this
+    server, for scrapers rather than API clients. Outside of DEBUG it
+    is only served with METRICS_TOKEN set: per-view traffic and error
+    rates are not for anyone reaching the API.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not constant_time_compare(
+        request.headers.get("Authorization", ""),
+        f"Bearer {settings.METRICS_TOKEN}",
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
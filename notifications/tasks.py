@@ -1,23 +1,36 @@
 from datetime import date
+from typing import Iterator
 
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
 
 from borrowings.models import Borrowing
-from notifications.telegram import send_telegram
+from library_service.db_router import get_read_database
+from payments.models import Payment
+from notifications.telegram import (
+    TELEGRAM_MESSAGE_LIMIT,
+    pack_messages,
+    send_telegram,
+)
+
+OVERDUE_PROGRESS_TIMEOUT = 60 * 60 * 24
 
 
 @shared_task(
     bind=True, autoretry_for=(Exception,), retry_kwargs={"max_retries": 3}
 )
 def send_new_borrowing(self, borrowing_id: int) -> str:
-    borrowing = Borrowing.objects.get(id=borrowing_id)
+    borrowing = Borrowing.objects.select_related("book", "user").get(
+        id=borrowing_id
+    )
     text = (
         f"A new borrowing #{borrowing_id} of a book "
         f"'{borrowing.book.title}' has been "
         f"created at {borrowing.borrow_date} "
         f"with expected return date "
         f"of {borrowing.expected_return_date} by "
-        f"user #{borrowing.user.id} {borrowing.user.email}."
+        f"user #{borrowing.user_id} {borrowing.user.email}."
     )
     telegram_response = send_telegram(text)
     telegram_response.raise_for_status()
@@ -28,30 +41,83 @@ def send_new_borrowing(self, borrowing_id: int) -> str:
 @shared_task(
     bind=True, autoretry_for=(Exception,), retry_kwargs={"max_retries": 3}
 )
-def send_overdue_borrowings(self) -> str:
-    borrowings = list(
-        Borrowing.objects.filter(
-            actual_return_date=None, expected_return_date__lte=date.today()
-        )
-        .select_related("book", "user")
+def send_payment_received(self, session_id: str) -> str:
+    payment = Payment.objects.select_related("borrowing__book").get(
+        session_id=session_id
+    )
+    text = (
+        f"{payment.get_type_display()} #{payment.id} of "
+        f"{payment.money_to_pay} USD has been received for borrowing "
+        f"#{payment.borrowing_id} of a book "
+        f"'{payment.borrowing.book.title}'."
     )
+    telegram_response = send_telegram(text)
+    telegram_response.raise_for_status()
+
+    return f"payment={payment.id}, status={telegram_response.status_code}"
 
-    if not borrowings:
-        telegram_response = send_telegram("No borrowings overdue today!")
-        telegram_response.raise_for_status()
-        return f"No overdue, status={telegram_response.status_code}"
 
-    counter = 0
-    for borrowing in borrowings:
-        text = (
-            f"The borrowing #{borrowing.id} of a book "
-            f"'{borrowing.book.title}' is overdue."
+def iter_overdue_lines(after_id: int = 0) -> Iterator[tuple[int, str]]:
+    """
+    Streams (borrowing id, report line) pairs for overdue borrowings.
+    Only the fields the line needs are fetched, chunk by chunk through
+    a server-side cursor, so memory stays flat however many rows match.
+    The scan runs on a read replica when there is one.
+    """
+    rows = (
+        Borrowing.objects.using(get_read_database())
+        .filter(
+            actual_return_date=None,
+            expected_return_date__lte=date.today(),
+            id__gt=after_id,
+        )
+        .order_by("id")
+        .values_list(
+            "id",
+            "book__title",
+            "expected_return_date",
+            "user_id",
+            "user__email",
+        )
+        .iterator(chunk_size=settings.OVERDUE_CHUNK_SIZE)
+    )
+    for borrowing_id, title, expected_return_date, user_id, email in rows:
+        yield borrowing_id, (
+            f"The borrowing #{borrowing_id} of a book "
+            f"'{title}' is overdue. "
             f"Expected return date was "
-            f"{borrowing.expected_return_date} by user"
-            f"#{borrowing.user.id} {borrowing.user.email}."
+            f"{expected_return_date} by user "
+            f"#{user_id} {email}."
         )
+
+
+@shared_task(
+    bind=True, autoretry_for=(Exception,), retry_kwargs={"max_retries": 3}
+)
+def send_overdue_borrowings(self) -> str:
+    """
+    Sends the overdue report packed into as few messages as possible.
+    The id of the last delivered borrowing is checkpointed per task id,
+    so a retry resumes after it instead of re-sending the whole report.
+    """
+    progress_key = f"overdue-progress:{self.request.id}"
+    last_sent_id = cache.get(progress_key, 0)
+    lines = iter_overdue_lines(after_id=last_sent_id)
+
+    counter = messages = 0
+    for text, last_id, count in pack_messages(lines, TELEGRAM_MESSAGE_LIMIT):
         telegram_response = send_telegram(text)
         telegram_response.raise_for_status()
-        counter += 1
+        cache.set(progress_key, last_id, OVERDUE_PROGRESS_TIMEOUT)
+        counter += count
+        messages += 1
 
-    return f"{counter} overdue borrowings sent successfully."
+    if not messages and not last_sent_id:
+        telegram_response = send_telegram("No borrowings overdue today!")
+        telegram_response.raise_for_status()
+        return f"No overdue, status={telegram_response.status_code}"
+
+    return (
+        f"{counter} overdue borrowings sent successfully "
+        f"in {messages} messages."
+    )
@@ -1,18 +1,226 @@
+import asyncio
+import threading
+import time
+from typing import Hashable, Iterable, Iterator, Mapping
+
+import aiohttp
 import requests
 from django.conf import settings
 from requests import Response
+from requests.adapters import HTTPAdapter
 
+from monitoring.metrics import telegram_send_duration
 
-def send_telegram(text: str) -> Response:
-    response = requests.post(
-        url=f"https://api.telegram.org/bot{
-            settings.TELEGRAM_BOT_TOKEN
-        }/sendMessage",
-        json={
-            "chat_id": settings.TELEGRAM_CHAT_ID,
-            "text": text,
-        },
-        headers={"Content-Type": "application/json"},
-        timeout=5,
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+_session = None
+_session_lock = threading.Lock()
+_rate_lock = threading.Lock()
+_last_sent_at = 0.0
+
+
+def get_send_message_url() -> str:
+    return (
+        f"{settings.TELEGRAM_API_URL}/bot{settings.TELEGRAM_BOT_TOKEN}"
+        "/sendMessage"
     )
+
+
+def get_retry_delay(
+    status_code: int, headers: Mapping, body: dict | None, attempt: int
+) -> float | None:
+    """
+    Seconds to wait before retrying, or None if the response should not
+    be retried. Telegram reports flood control as a 429 with
+    ``parameters.retry_after``, which is honored before any backoff.
+    """
+    if status_code == 429:
+        retry_after = ((body or {}).get("parameters") or {}).get(
+            "retry_after", headers.get("Retry-After")
+        )
+        if retry_after is not None:
+            return float(retry_after)
+    elif status_code < 500:
+        return None
+    return settings.TELEGRAM_RETRY_BACKOFF * 2**attempt
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide session, so consecutive messages reuse a keep-alive
+    connection instead of doing a TLS handshake each.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.TELEGRAM_POOL_SIZE,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["Content-Type"] = "application/json"
+                _session = session
+    return _session
+
+
+def wait_for_rate_limit() -> None:
+    """
+    Keeps at least TELEGRAM_MIN_INTERVAL seconds between messages sent
+    by this process, which keeps us under Telegram's per-chat limits.
+    """
+    global _last_sent_at
+    with _rate_lock:
+        now = time.monotonic()
+        delay = _last_sent_at + settings.TELEGRAM_MIN_INTERVAL - now
+        if delay > 0:
+            time.sleep(delay)
+        _last_sent_at = time.monotonic()
+
+
+def send_telegram(text: str) -> Response:
+    """
+    Sends a message, retrying 429 and 5xx responses up to
+    TELEGRAM_MAX_RETRIES times. The last response is returned as is.
+    """
+    started = time.perf_counter()
+    result = "error"
+    try:
+        response = post_telegram(text)
+        if response.ok:
+            result = "ok"
+        return response
+    finally:
+        telegram_send_duration.labels(result).observe(
+            time.perf_counter() - started
+        )
+
+
+def post_telegram(text: str) -> Response:
+    for attempt in range(settings.TELEGRAM_MAX_RETRIES + 1):
+        wait_for_rate_limit()
+        response = get_session().post(
+            url=get_send_message_url(),
+            json={
+                "chat_id": settings.TELEGRAM_CHAT_ID,
+                "text": text,
+            },
+            timeout=settings.TELEGRAM_TIMEOUT,
+        )
+        if response.ok or attempt == settings.TELEGRAM_MAX_RETRIES:
+            return response
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        delay = get_retry_delay(
+            response.status_code, response.headers, body, attempt
+        )
+        if delay is None:
+            return response
+        time.sleep(delay)
     return response
+
+
+class AsyncTelegramClient:
+    """
+    aiohttp based client that keeps many sends in flight from a single
+    worker over a pooled keep-alive connector::
+
+        async with AsyncTelegramClient() as client:
+            await client.send_many(texts)
+    """
+
+    def __init__(self, concurrency: int | None = None):
+        self.concurrency = concurrency or settings.TELEGRAM_POOL_SIZE
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self) -> "AsyncTelegramClient":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=settings.TELEGRAM_TIMEOUT),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._session.close()
+
+    async def send(self, text: str) -> dict:
+        """
+        Sends a message and returns Telegram's response body.
+        Raises aiohttp.ClientResponseError once retries are exhausted.
+        """
+        async with self._semaphore:
+            started = time.perf_counter()
+            result = "error"
+            try:
+                body = await self.post(text)
+                result = "ok"
+                return body
+            finally:
+                telegram_send_duration.labels(result).observe(
+                    time.perf_counter() - started
+                )
+
+    async def post(self, text: str) -> dict:
+        for attempt in range(settings.TELEGRAM_MAX_RETRIES + 1):
+            async with self._session.post(
+                get_send_message_url(),
+                json={"chat_id": settings.TELEGRAM_CHAT_ID, "text": text},
+            ) as response:
+                try:
+                    body = await response.json(content_type=None)
+                except ValueError:
+                    # Proxies answer 502-504 with HTML or empty bodies.
+                    body = None
+                if response.ok:
+                    return body
+                delay = get_retry_delay(
+                    response.status, response.headers, body, attempt
+                )
+                if (
+                    delay is None
+                    or attempt == settings.TELEGRAM_MAX_RETRIES
+                ):
+                    response.raise_for_status()
+            await asyncio.sleep(delay)
+
+    async def send_many(self, texts: Iterable[str]) -> list:
+        """
+        Sends messages concurrently. Results keep the order of ``texts``;
+        a failed send is returned as its exception instead of raising.
+        """
+        return await asyncio.gather(
+            *(self.send(text) for text in texts), return_exceptions=True
+        )
+
+
+async def asend_telegram(text: str) -> dict:
+    async with AsyncTelegramClient(concurrency=1) as client:
+        return await client.send(text)
+
+
+def pack_messages(
+    lines: Iterable[tuple[Hashable, str]],
+    limit: int = TELEGRAM_MESSAGE_LIMIT,
+) -> Iterator[tuple[str, Hashable, int]]:
+    """
+    Joins (key, line) pairs into as few messages as fit under the limit.
+    Yields (text, key of the last line in it, number of lines in it).
+    A single line longer than the limit is truncated.
+    """
+    chunk, size, last_key = [], 0, None
+    for key, line in lines:
+        line = line[:limit]
+        if chunk and size + 1 + len(line) > limit:
+            yield "\n".join(chunk), last_key, len(chunk)
+            chunk, size = [], 0
+        size += len(line) + (1 if chunk else 0)
+        chunk.append(line)
+        last_key = key
+    if chunk:
+        yield "\n".join(chunk), last_key, len(chunk)
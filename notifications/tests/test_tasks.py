@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+import requests
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from books.models import Book
+from borrowings.models import Borrowing
+from monitoring.testing import QueryBudgetTestMixin
+from notifications.tasks import send_new_borrowing, send_overdue_borrowings
+from notifications.telegram import pack_messages
+
+
+class TestPackMessages(TestCase):
+    def test_lines_are_packed_under_limit(self):
+        lines = [(index, "x" * 40) for index in range(10)]
+        messages = list(pack_messages(lines, limit=100))
+        self.assertEqual([count for _, _, count in messages], [2] * 5)
+        self.assertEqual([key for _, key, _ in messages], [1, 3, 5, 7, 9])
+        for text, _, _ in messages:
+            self.assertLessEqual(len(text), 100)
+
+    def test_long_line_is_truncated(self):
+        messages = list(pack_messages([(1, "x" * 150)], limit=100))
+        self.assertEqual(messages, [("x" * 100, 1, 1)])
+
+
+@mock.patch("notifications.tasks.send_telegram")
+class TestSendNewBorrowing(QueryBudgetTestMixin, TestCase):
+    def test_borrowing_is_loaded_in_one_query(self, mock_send):
+        mock_send.return_value.status_code = 200
+        user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass12345"
+        )
+        book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            inventory=1,
+            daily_fee=Decimal("1.00"),
+        )
+        borrowing = Borrowing.objects.create(
+            user=user,
+            book=book,
+            expected_return_date=date.today() + timedelta(days=1),
+        )
+
+        with self.assertQueryBudget(1):
+            send_new_borrowing.apply(args=(borrowing.id,)).get()
+
+        self.assertIn("test@test.com", mock_send.call_args.args[0])
+
+
+@override_settings(TELEGRAM_MIN_INTERVAL=0)
+@mock.patch("notifications.tasks.TELEGRAM_MESSAGE_LIMIT", 300)
+@mock.patch("notifications.tasks.send_telegram")
+class TestSendOverdueBorrowings(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass12345"
+        )
+        book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=10,
+            daily_fee=Decimal("1.00"),
+        )
+        self.borrowings = [
+            Borrowing(
+                user=user,
+                book=book,
+                borrow_date=date.today() - timedelta(days=3),
+                expected_return_date=date.today() - timedelta(days=1),
+            )
+            for _ in range(6)
+        ]
+        Borrowing.objects.bulk_create(self.borrowings)
+
+    def test_overdue_report_is_batched(self, mock_send):
+        mock_send.return_value.status_code = 200
+
+        result = send_overdue_borrowings.apply().get()
+
+        self.assertEqual(mock_send.call_count, 3)
+        self.assertEqual(
+            result, "6 overdue borrowings sent successfully in 3 messages."
+        )
+
+    def test_retry_resumes_after_last_delivered_message(self, mock_send):
+        delivered = mock.Mock(status_code=200)
+        failed = mock.Mock()
+        failed.raise_for_status.side_effect = requests.HTTPError("429")
+        mock_send.side_effect = [delivered, failed, delivered, delivered]
+
+        send_overdue_borrowings.apply().get()
+
+        sent_texts = [call.args[0] for call in mock_send.call_args_list]
+        self.assertEqual(len(sent_texts), 4)
+        self.assertEqual(sent_texts[1], sent_texts[2])
+        delivered_texts = [sent_texts[0]] + sent_texts[2:]
+        for borrowing in self.borrowings:
+            self.assertEqual(
+                sum(
+                    f"borrowing #{borrowing.id} " in text
+                    for text in delivered_texts
+                ),
+                1,
+            )
+
+    def test_no_overdue_borrowings(self, mock_send):
+        mock_send.return_value.status_code = 200
+        Borrowing.objects.all().delete()
+
+        result = send_overdue_borrowings.apply().get()
+
+        mock_send.assert_called_once_with("No borrowings overdue today!")
+        self.assertEqual(result, "No overdue, status=200")
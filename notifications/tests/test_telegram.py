@@ -0,0 +1,141 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+from django.test import SimpleTestCase, override_settings
+
+from notifications.telegram import (
+    AsyncTelegramClient,
+    asend_telegram,
+    send_telegram,
+)
+
+
+class StubTelegramHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        self.server.requests.append(json.loads(self.rfile.read(length)))
+        with self.server.lock:
+            status, body = (
+                self.server.responses.pop(0)
+                if self.server.responses
+                else (200, {"ok": True, "result": {}})
+            )
+        # Bytes bodies stand for the HTML error pages of proxies.
+        html = isinstance(body, bytes)
+        payload = body if html else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header(
+            "Content-Type", "text/html" if html else "application/json"
+        )
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+BAD_GATEWAY = (502, b"<html><body>502 Bad Gateway</body></html>")
+
+FLOOD_CONTROL = (
+    429,
+    {"ok": False, "error_code": 429, "parameters": {"retry_after": 0}},
+)
+
+
+class TelegramClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), StubTelegramHandler
+        )
+        self.server.requests = []
+        self.server.responses = []
+        self.server.lock = threading.Lock()
+        thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings = override_settings(
+            TELEGRAM_API_URL=f"http://127.0.0.1:{self.server.server_port}",
+            TELEGRAM_BOT_TOKEN="token",
+            TELEGRAM_CHAT_ID="chat",
+            TELEGRAM_MIN_INTERVAL=0,
+            TELEGRAM_RETRY_BACKOFF=0,
+            TELEGRAM_MAX_RETRIES=2,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_send_telegram_retries_flood_control(self):
+        self.server.responses = [FLOOD_CONTROL]
+
+        response = send_telegram("hello")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(
+            self.server.requests[0], {"chat_id": "chat", "text": "hello"}
+        )
+
+    def test_send_telegram_does_not_retry_client_errors(self):
+        self.server.responses = [(400, {"ok": False})]
+
+        response = send_telegram("hello")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_send_telegram_gives_up_after_max_retries(self):
+        self.server.responses = [(502, {"ok": False})] * 5
+
+        response = send_telegram("hello")
+
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_async_client_sends_many_concurrently(self):
+        self.server.responses = [FLOOD_CONTROL]
+        texts = [f"message {i}" for i in range(10)]
+
+        async def send():
+            async with AsyncTelegramClient(concurrency=4) as client:
+                return await client.send_many(texts)
+
+        results = asyncio.run(send())
+
+        self.assertEqual(results, [{"ok": True, "result": {}}] * 10)
+        self.assertEqual(len(self.server.requests), 11)
+        self.assertEqual(
+            {request["text"] for request in self.server.requests}, set(texts)
+        )
+
+    def test_async_client_returns_failures(self):
+        self.server.responses = [(400, {"ok": False})]
+
+        async def send():
+            async with AsyncTelegramClient(concurrency=1) as client:
+                return await client.send_many(["bad", "good"])
+
+        bad, good = asyncio.run(send())
+
+        self.assertIsInstance(bad, Exception)
+        self.assertEqual(good, {"ok": True, "result": {}})
+
+    def test_async_client_retries_non_json_server_errors(self):
+        self.server.responses = [BAD_GATEWAY]
+
+        self.assertEqual(
+            asyncio.run(asend_telegram("hello")), {"ok": True, "result": {}}
+        )
+        self.assertEqual(len(self.server.requests), 2)
+
+        self.server.responses = [BAD_GATEWAY] * 3
+        with self.assertRaises(aiohttp.ClientResponseError) as cm:
+            asyncio.run(asend_telegram("hello"))
+        self.assertEqual(cm.exception.status, 502)
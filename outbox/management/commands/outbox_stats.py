@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from outbox.services import outbox_stats
+
+
+class Command(BaseCommand):
+    help = "Print outbox backlog depth and drain throughput."
+
+    def handle(self, *args, **options):
+        stats = outbox_stats()
+        last_drain = stats.pop("last_drain") or {}
+        for name, value in stats.items():
+            self.stdout.write(f"{name}: {value}")
+        for name, value in last_drain.items():
+            self.stdout.write(f"last_drain.{name}: {value}")
@@ -0,0 +1,27 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """
+    A Celery task call recorded in the same transaction as the rows
+    it is about, and published to the broker by dispatch_outbox.
+    """
+
+    task = models.CharField(max_length=255)
+    kwargs = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"], name="outbox_available_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task}({self.kwargs})"
@@ -0,0 +1,75 @@
+from celery import Task
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from outbox.models import OutboxMessage
+
+DISPATCHED_TOTAL_KEY = "outbox:dispatched-total"
+LAST_DRAIN_KEY = "outbox:last-drain"
+
+
+def schedule_dispatch() -> None:
+    from outbox.tasks import dispatch_outbox
+
+    # A broker outage must not fail the request: the message is already
+    # committed and the periodic dispatcher will pick it up.
+    transaction.on_commit(dispatch_outbox.delay, robust=True)
+
+
+def enqueue(task: Task, **kwargs) -> OutboxMessage:
+    """
+    Writes the task call to the outbox within the current transaction.
+    """
+    message = OutboxMessage.objects.create(task=task.name, kwargs=kwargs)
+    schedule_dispatch()
+    return message
+
+
+def enqueue_many(task: Task, kwargs_list: list[dict]) -> list[OutboxMessage]:
+    messages = OutboxMessage.objects.bulk_create(
+        OutboxMessage(task=task.name, kwargs=kwargs) for kwargs in kwargs_list
+    )
+    if messages:
+        schedule_dispatch()
+    return messages
+
+
+def record_drain(dispatched: int, seconds: float) -> None:
+    """
+    Records the throughput of a drain. Runs that found nothing to
+    dispatch (most beat runs) are not recorded, so last_drain keeps
+    describing the last drain that did.
+    """
+    if not dispatched:
+        return
+    cache.add(DISPATCHED_TOTAL_KEY, 0, timeout=None)
+    cache.incr(DISPATCHED_TOTAL_KEY, dispatched)
+    cache.set(
+        LAST_DRAIN_KEY,
+        {
+            "finished_at": timezone.now().isoformat(),
+            "dispatched": dispatched,
+            "seconds": round(seconds, 3),
+            "per_second": round(dispatched / seconds, 1) if seconds else None,
+        },
+        timeout=None,
+    )
+
+
+def outbox_stats() -> dict:
+    now = timezone.now()
+    oldest = (
+        OutboxMessage.objects.order_by("id")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    return {
+        "backlog": OutboxMessage.objects.count(),
+        "ready": OutboxMessage.objects.filter(available_at__lte=now).count(),
+        "oldest_age_seconds": (
+            round((now - oldest).total_seconds(), 1) if oldest else 0
+        ),
+        "dispatched_total": cache.get(DISPATCHED_TOTAL_KEY, 0),
+        "last_drain": cache.get(LAST_DRAIN_KEY),
+    }
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+
+from notifications.tasks import send_new_borrowing
+from outbox.models import OutboxMessage
+from outbox.services import enqueue, enqueue_many, outbox_stats
+from outbox.tasks import dispatch_outbox
+
+
+@mock.patch("notifications.tasks.send_new_borrowing.apply_async")
+class TestDispatchOutbox(TestCase):
+    def test_messages_are_published_in_batches_and_removed(self, mock_send):
+        enqueue_many(
+            send_new_borrowing, [{"borrowing_id": i} for i in range(5)]
+        )
+
+        dispatch_outbox(batch_size=2)
+
+        self.assertEqual(OutboxMessage.objects.count(), 0)
+        self.assertEqual(
+            [call.kwargs["kwargs"] for call in mock_send.call_args_list],
+            [{"borrowing_id": i} for i in range(5)],
+        )
+        self.assertEqual(outbox_stats()["last_drain"]["dispatched"], 5)
+
+        dispatch_outbox()
+
+        self.assertEqual(outbox_stats()["last_drain"]["dispatched"], 5)
+
+    def test_broker_failure_keeps_message_for_retry(self, mock_send):
+        mock_send.side_effect = [None, OperationalError("broker is down")]
+        first = enqueue(send_new_borrowing, borrowing_id=1)
+        second = enqueue(send_new_borrowing, borrowing_id=2)
+        third = enqueue(send_new_borrowing, borrowing_id=3)
+
+        dispatch_outbox()
+
+        self.assertFalse(OutboxMessage.objects.filter(id=first.id).exists())
+        second.refresh_from_db()
+        self.assertEqual(second.attempts, 1)
+        self.assertIn("broker is down", second.last_error)
+        self.assertGreater(second.available_at, timezone.now())
+        third.refresh_from_db()
+        self.assertEqual(third.attempts, 0)
+
+    def test_delayed_messages_are_not_published(self, mock_send):
+        message = enqueue(send_new_borrowing, borrowing_id=1)
+        message.available_at = timezone.now() + timedelta(minutes=1)
+        message.save(update_fields=["available_at"])
+
+        dispatch_outbox()
+
+        mock_send.assert_not_called()
+        self.assertEqual(outbox_stats()["backlog"], 1)
+        self.assertEqual(outbox_stats()["ready"], 0)
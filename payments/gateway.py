@@ -0,0 +1,264 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+
+import aiohttp
+import requests
+import stripe
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+from monitoring.metrics import payment_gateway_duration, payment_gateway_errors
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CheckoutSession:
+    id: str
+    url: str
+
+
+class GatewayError(Exception):
+    """
+    The gateway did not create the session. Transient errors (network,
+    timeouts, rate limits, 5xx) are worth retrying; the others are not.
+    """
+
+    def __init__(self, message: str, transient: bool = True):
+        super().__init__(message)
+        self.transient = transient
+
+
+class CircuitOpenError(GatewayError):
+    """
+    Raised without calling the gateway while it is considered down.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"Payment gateway unavailable, retry in {retry_after:.0f}s"
+        )
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast for PAYMENT_CIRCUIT_RESET_TIMEOUT seconds after
+    PAYMENT_CIRCUIT_FAILURES consecutive transient failures, then lets
+    a single trial call through: its success closes the circuit, its
+    failure opens it again. The state is per process.
+    """
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self.lock:
+            if self.opened_at is None:
+                return
+            elapsed = time.monotonic() - self.opened_at
+            retry_after = settings.PAYMENT_CIRCUIT_RESET_TIMEOUT - elapsed
+            if retry_after > 0 or self.trial:
+                raise CircuitOpenError(max(retry_after, 1))
+            self.trial = True
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if (
+                self.trial
+                or self.failures >= settings.PAYMENT_CIRCUIT_FAILURES
+            ):
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+    def release(self) -> None:
+        """
+        Ends a call that failed for a reason unrelated to the gateway's
+        health, e.g. invalid parameters.
+        """
+        with self.lock:
+            self.trial = False
+
+
+def get_idempotency_key(borrowing_id: int, payment_type: str) -> str:
+    """
+    A borrowing has at most one payment of each type, so retries of its
+    checkout, even from another worker, get the session created first.
+    """
+    return f"checkout-{borrowing_id}-{payment_type.lower()}"
+
+
+class PaymentGateway(ABC):
+    """
+    Creates checkout sessions. params are those of Stripe's
+    checkout.Session.create; failures raise GatewayError.
+    """
+
+    @abstractmethod
+    def create_checkout_session(
+        self, params: dict, idempotency_key: str
+    ) -> CheckoutSession:
+        pass
+
+    async def acreate_checkout_session(
+        self, params: dict, idempotency_key: str
+    ) -> CheckoutSession:
+        return await sync_to_async(self.create_checkout_session)(
+            params, idempotency_key
+        )
+
+
+class StripeGateway(PaymentGateway):
+    """
+    Stripe through a StripeClient of its own: keep-alive connections
+    pooled per process (aiohttp for the async method), connect and read
+    timeouts, and up to STRIPE_MAX_NETWORK_RETRIES retries of failed
+    requests by the SDK, which resends the idempotency key and honors
+    Stripe's Stripe-Should-Retry header.
+    """
+
+    def __init__(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=settings.STRIPE_POOL_SIZE
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        http_client = stripe.RequestsClient(
+            timeout=(
+                settings.STRIPE_CONNECT_TIMEOUT,
+                settings.STRIPE_READ_TIMEOUT,
+            ),
+            session=session,
+            async_fallback_client=stripe.AIOHTTPClient(
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=settings.STRIPE_CONNECT_TIMEOUT,
+                    sock_read=settings.STRIPE_READ_TIMEOUT,
+                )
+            ),
+        )
+        self.client = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY,
+            base_addresses={"api": settings.STRIPE_API_BASE},
+            http_client=http_client,
+            max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+        )
+        self.breaker = CircuitBreaker()
+
+    @staticmethod
+    def is_transient(exc: stripe.StripeError) -> bool:
+        if isinstance(exc, (stripe.APIConnectionError, stripe.RateLimitError)):
+            return True
+        return exc.http_status is None or exc.http_status >= 500
+
+    def before_call(self) -> None:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            payment_gateway_errors.labels("circuit_open").inc()
+            raise
+
+    def handle_error(self, exc: stripe.StripeError) -> GatewayError:
+        if self.is_transient(exc):
+            payment_gateway_errors.labels("transient").inc()
+            self.breaker.record_failure()
+            return GatewayError(str(exc))
+        payment_gateway_errors.labels("permanent").inc()
+        self.breaker.release()
+        return GatewayError(str(exc), transient=False)
+
+    def create_checkout_session(
+        self, params: dict, idempotency_key: str
+    ) -> CheckoutSession:
+        self.before_call()
+        started = time.perf_counter()
+        try:
+            session = self.client.v1.checkout.sessions.create(
+                params=params, options={"idempotency_key": idempotency_key}
+            )
+        except stripe.StripeError as exc:
+            raise self.handle_error(exc) from exc
+        finally:
+            payment_gateway_duration.observe(time.perf_counter() - started)
+        self.breaker.record_success()
+        return CheckoutSession(id=session.id, url=session.url)
+
+    async def acreate_checkout_session(
+        self, params: dict, idempotency_key: str
+    ) -> CheckoutSession:
+        self.before_call()
+        started = time.perf_counter()
+        try:
+            session = await self.client.v1.checkout.sessions.create_async(
+                params=params, options={"idempotency_key": idempotency_key}
+            )
+        except stripe.StripeError as exc:
+            raise self.handle_error(exc) from exc
+        finally:
+            payment_gateway_duration.observe(time.perf_counter() - started)
+        self.breaker.record_success()
+        return CheckoutSession(id=session.id, url=session.url)
+
+
+class FakeGateway(PaymentGateway):
+    """
+    Local gateway for tests, development and load tests. Sessions are
+    derived from the idempotency key, as Stripe would return the same
+    session for a retry, after PAYMENT_FAKE_LATENCY seconds. The last
+    calls are kept in calls as (params, idempotency_key).
+    """
+
+    def __init__(self):
+        self.calls = deque(maxlen=1000)
+
+    def create_checkout_session(
+        self, params: dict, idempotency_key: str
+    ) -> CheckoutSession:
+        if settings.PAYMENT_FAKE_LATENCY:
+            time.sleep(settings.PAYMENT_FAKE_LATENCY)
+        digest = hashlib.sha256(idempotency_key.encode()).hexdigest()[:24]
+        session = CheckoutSession(
+            id=f"cs_fake_{digest}",
+            url=f"https://checkout.stripe.com/c/pay/cs_fake_{digest}",
+        )
+        self.calls.append((params, idempotency_key))
+        return session
+
+
+def get_gateway() -> PaymentGateway:
+    """
+    Process-wide instance of PAYMENT_GATEWAY, so that its connections
+    and circuit breaker are shared by every payment of the process.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = import_string(settings.PAYMENT_GATEWAY)()
+    return _gateway
+
+
+@receiver(setting_changed)
+def reset_gateway(setting: str, **kwargs) -> None:
+    global _gateway
+    if setting.startswith(("PAYMENT_", "STRIPE_")):
+        _gateway = None
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                fields=("session_id",), name="payment_session_id_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:42
+
+from datetime import datetime, time, timezone
+
+from django.db import migrations, models
+
+
+def backfill_paid_at(apps, schema_editor):
+    """
+    Payments paid before paid_at existed are dated by the borrow date
+    of their borrowing (or left undated without one).
+    """
+    Payment = apps.get_model("payments", "Payment")
+    payments = Payment.objects.filter(
+        status="PAID", paid_at=None, borrowing__isnull=False
+    ).select_related("borrowing")
+    batch = []
+    for payment in payments.iterator(chunk_size=1000):
+        payment.paid_at = datetime.combine(
+            payment.borrowing.borrow_date, time.min, tzinfo=timezone.utc
+        )
+        batch.append(payment)
+        if len(batch) == 1000:
+            Payment.objects.bulk_update(batch, ["paid_at"])
+            batch = []
+    Payment.objects.bulk_update(batch, ["paid_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0004_borrowing_returned_idx"),
+        ("payments", "0004_stripeevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payment",
+            name="paid_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                condition=models.Q(("paid_at__isnull", False)),
+                fields=["paid_at"],
+                name="payment_paid_at_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_paid_at, migrations.RunPython.noop),
+    ]
@@ -3,8 +3,10 @@ from django.db import models
 
 class Payment(models.Model):
     class PaymentStatus(models.TextChoices):
+        INITIATED = "INITIATED", "Initiated"
         PENDING = "PENDING", "Pending"
         PAID = "PAID", "Paid"
+        FAILED = "FAILED", "Failed"
 
     class PaymentType(models.TextChoices):
         PAYMENT = "PAYMENT", "Payment"
@@ -18,9 +20,24 @@ class Payment(models.Model):
         null=True,
         related_name="payments",
     )
-    session_url = models.URLField()
-    session_id = models.CharField(max_length=200)
+    session_url = models.URLField(blank=True)
+    session_id = models.CharField(max_length=200, null=True, blank=True)
     money_to_pay = models.DecimalField(decimal_places=2, max_digits=20)
+    paid_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["session_id"], name="payment_session_id_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["paid_at"],
+                condition=models.Q(paid_at__isnull=False),
+                name="payment_paid_at_idx",
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -28,3 +45,18 @@ class Payment(models.Model):
             f"session_id: {self.session_id}, "
             f"status: {self.status}"
         )
+
+
+class StripeEvent(models.Model):
+    """
+    Ids of processed Stripe webhook events. Stripe delivers events at
+    least once, so a redelivered event is recognised by its primary key
+    and acknowledged without being processed again.
+    """
+
+    event_id = models.CharField(max_length=255, primary_key=True)
+    type = models.CharField(max_length=255)
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.type} {self.event_id}"
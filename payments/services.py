@@ -1,15 +1,16 @@
 from decimal import Decimal
 
-import stripe
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.http import HttpRequest
-from rest_framework.exceptions import ValidationError
+from django.utils import timezone
 from rest_framework.reverse import reverse
 
 from borrowings.models import Borrowing
-from payments.models import Payment
-
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from notifications.tasks import send_payment_received
+from outbox.services import enqueue
+from payments.gateway import get_gateway, get_idempotency_key
+from payments.models import Payment, StripeEvent
 
 
 def calculate_payable_days(
@@ -35,8 +36,25 @@ def calculate_price(
     return daily_fee * days * multiplier
 
 
+def build_checkout_urls(request: HttpRequest) -> tuple[str, str]:
+    """
+    Stripe success & cancel urls, built while the request is still
+    available so the checkout session can be created later by a task.
+    """
+    success_url = (
+        reverse("payments:payment-success", request=request)
+        + "?session_id={CHECKOUT_SESSION_ID}"
+    )
+    cancel_url = (
+        reverse("payments:payment-cancel", request=request)
+        + "?session_id={CHECKOUT_SESSION_ID}"
+    )
+    return success_url, cancel_url
+
+
 def build_stripe_kwargs(
-    request: HttpRequest,
+    success_url: str,
+    cancel_url: str,
     book_title: str,
     payment_type: Payment.PaymentType,
     days: int,
@@ -60,52 +78,113 @@ def build_stripe_kwargs(
             }
         ],
         "mode": "payment",
-        "success_url": f"{reverse(
-            'payments:payment-success', request=request
-        )}"
-        + "?session_id={CHECKOUT_SESSION_ID}",
-        "cancel_url": f"{reverse('payments:payment-cancel', request=request)}"
-        + "?session_id={CHECKOUT_SESSION_ID}",
+        "success_url": success_url,
+        "cancel_url": cancel_url,
     }
     return kwargs
 
 
-def create_stripe_payment(
-    request: HttpRequest,
+def build_pending_payment(
     borrowing: Borrowing,
     payment_type: Payment.PaymentType = Payment.PaymentType.PAYMENT,
 ) -> Payment:
     """
-    Accepts request as first parameter
-    to create success & cancel urls.
+    Unsaved initiated payment, for callers that bulk_create them.
     """
     days = calculate_payable_days(borrowing, payment_type)
     price = calculate_price(borrowing.book.daily_fee, days, payment_type)
-    try:
-        session = stripe.checkout.Session.create(
-            **build_stripe_kwargs(
-                request, borrowing.book.title, payment_type, days, price
-            )
-        )
-    except stripe.StripeError:
-        raise ValidationError("A Stripe error occurred")
-    payment = Payment.objects.create(
-        status=Payment.PaymentStatus.PENDING,
+    return Payment(
+        status=Payment.PaymentStatus.INITIATED,
         type=payment_type,
         borrowing=borrowing,
         money_to_pay=price,
+    )
+
+
+def create_pending_payment(
+    borrowing: Borrowing,
+    payment_type: Payment.PaymentType = Payment.PaymentType.PAYMENT,
+) -> Payment:
+    """
+    Records the payment intent without talking to Stripe, so it can be
+    done inside the short borrow/return transaction. The checkout
+    session is attached later by create_checkout_session.
+    """
+    payment = build_pending_payment(borrowing, payment_type)
+    payment.save()
+    return payment
+
+
+def create_checkout_session(
+    payment: Payment, success_url: str, cancel_url: str
+) -> Payment:
+    """
+    Creates the Stripe checkout session for an initiated payment
+    and moves it to PENDING. Raises payments.gateway.GatewayError on
+    failure.
+    """
+    payment_type = Payment.PaymentType(payment.type)
+    days = calculate_payable_days(payment.borrowing, payment_type)
+    session = get_gateway().create_checkout_session(
+        build_stripe_kwargs(
+            success_url,
+            cancel_url,
+            payment.borrowing.book.title,
+            payment_type,
+            days,
+            payment.money_to_pay,
+        ),
+        idempotency_key=get_idempotency_key(
+            payment.borrowing_id, payment_type
+        ),
+    )
+    Payment.objects.filter(
+        id=payment.id, status=Payment.PaymentStatus.INITIATED
+    ).update(
+        status=Payment.PaymentStatus.PENDING,
         session_id=session.id,
         session_url=session.url,
     )
+    payment.status = Payment.PaymentStatus.PENDING
+    payment.session_id = session.id
+    payment.session_url = session.url
     return payment
 
 
-def mark_paid(session_id: str) -> None:
-    payment = Payment.objects.filter(
+def mark_failed(payment_id: int) -> None:
+    Payment.objects.filter(
+        id=payment_id, status=Payment.PaymentStatus.INITIATED
+    ).update(status=Payment.PaymentStatus.FAILED)
+
+
+def mark_paid(session_id: str) -> int:
+    """
+    Marks the pending payment of a checkout session as paid with a
+    single conditional UPDATE, so concurrent or repeated deliveries
+    cannot pay it twice. Follow-up work is deferred to the outbox
+    and only scheduled by the delivery that changed the row.
+    Returns the number of updated payments (0 or 1).
+    """
+    updated = Payment.objects.filter(
         session_id=session_id,
         status=Payment.PaymentStatus.PENDING,
-    ).first()
+    ).update(status=Payment.PaymentStatus.PAID, paid_at=timezone.now())
+
+    if updated:
+        enqueue(send_payment_received, session_id=session_id)
+    return updated
 
-    if payment:
-        payment.status = Payment.PaymentStatus.PAID
-        payment.save(update_fields=["status"])
+
+def record_event(event_id: str, event_type: str) -> bool:
+    """
+    Stores the id of a webhook event. Returns False if the event has
+    already been recorded, i.e. this delivery is a duplicate.
+    A concurrent delivery of the same event waits on the primary key
+    until the first one commits, then is reported as a duplicate.
+    """
+    try:
+        with transaction.atomic():
+            StripeEvent.objects.create(event_id=event_id, type=event_type)
+    except IntegrityError:
+        return False
+    return True
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from payments.gateway import GatewayError
+from payments.models import Payment, StripeEvent
+from payments.services import create_checkout_session, mark_failed
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5)
+def create_payment_session(
+    self, payment_id: int, success_url: str, cancel_url: str
+) -> str:
+    payment = Payment.objects.select_related("borrowing__book").get(
+        id=payment_id
+    )
+    if payment.status != Payment.PaymentStatus.INITIATED:
+        return f"payment={payment_id}, status={payment.status}"
+
+    try:
+        create_checkout_session(payment, success_url, cancel_url)
+    except GatewayError as exc:
+        if not exc.transient or self.request.retries >= self.max_retries:
+            mark_failed(payment_id)
+            raise
+        # An open circuit tells when the gateway is worth trying again.
+        raise self.retry(exc=exc, countdown=getattr(exc, "retry_after", None))
+
+    return f"payment={payment_id}, session={payment.session_id}"
+
+
+@shared_task
+def purge_stripe_events() -> str:
+    """
+    Forgets processed webhook events once Stripe can no longer
+    redeliver them, keeping the de-duplication table small.
+    """
+    cutoff = timezone.now() - timedelta(
+        days=settings.STRIPE_EVENT_RETENTION_DAYS
+    )
+    deleted, _ = StripeEvent.objects.filter(received_at__lt=cutoff).delete()
+    return f"{deleted} stripe events purged."
@@ -0,0 +1,114 @@
+from unittest import mock
+
+import stripe
+from django.test import SimpleTestCase, override_settings
+from prometheus_client import REGISTRY
+
+from payments.gateway import (
+    CircuitBreaker,
+    CircuitOpenError,
+    GatewayError,
+    StripeGateway,
+)
+
+
+@override_settings(
+    PAYMENT_CIRCUIT_FAILURES=2, PAYMENT_CIRCUIT_RESET_TIMEOUT=30
+)
+class TestCircuitBreaker(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.breaker.before_call()
+        self.breaker.record_failure()
+
+        with self.assertRaises(CircuitOpenError) as context:
+            self.breaker.before_call()
+        self.assertGreater(context.exception.retry_after, 29)
+
+    def test_success_resets_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.breaker.before_call()
+
+    @mock.patch("payments.gateway.time.monotonic")
+    def test_single_trial_after_reset_timeout(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        mock_monotonic.return_value = 131
+        self.breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+        self.breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+        mock_monotonic.return_value = 162
+        self.breaker.before_call()
+        self.breaker.record_success()
+        self.breaker.before_call()
+
+
+@override_settings(PAYMENT_CIRCUIT_FAILURES=2)
+class TestStripeGateway(SimpleTestCase):
+    def setUp(self):
+        self.gateway = StripeGateway()
+        self.sessions = self.gateway.client.v1.checkout.sessions
+
+    def test_session_is_created_with_idempotency_key(self):
+        with mock.patch.object(self.sessions, "create") as mock_create:
+            mock_create.return_value = stripe.checkout.Session.construct_from(
+                {"id": "cs_test", "url": "https://checkout"}, "key"
+            )
+            session = self.gateway.create_checkout_session(
+                {"mode": "payment"}, "checkout-1-payment"
+            )
+
+        self.assertEqual(session.id, "cs_test")
+        self.assertEqual(session.url, "https://checkout")
+        mock_create.assert_called_once_with(
+            params={"mode": "payment"},
+            options={"idempotency_key": "checkout-1-payment"},
+        )
+
+    def test_transient_errors_open_circuit(self):
+        def errors(kind):
+            return (
+                REGISTRY.get_sample_value(
+                    "payment_gateway_errors_total", {"kind": kind}
+                )
+                or 0
+            )
+
+        before = {kind: errors(kind) for kind in ("transient", "circuit_open")}
+        with mock.patch.object(self.sessions, "create") as mock_create:
+            mock_create.side_effect = stripe.APIConnectionError("Timeout")
+            for _ in range(2):
+                with self.assertRaises(GatewayError) as context:
+                    self.gateway.create_checkout_session({}, "key")
+                self.assertTrue(context.exception.transient)
+
+            with self.assertRaises(CircuitOpenError):
+                self.gateway.create_checkout_session({}, "key")
+        self.assertEqual(mock_create.call_count, 2)
+        self.assertEqual(errors("transient"), before["transient"] + 2)
+        self.assertEqual(errors("circuit_open"), before["circuit_open"] + 1)
+
+    def test_rejections_do_not_open_circuit(self):
+        with mock.patch.object(self.sessions, "create") as mock_create:
+            mock_create.side_effect = stripe.InvalidRequestError(
+                "Invalid amount", "amount", http_status=400
+            )
+            for _ in range(3):
+                with self.assertRaises(GatewayError) as context:
+                    self.gateway.create_checkout_session({}, "key")
+                self.assertFalse(context.exception.transient)
+        self.assertEqual(mock_create.call_count, 3)
@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.gateway import FakeGateway, GatewayError, get_gateway
+from payments.models import Payment, StripeEvent
+from payments.tasks import create_payment_session, purge_stripe_events
+
+
+@override_settings(PAYMENT_GATEWAY="payments.gateway.FakeGateway")
+class TestCreatePaymentSession(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass12345"
+        )
+        book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=10,
+            daily_fee=Decimal("1.00"),
+        )
+        self.borrowing = Borrowing.objects.create(
+            book=book,
+            user=user,
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=2),
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            status=Payment.PaymentStatus.INITIATED,
+            type=Payment.PaymentType.PAYMENT,
+            money_to_pay=Decimal("2.00"),
+        )
+
+    def test_session_is_attached_to_initiated_payment(self):
+        create_payment_session(self.payment.id, "success", "cancel")
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.PaymentStatus.PENDING)
+        self.assertTrue(self.payment.session_id.startswith("cs_fake_"))
+        self.assertTrue(
+            self.payment.session_url.endswith(self.payment.session_id)
+        )
+        params, idempotency_key = get_gateway().calls[-1]
+        self.assertEqual(params["success_url"], "success")
+        self.assertEqual(
+            params["line_items"][0]["price_data"]["unit_amount"], 200
+        )
+        self.assertEqual(
+            idempotency_key, f"checkout-{self.borrowing.id}-payment"
+        )
+
+    @mock.patch.object(FakeGateway, "create_checkout_session")
+    def test_payment_fails_after_retries(self, mock_create):
+        mock_create.side_effect = GatewayError("Stripe is down")
+
+        create_payment_session.apply(args=(self.payment.id, "s", "c"))
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.PaymentStatus.FAILED)
+        self.assertEqual(mock_create.call_count, 4)
+
+    @mock.patch.object(FakeGateway, "create_checkout_session")
+    def test_payment_fails_without_retry_on_rejection(self, mock_create):
+        mock_create.side_effect = GatewayError("Invalid", transient=False)
+
+        create_payment_session.apply(args=(self.payment.id, "s", "c"))
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.PaymentStatus.FAILED)
+        self.assertEqual(mock_create.call_count, 1)
+
+    def test_already_processed_payment_is_skipped(self):
+        self.payment.status = Payment.PaymentStatus.PENDING
+        self.payment.save(update_fields=["status"])
+
+        create_payment_session(self.payment.id, "success", "cancel")
+
+        self.assertEqual(len(get_gateway().calls), 0)
+
+
+class TestPurgeStripeEvents(TestCase):
+    @override_settings(STRIPE_EVENT_RETENTION_DAYS=7)
+    def test_only_expired_events_are_purged(self):
+        StripeEvent.objects.create(event_id="evt_old", type="test")
+        StripeEvent.objects.create(event_id="evt_new", type="test")
+        StripeEvent.objects.filter(event_id="evt_old").update(
+            received_at=timezone.now() - timedelta(days=8)
+        )
+
+        result = purge_stripe_events()
+
+        self.assertEqual(result, "1 stripe events purged.")
+        self.assertQuerySetEqual(
+            StripeEvent.objects.values_list("event_id", flat=True),
+            ["evt_new"],
+        )
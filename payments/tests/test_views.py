@@ -13,7 +13,17 @@ from rest_framework.test import APIClient
 
 from books.models import Book
 from borrowings.models import Borrowing
-from payments.models import Payment
+from outbox.models import OutboxMessage
+from payments.models import Payment, StripeEvent
+
+
+def sign_payload(payload: str, secret: str) -> str:
+    timestamp = str(int(time()))
+    signed_payload = f"{timestamp}.{payload}".encode()
+    signature = hmac.new(
+        secret.encode(), signed_payload, hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
 
 
 class TestViews(TestCase):
@@ -108,6 +118,7 @@ class TestViews(TestCase):
             session_id="test_id",
         )
         payload_dict = {
+            "id": "evt_test",
             "type": "checkout.session.completed",
             "data": {"object": {"id": "test_id"}},
         }
@@ -136,6 +147,7 @@ class TestViews(TestCase):
     @override_settings(STRIPE_WEBHOOK_SECRET="super_secret12345")
     def test_stripe_webhook_not_accessible_by_anyone(self, mocked_marking):
         payload_dict = {
+            "id": "evt_test",
             "type": "checkout.session.completed",
             "data": {"object": {"id": "test_id"}},
         }
@@ -158,3 +170,64 @@ class TestViews(TestCase):
 
         self.assertEqual(response.status_code, 400)
         self.assertEqual(mocked_marking.call_count, 0)
+
+    def test_payment_list_page_size_is_capped(self):
+        for index in range(3):
+            Payment.objects.create(
+                borrowing=self.borrowing,
+                status="PAID",
+                type="PAYMENT",
+                money_to_pay=Decimal("1.00"),
+                session_url=f"test_url{index}",
+                session_id=f"test_id{index}",
+            )
+        url = reverse("payments:payment-list")
+        with override_settings(API_MAX_PAGE_SIZE=2):
+            response = self.client.get(url, query_params={"page_size": 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["previous"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+    @override_settings(STRIPE_WEBHOOK_SECRET="super_secret1234")
+    def test_stripe_webhook_ignores_redelivered_event(self):
+        payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            status="PENDING",
+            type="PAYMENT",
+            money_to_pay=Decimal("1.00"),
+            session_url="test_url1234",
+            session_id="test_id",
+        )
+        payload = json.dumps(
+            {
+                "id": "evt_test",
+                "type": "checkout.session.completed",
+                "data": {"object": {"id": "test_id"}},
+            }
+        )
+        url = reverse("payments:stripe_webhook")
+
+        for _ in range(2):
+            response = self.client.post(
+                url,
+                data=payload,
+                content_type="application/json",
+                HTTP_STRIPE_SIGNATURE=sign_payload(
+                    payload, "super_secret1234"
+                ),
+            )
+            self.assertEqual(response.status_code, 200)
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, "PAID")
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        self.assertEqual(
+            OutboxMessage.objects.filter(
+                task="notifications.tasks.send_payment_received"
+            ).count(),
+            1,
+        )
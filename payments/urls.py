@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from payments.views import PaymentsViewSet, stripe_webhook
+from payments.views import (
+    PaymentsViewSet,
+    async_payment_success,
+    stripe_webhook,
+)
 
 router = DefaultRouter()
 router.register("", PaymentsViewSet, basename="payment")
@@ -12,3 +17,8 @@ urlpatterns = [
     path("stripe-webhook/", stripe_webhook, name="stripe_webhook"),
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        path("success/", async_payment_success, name="payment-success"),
+    ] + urlpatterns
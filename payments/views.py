@@ -1,4 +1,6 @@
 import stripe
+from django.db import transaction
+from django.shortcuts import aget_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
@@ -10,19 +12,38 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from django.conf import settings
+from library_service.async_views import async_read_view, render_json
+from library_service.db_router import ReplicaReadMixin
 from payments.models import Payment
+from payments.pagination import PaymentPagination
 from payments.serializers import PaymentSerializer
-from payments.services import mark_paid
+from payments.services import mark_paid, record_event
+
+PAID_EVENT_TYPES = (
+    "checkout.session.completed",
+    "checkout.session.async_payment_succeeded",
+)
 
 
 class PaymentsViewSet(
-    mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+    ReplicaReadMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
 ):
     permission_classes = (IsAuthenticated,)
     serializer_class = PaymentSerializer
+    pagination_class = PaymentPagination
+    query_budgets = {
+        "list": 2,
+        "retrieve": 2,
+        "payment_success": 2,
+        "payment_cancel": 2,
+    }
 
     def get_queryset(self):
-        qs = Payment.objects.select_related("borrowing")
+        # The serializer only needs borrowing_id.
+        qs = Payment.objects.all()
         if self.request.user.is_staff:
             return qs
         return qs.filter(borrowing__user=self.request.user)
@@ -96,12 +117,37 @@ class PaymentsViewSet(
         )
 
 
+@async_read_view(
+    PaymentsViewSet.as_view(
+        {"get": "payment_success"},
+        basename="payment",
+        detail=False,
+        **PaymentsViewSet.payment_success.kwargs,
+    ),
+    permission_classes=PaymentsViewSet.permission_classes,
+)
+async def async_payment_success(request):
+    session_id = request.query_params.get("session_id")
+    if not session_id:
+        raise ValidationError("session_id query param is required")
+
+    view = PaymentsViewSet(
+        request=request, action="payment_success", format_kwarg=None
+    )
+    payment = await aget_object_or_404(
+        view.get_queryset(), session_id=session_id
+    )
+    return render_json({"status": payment.get_status_display()})
+
+
 @csrf_exempt
 @api_view(http_method_names=["POST"])
 def stripe_webhook(request):
     """
     Endpoint for Stripe 'successful payment' event webhook.
     Should not be used by frontend directly.
+    Redelivered events are acknowledged without being processed again,
+    and notifications are sent by Celery, so Stripe gets a quick 200.
     """
     payload = request.body
     sig_header = request.META["HTTP_STRIPE_SIGNATURE"]
@@ -113,10 +159,11 @@ def stripe_webhook(request):
     except (ValueError, stripe.error.SignatureVerificationError):
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
-    if (
-        event["type"] == "checkout.session.completed"
-        or event["type"] == "checkout.session.async_payment_succeeded"
-    ):
-        mark_paid(event["data"]["object"]["id"])
+    with transaction.atomic():
+        if (
+            record_event(event["id"], event["type"])
+            and event["type"] in PAID_EVENT_TYPES
+        ):
+            mark_paid(event["data"]["object"]["id"])
 
     return Response(status=status.HTTP_200_OK)
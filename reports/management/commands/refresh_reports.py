@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from reports.services import get_history_start, refresh_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the report summaries from the whole borrowing history "
+        "(or from --since), e.g. after loaddata. The periodic refresh "
+        "only recomputes the last few days."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            help="First day to recompute (YYYY-MM-DD).",
+        )
+
+    def handle(self, *args, **options):
+        start = options["since"] or get_history_start()
+        if start is None:
+            self.stdout.write(self.style.SUCCESS("No borrowings yet."))
+            return
+        written = refresh_summaries(start)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Summaries since {start} rebuilt: "
+                + ", ".join(
+                    f"{count} {name}" for name, count in written.items()
+                )
+            )
+        )
@@ -0,0 +1,57 @@
+from django.db import models
+
+from payments.models import Payment
+
+
+class DailyLoanStats(models.Model):
+    """
+    Borrowings summed up per day: borrowed on the day, returned on the
+    day (and the total length of those loans in days), and overdue at
+    the end of the day. Refreshed by reports.services.refresh_reports.
+    """
+
+    day = models.DateField(primary_key=True)
+    borrowed = models.PositiveIntegerField(default=0)
+    returned = models.PositiveIntegerField(default=0)
+    loan_days = models.PositiveBigIntegerField(default=0)
+    overdue = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.borrowed} borrowed, {self.overdue} overdue"
+
+
+class DailyBookLoans(models.Model):
+    day = models.DateField()
+    book = models.ForeignKey(
+        "books.Book", on_delete=models.CASCADE, related_name="+"
+    )
+    borrowed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "book"], name="daily_book_loans_day_book_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: book {self.book_id} borrowed {self.borrowed}"
+
+
+class DailyRevenue(models.Model):
+    day = models.DateField()
+    type = models.CharField(
+        choices=Payment.PaymentType.choices, max_length=64
+    )
+    payments = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(decimal_places=2, max_digits=20, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "type"], name="daily_revenue_day_type_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.type} {self.amount}"
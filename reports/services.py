@@ -0,0 +1,142 @@
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Min,
+    Sum,
+)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from borrowings.models import Borrowing
+from payments.models import Payment
+from reports.models import DailyBookLoans, DailyLoanStats, DailyRevenue
+
+
+def get_refresh_start() -> date:
+    """
+    First day whose summaries a periodic refresh recomputes. Days
+    before it are final: borrowings are created with a borrow date of
+    today or later, and books are returned and payments paid today.
+    """
+    return date.today() - timedelta(days=settings.REPORTS_REFRESH_DAYS)
+
+
+def get_history_start() -> date | None:
+    return Borrowing.objects.aggregate(start=Min("borrow_date"))["start"]
+
+
+def count_overdue(day: date) -> int:
+    """
+    Borrowings past their expected return date and not returned by the
+    end of the day. Each half is served by a partial index.
+    """
+    overdue = Borrowing.objects.filter(
+        actual_return_date=None, expected_return_date__lt=day
+    ).count()
+    if day < date.today():
+        overdue += Borrowing.objects.filter(
+            actual_return_date__gt=day, expected_return_date__lt=day
+        ).count()
+    return overdue
+
+
+def refresh_loans(start: date) -> int:
+    stats = {}
+
+    def get_stats(day: date) -> DailyLoanStats:
+        if day not in stats:
+            stats[day] = DailyLoanStats(day=day)
+        return stats[day]
+
+    borrowed = (
+        Borrowing.objects.filter(borrow_date__gte=start)
+        .values("borrow_date")
+        .annotate(count=Count("id"))
+        .values_list("borrow_date", "count")
+    )
+    for day, count in borrowed:
+        get_stats(day).borrowed = count
+
+    loan_length = ExpressionWrapper(
+        F("actual_return_date") - F("borrow_date"),
+        output_field=DurationField(),
+    )
+    returned = (
+        Borrowing.objects.filter(actual_return_date__gte=start)
+        .values("actual_return_date")
+        .annotate(count=Count("id"), length=Sum(loan_length))
+        .values_list("actual_return_date", "count", "length")
+    )
+    for day, count, length in returned:
+        get_stats(day).returned = count
+        get_stats(day).loan_days = length.days
+
+    day = start
+    while day <= date.today():
+        get_stats(day).overdue = count_overdue(day)
+        day += timedelta(days=1)
+
+    DailyLoanStats.objects.filter(day__gte=start).delete()
+    DailyLoanStats.objects.bulk_create(stats.values(), batch_size=1000)
+    return len(stats)
+
+
+def refresh_book_loans(start: date) -> int:
+    rows = (
+        Borrowing.objects.filter(borrow_date__gte=start)
+        .values("borrow_date", "book_id")
+        .annotate(count=Count("id"))
+        .values_list("borrow_date", "book_id", "count")
+    )
+    DailyBookLoans.objects.filter(day__gte=start).delete()
+    created = DailyBookLoans.objects.bulk_create(
+        (
+            DailyBookLoans(day=day, book_id=book_id, borrowed=count)
+            for day, book_id, count in rows
+        ),
+        batch_size=1000,
+    )
+    return len(created)
+
+
+def refresh_revenue(start: date) -> int:
+    since = timezone.make_aware(datetime.combine(start, time.min))
+    rows = (
+        Payment.objects.filter(
+            status=Payment.PaymentStatus.PAID, paid_at__gte=since
+        )
+        .annotate(day=TruncDate("paid_at"))
+        .values("day", "type")
+        .annotate(count=Count("id"), amount=Sum("money_to_pay"))
+        .values_list("day", "type", "count", "amount")
+    )
+    DailyRevenue.objects.filter(day__gte=start).delete()
+    created = DailyRevenue.objects.bulk_create(
+        (
+            DailyRevenue(
+                day=day, type=payment_type, payments=count, amount=amount
+            )
+            for day, payment_type, count, amount in rows
+        ),
+        batch_size=1000,
+    )
+    return len(created)
+
+
+def refresh_summaries(start: date) -> dict[str, int]:
+    """
+    Recomputes every summary from start on, in one transaction, and
+    returns the number of rows written per summary.
+    """
+    with transaction.atomic():
+        return {
+            "loans": refresh_loans(start),
+            "book_loans": refresh_book_loans(start),
+            "revenue": refresh_revenue(start),
+        }
@@ -0,0 +1,22 @@
+from celery import shared_task
+from django.core.cache import cache
+
+from reports.services import get_refresh_start, refresh_summaries
+
+REFRESH_LOCK_KEY = "reports:refresh-lock"
+REFRESH_LOCK_TIMEOUT = 60 * 10
+
+
+@shared_task
+def refresh_reports() -> str:
+    """
+    Recomputes the last REPORTS_REFRESH_DAYS days of the report
+    summaries. Skipped while another refresh is running.
+    """
+    if not cache.add(REFRESH_LOCK_KEY, 1, REFRESH_LOCK_TIMEOUT):
+        return "Another refresh is running."
+    try:
+        written = refresh_summaries(get_refresh_start())
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+    return ", ".join(f"{count} {name}" for name, count in written.items())
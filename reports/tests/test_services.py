@@ -0,0 +1,125 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.models import Payment
+from reports.models import DailyBookLoans, DailyLoanStats, DailyRevenue
+from reports.services import get_refresh_start, refresh_summaries
+
+
+def days_ago(days: int) -> date:
+    return date.today() - timedelta(days=days)
+
+
+class TestRefreshSummaries(TestCase):
+    def setUp(self):
+        self.books = [
+            Book.objects.create(
+                title=title,
+                author="Test Author",
+                cover="SOFT",
+                inventory=10,
+                daily_fee=Decimal("1.00"),
+            )
+            for title in ("Popular", "Other")
+        ]
+        user = get_user_model().objects.create_user(
+            email="user@user.com", password="testuser123"
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                user=user,
+                book=self.books[book],
+                borrow_date=days_ago(borrowed),
+                expected_return_date=days_ago(expected),
+                actual_return_date=(
+                    None if returned is None else days_ago(returned)
+                ),
+            )
+            for book, borrowed, expected, returned in [
+                (0, 10, 5, 3),
+                (0, 10, 2, None),
+                (0, 10, -1, 8),
+                (1, -2, -5, None),
+            ]
+        ]
+        for payment_type, amount, paid in [
+            (Payment.PaymentType.PAYMENT, "5.00", 1),
+            (Payment.PaymentType.FINE, "3.00", 0),
+        ]:
+            Payment.objects.create(
+                borrowing=self.borrowings[0],
+                status=Payment.PaymentStatus.PAID,
+                type=payment_type,
+                money_to_pay=Decimal(amount),
+                session_id=f"paid_{paid}",
+                paid_at=timezone.make_aware(
+                    datetime.combine(days_ago(paid), time(12))
+                ),
+            )
+        Payment.objects.create(
+            borrowing=self.borrowings[1],
+            status=Payment.PaymentStatus.PENDING,
+            type=Payment.PaymentType.PAYMENT,
+            money_to_pay=Decimal("7.00"),
+            session_id="pending",
+        )
+
+    def test_refresh_summaries(self):
+        refresh_summaries(days_ago(10))
+
+        stats = {stats.day: stats for stats in DailyLoanStats.objects.all()}
+        self.assertEqual(stats[days_ago(10)].borrowed, 3)
+        self.assertEqual(stats[days_ago(-2)].borrowed, 1)
+        self.assertEqual(
+            (stats[days_ago(8)].returned, stats[days_ago(8)].loan_days),
+            (1, 2),
+        )
+        self.assertEqual(
+            (stats[days_ago(3)].returned, stats[days_ago(3)].loan_days),
+            (1, 7),
+        )
+        self.assertEqual(
+            [
+                days_ago(days)
+                for days in range(10, -1, -1)
+                if stats[days_ago(days)].overdue
+            ],
+            [days_ago(4), days_ago(1), days_ago(0)],
+        )
+        self.assertEqual(
+            set(
+                DailyBookLoans.objects.values_list(
+                    "day", "book_id", "borrowed"
+                )
+            ),
+            {
+                (days_ago(10), self.books[0].id, 3),
+                (days_ago(-2), self.books[1].id, 1),
+            },
+        )
+        self.assertEqual(
+            set(DailyRevenue.objects.values_list("day", "type", "amount")),
+            {
+                (days_ago(1), "PAYMENT", Decimal("5.00")),
+                (days_ago(0), "FINE", Decimal("3.00")),
+            },
+        )
+
+    def test_periodic_refresh_keeps_older_days(self):
+        refresh_summaries(days_ago(10))
+        self.borrowings[2].delete()
+
+        refresh_summaries(get_refresh_start())
+
+        self.assertEqual(
+            DailyLoanStats.objects.get(day=days_ago(10)).borrowed, 3
+        )
+        self.assertEqual(
+            DailyLoanStats.objects.get(day=days_ago(0)).overdue, 1
+        )
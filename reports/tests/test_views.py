@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from reports.models import DailyBookLoans, DailyLoanStats, DailyRevenue
+
+
+class TestReportsViews(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@admin.com", password="testuser123", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        today = date.today()
+        book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=10,
+            daily_fee=Decimal("1.00"),
+        )
+        for days, overdue, returned, loan_days in [
+            (0, 2, 1, 3),
+            (1, 1, 1, 6),
+            (40, 9, 5, 50),
+        ]:
+            day = today - timedelta(days=days)
+            DailyLoanStats.objects.create(
+                day=day,
+                overdue=overdue,
+                returned=returned,
+                loan_days=loan_days,
+            )
+            DailyBookLoans.objects.create(day=day, book=book, borrowed=2)
+            DailyRevenue.objects.create(
+                day=day, type="FINE", payments=1, amount=Decimal("2.50")
+            )
+
+    def test_reports(self):
+        today = date.today()
+        testcases = [
+            (
+                "reports:report-overdue",
+                [
+                    {"day": today - timedelta(days=1), "overdue": 1},
+                    {"day": today, "overdue": 2},
+                ],
+            ),
+            (
+                "reports:report-revenue",
+                [{"type": "FINE", "payments": 2, "amount": Decimal("5.00")}],
+            ),
+            (
+                "reports:report-top-books",
+                [
+                    {
+                        "book": Book.objects.get().id,
+                        "title": "Test Book",
+                        "borrowings": 4,
+                    }
+                ],
+            ),
+            (
+                "reports:report-loan-duration",
+                {"returned": 2, "average_days": 4.5},
+            ),
+        ]
+        for name, expected in testcases:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data, expected)
+
+        response = self.client.get(reverse("reports:report-list"))
+        self.assertEqual(len(response.data), 4)
+
+    def test_days_param(self):
+        url = reverse("reports:report-overdue")
+        response = self.client.get(url, query_params={"days": 365})
+        self.assertEqual(len(response.data), 3)
+
+        for days in ("0", "1000", "week"):
+            with self.subTest(days=days):
+                response = self.client.get(url, query_params={"days": days})
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse("reports:report-overdue"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,13 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from reports.views import ReportsViewSet
+
+router = DefaultRouter()
+router.register("", ReportsViewSet, basename="report")
+
+app_name = "reports"
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from library_service.db_router import ReplicaReadMixin
+from reports.models import DailyBookLoans, DailyLoanStats, DailyRevenue
+
+DAYS_PARAMETER = OpenApiParameter(
+    name="days",
+    type=OpenApiTypes.INT,
+    description="Number of days up to today the report covers "
+    "(30 by default).",
+)
+REPORTS = ("overdue", "revenue", "top-books", "loan-duration")
+
+
+class ReportsViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    Staff reports, read from the summary tables of the reports app
+    (refreshed every few minutes), so they take the same time however
+    long the history is.
+    """
+
+    permission_classes = (IsAdminUser,)
+    replica_actions = (
+        "list",
+        "overdue",
+        "revenue",
+        "top_books",
+        "loan_duration",
+    )
+    query_budgets = {
+        "list": 1,
+        "overdue": 2,
+        "revenue": 2,
+        "top_books": 2,
+        "loan_duration": 2,
+    }
+
+    def get_int_param(self, name: str, default: int, maximum: int) -> int:
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except ValueError:
+            raise ValidationError(f"Invalid value for {name}")
+        if not 1 <= value <= maximum:
+            raise ValidationError(f"Invalid value for {name}")
+        return value
+
+    def get_period(self) -> tuple[date, date]:
+        days = self.get_int_param("days", 30, settings.REPORTS_MAX_DAYS)
+        today = date.today()
+        return today - timedelta(days=days - 1), today
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def list(self, request, *args, **kwargs):
+        return Response(
+            {
+                name: reverse(f"reports:report-{name}", request=request)
+                for name in REPORTS
+            }
+        )
+
+    @extend_schema(parameters=[DAYS_PARAMETER], responses=OpenApiTypes.OBJECT)
+    @action(detail=False, url_path="overdue", url_name="overdue")
+    def overdue(self, request, *args, **kwargs):
+        """
+        Borrowings overdue at the end of each day.
+        """
+        rows = (
+            DailyLoanStats.objects.filter(day__range=self.get_period())
+            .order_by("day")
+            .values("day", "overdue")
+        )
+        return Response(list(rows))
+
+    @extend_schema(parameters=[DAYS_PARAMETER], responses=OpenApiTypes.OBJECT)
+    @action(detail=False, url_path="revenue", url_name="revenue")
+    def revenue(self, request, *args, **kwargs):
+        """
+        Paid payments and their total amount per payment type.
+        """
+        rows = (
+            DailyRevenue.objects.filter(day__range=self.get_period())
+            .values("type")
+            .annotate(payments=Sum("payments"), amount=Sum("amount"))
+            .order_by("type")
+        )
+        return Response(list(rows))
+
+    @extend_schema(
+        parameters=[
+            DAYS_PARAMETER,
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                description="Number of books (10 by default, at most 100).",
+            ),
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(detail=False, url_path="top-books", url_name="top-books")
+    def top_books(self, request, *args, **kwargs):
+        """
+        The most borrowed books, by borrow date.
+        """
+        limit = self.get_int_param("limit", 10, 100)
+        rows = (
+            DailyBookLoans.objects.filter(day__range=self.get_period())
+            .values("book_id", "book__title")
+            .annotate(borrowings=Sum("borrowed"))
+            .order_by("-borrowings", "book_id")[:limit]
+        )
+        return Response(
+            [
+                {
+                    "book": row["book_id"],
+                    "title": row["book__title"],
+                    "borrowings": row["borrowings"],
+                }
+                for row in rows
+            ]
+        )
+
+    @extend_schema(parameters=[DAYS_PARAMETER], responses=OpenApiTypes.OBJECT)
+    @action(detail=False, url_path="loan-duration", url_name="loan-duration")
+    def loan_duration(self, request, *args, **kwargs):
+        """
+        Average length in days of the loans returned in the period.
+        """
+        totals = DailyLoanStats.objects.filter(
+            day__range=self.get_period()
+        ).aggregate(returned=Sum("returned"), loan_days=Sum("loan_days"))
+        returned = totals["returned"] or 0
+        return Response(
+            {
+                "returned": returned,
+                "average_days": (
+                    round(totals["loan_days"] / returned, 2)
+                    if returned
+                    else None
+                ),
+            }
+        )
@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from monitoring.metrics import CacheMetrics
+
+# What authentication and permission checks need to know of a user.
+PRINCIPAL_FIELDS = ("id", "email", "is_staff", "is_active")
+TRUSTED_CLAIMS = ("email", "is_staff")
+
+local_cache_metrics = CacheMetrics("auth_local")
+shared_cache_metrics = CacheMetrics("auth_shared")
+
+
+class LocalCache:
+    """
+    A thread-safe LRU of at most AUTH_LOCAL_CACHE_SIZE entries, each
+    kept for AUTH_LOCAL_CACHE_TIMEOUT seconds.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        expires = time.monotonic() + settings.AUTH_LOCAL_CACHE_TIMEOUT
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.AUTH_LOCAL_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+local_principals = LocalCache()
+
+
+def get_principal_key(user_id) -> str:
+    return f"auth:principal:{user_id}"
+
+
+def invalidate_principal(user_id) -> None:
+    # Token claims hold the id as a string.
+    local_principals.delete(str(user_id))
+    cache.delete(get_principal_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with the user looked up in a per-process LRU,
+    then the shared cache, and only then the database. Only the
+    principal (PRINCIPAL_FIELDS) is cached: the user returned has the
+    other fields deferred, so views needing them (e.g. ManageUserView)
+    fetch the user themselves.
+
+    With AUTH_TRUST_TOKEN_CLAIMS, safe requests are authenticated from
+    the token claims added by users.serializers.TokenObtainPairSerializer
+    without any lookup.
+    """
+
+    def authenticate(self, request):
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+        user = self.get_trusted_user(request, validated_token)
+        if user is None:
+            user = self.get_user(validated_token)
+        return user, validated_token
+
+    async def aauthenticate(self, request):
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+        user = self.get_trusted_user(request, validated_token)
+        if user is None:
+            user = await self.aget_user(validated_token)
+        return user, validated_token
+
+    def get_request_token(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return self.get_validated_token(raw_token)
+
+    def get_user_id(self, validated_token) -> str:
+        try:
+            return str(validated_token[jwt_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+
+    def get_trusted_user(self, request, validated_token):
+        """
+        The user described by the token claims, or None unless trusting
+        them is enabled, the request is safe and the token has them
+        (tokens issued before the claims were added do not).
+        """
+        if (
+            not settings.AUTH_TRUST_TOKEN_CLAIMS
+            or request.method not in SAFE_METHODS
+            or any(claim not in validated_token for claim in TRUSTED_CLAIMS)
+        ):
+            return None
+        id_field = self.user_model._meta.get_field(jwt_settings.USER_ID_FIELD)
+        principal = {
+            id_field.attname: id_field.to_python(
+                self.get_user_id(validated_token)
+            ),
+            "email": validated_token["email"],
+            "is_staff": validated_token["is_staff"],
+            "is_active": True,
+        }
+        return self.make_user(principal)
+
+    def get_principal_queryset(self, user_id):
+        return self.user_model.objects.filter(
+            **{jwt_settings.USER_ID_FIELD: user_id}
+        ).values(*PRINCIPAL_FIELDS)
+
+    def get_user(self, validated_token):
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which is not worth caching.
+            return super().get_user(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        principal = local_principals.get(user_id)
+        local_cache_metrics.record(principal is not None)
+        if principal is None:
+            key = get_principal_key(user_id)
+            principal = cache.get(key)
+            shared_cache_metrics.record(principal is not None)
+            if principal is None:
+                principal = self.get_principal_queryset(user_id).first()
+                self.check_principal(principal)
+                cache.set(key, principal, settings.AUTH_USER_CACHE_TIMEOUT)
+            local_principals.set(user_id, principal)
+        self.check_principal(principal)
+        return self.make_user(principal)
+
+    async def aget_user(self, validated_token):
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            return await sync_to_async(super().get_user)(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        principal = local_principals.get(user_id)
+        local_cache_metrics.record(principal is not None)
+        if principal is None:
+            key = get_principal_key(user_id)
+            principal = await cache.aget(key)
+            shared_cache_metrics.record(principal is not None)
+            if principal is None:
+                principal = await self.get_principal_queryset(user_id).afirst()
+                self.check_principal(principal)
+                await cache.aset(
+                    key, principal, settings.AUTH_USER_CACHE_TIMEOUT
+                )
+            local_principals.set(user_id, principal)
+        self.check_principal(principal)
+        return self.make_user(principal)
+
+    @staticmethod
+    def check_principal(principal: dict | None) -> None:
+        if principal is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not principal["is_active"]:
+            raise AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+
+    def make_user(self, principal: dict):
+        """
+        A user instance as loaded by .only(*PRINCIPAL_FIELDS): accessing
+        any other field loads it from the database, and saving it only
+        writes the loaded fields.
+        """
+        field_names = [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.attname in principal
+        ]
+        return self.user_model.from_db(
+            DEFAULT_DB_ALIAS,
+            field_names,
+            [principal[name] for name in field_names],
+        )
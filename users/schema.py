@@ -0,0 +1,11 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """
+    Documents CachedJWTAuthentication as the JWT bearer scheme
+    (jwtAuth) of simplejwt's JWTAuthentication, so Swagger UI can
+    authorize requests.
+    """
+
+    target_class = "users.authentication.CachedJWTAuthentication"
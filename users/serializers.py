@@ -1,5 +1,9 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -36,3 +40,55 @@ class UserSerializer(serializers.ModelSerializer):
             instance.set_password(password)
         instance.save()
         return instance
+
+
+def add_trusted_claims(token, user) -> None:
+    """
+    Adds the claims CachedJWTAuthentication can trust on read-only
+    requests instead of looking the user up.
+    """
+    token["email"] = user.email
+    token["is_staff"] = user.is_staff
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """
+    Adds the trusted claims to the access token only: access tokens
+    minted from the refresh token get them read again from the user by
+    TokenRefreshSerializer, so they are at most ACCESS_TOKEN_LIFETIME
+    old.
+    """
+
+    def validate(self, attrs):
+        data = jwt_serializers.TokenObtainSerializer.validate(self, attrs)
+        refresh = self.get_token(self.user)
+        access = refresh.access_token
+        add_trusted_claims(access, self.user)
+        data["refresh"] = str(refresh)
+        data["access"] = str(access)
+
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+        return data
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Adds the trusted claims, read from the user as of this refresh, to
+    the new access token.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        user_id = access[jwt_settings.USER_ID_CLAIM]
+        user = (
+            get_user_model()
+            .objects.filter(**{jwt_settings.USER_ID_FIELD: user_id})
+            .only("email", "is_staff")
+            .first()
+        )
+        if user is not None:
+            add_trusted_claims(access, user)
+            data["access"] = str(access)
+        return data
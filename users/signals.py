@@ -0,0 +1,24 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from users.authentication import invalidate_principal
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def user_changed(sender, instance, **kwargs) -> None:
+    """
+    Drops the cached principal of a user that was updated (e.g. through
+    ManageUserView), deactivated or deleted. Dropped again on commit, in
+    case a concurrent request cached the rows the transaction replaced.
+    """
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return
+    user_id = getattr(instance, jwt_settings.USER_ID_FIELD)
+    invalidate_principal(user_id)
+    transaction.on_commit(partial(invalidate_principal, user_id))
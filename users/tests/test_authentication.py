@@ -0,0 +1,157 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from users.authentication import (
+    CachedJWTAuthentication,
+    get_principal_key,
+    local_principals,
+)
+
+
+class TestCachedJWTAuthentication(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_principals.clear()
+        self.factory = RequestFactory()
+        self.authentication = CachedJWTAuthentication()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="testuser123"
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.token["email"] = self.user.email
+        self.token["is_staff"] = False
+
+    def authenticate(self, method: str = "get"):
+        request = getattr(self.factory, method)(
+            "/", headers={"Authorize": f"Bearer {self.token}"}
+        )
+        user, _ = self.authentication.authenticate(request)
+        return user
+
+    def test_user_is_cached(self):
+        with self.assertNumQueries(1):
+            user = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, self.user.email)
+        self.assertFalse(user.is_staff)
+
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+        local_principals.clear()
+        with self.assertNumQueries(0):
+            self.authenticate()
+        self.assertIsNotNone(cache.get(get_principal_key(self.user.pk)))
+
+    def test_other_fields_are_loaded_on_access(self):
+        user = self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password("testuser123"))
+
+    def test_deactivation_invalidates_cache(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_staff_change_invalidates_cache(self):
+        self.authenticate()
+        self.user.is_staff = True
+        self.user.save()
+
+        self.assertTrue(self.authenticate().is_staff)
+
+    def test_deleted_user_is_not_found(self):
+        self.authenticate()
+        self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    @override_settings(AUTH_TRUST_TOKEN_CLAIMS=True)
+    def test_safe_requests_trust_token_claims(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, self.user.email)
+        self.assertIsNone(cache.get(get_principal_key(self.user.pk)))
+
+        with self.assertNumQueries(1):
+            self.authenticate("post")
+
+    @override_settings(AUTH_TRUST_TOKEN_CLAIMS=True)
+    def test_tokens_without_claims_are_looked_up(self):
+        self.token = AccessToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+    def test_issued_tokens_have_trusted_claims(self):
+        response = APIClient().post(
+            reverse("users:token"),
+            {"email": "user@user.com", "password": "testuser123"},
+        )
+        token = AccessToken(response.data["access"])
+        self.assertEqual(token["email"], "user@user.com")
+        self.assertFalse(token["is_staff"])
+        self.assertNotIn("is_staff", RefreshToken(response.data["refresh"]))
+
+    def test_refreshed_tokens_have_current_claims(self):
+        refresh = APIClient().post(
+            reverse("users:token"),
+            {"email": "user@user.com", "password": "testuser123"},
+        ).data["refresh"]
+        self.user.is_staff = True
+        self.user.save()
+
+        response = APIClient().post(
+            reverse("users:token_refresh"), {"refresh": refresh}
+        )
+
+        token = AccessToken(response.data["access"])
+        self.assertEqual(token["email"], "user@user.com")
+        self.assertTrue(token["is_staff"])
+
+
+class TestManageUserView(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_principals.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com",
+            password="testuser123",
+            first_name="Old",
+        )
+        self.client = APIClient(
+            headers={"Authorize": f"Bearer {AccessToken.for_user(self.user)}"}
+        )
+
+    def test_update_keeps_other_fields_and_refreshes_cache(self):
+        url = reverse("users:me")
+        self.assertEqual(self.client.get(url).data["first_name"], "Old")
+
+        response = self.client.patch(url, {"email": "new@user.com"})
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@user.com")
+        self.assertEqual(self.user.first_name, "Old")
+        self.assertTrue(self.user.check_password("testuser123"))
+
+        self.assertEqual(self.client.get(url).data["email"], "new@user.com")
+
+
+class TestSchema(TestCase):
+    def test_jwt_security_is_documented(self):
+        schema = SchemaGenerator().get_schema(public=True)
+        self.assertIn("jwtAuth", schema["components"]["securitySchemes"])
+        self.assertIn(
+            {"jwtAuth": []},
+            schema["paths"]["/api/users/me/"]["get"]["security"],
+        )
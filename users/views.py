@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 
@@ -6,11 +7,14 @@ from users.serializers import UserSerializer
 
 class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
+    query_budgets = {"post": 3}
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated,)
+    query_budgets = {"get": 2, "put": 4, "patch": 4}
 
     def get_object(self):
-        return self.request.user
+        # The authenticated user only has its principal fields loaded.
+        return get_user_model().objects.get(pk=self.request.user.pk)